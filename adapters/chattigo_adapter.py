@@ -2,6 +2,7 @@
 import json
 import logging
 import re
+from contextvars import ContextVar
 from typing import Dict, Tuple
 from datetime import datetime, timedelta
 from fastapi import Request, HTTPException
@@ -9,9 +10,12 @@ from pydantic import BaseModel
 from application.detectar_intencion_chatgpt_usecase import DetectarIntencionChatGPTUseCase
 from application.registrar_reclamo_usecase import RegistrarReclamoUseCase
 from application.actualizar_usuario_usecase import ActualizarUsuarioUseCase
-from application.consultar_estado_reclamo_usecase import ConsultarEstadoReclamoUseCase
+from application.consultar_estado_reclamo_usecase import ConsultarEstadoReclamoUseCase, COLUMNAS_RESUMEN
 from application.consultar_reclamo_usecase import ConsultarReclamoUseCase
 from application.consultar_facturas_usecase import ConsultarFacturasUseCase
+from application.casos_de_uso import CasosDeUso, abrir_casos_de_uso
+from application.clasificador_intenciones import INTENCIONES_FLUJO, UMBRAL_RESPALDO, preprocesar
+from infrastructure.database import ejecutar_db
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
 
@@ -27,16 +31,13 @@ class ChattigoResponse(BaseModel):
 
 
 class ChattigoAdapter:
-    def __init__(self, detectar_intencion: DetectarIntencionChatGPTUseCase, reclamo: RegistrarReclamoUseCase,
-                 actualizar: ActualizarUsuarioUseCase, consulta_estado: ConsultarEstadoReclamoUseCase,
-                 consulta_reclamo: ConsultarReclamoUseCase, consultar_facturas: ConsultarFacturasUseCase,
-                 redis_client):
+    def __init__(self, detectar_intencion: DetectarIntencionChatGPTUseCase, redis_client,
+                 abrir_casos=abrir_casos_de_uso):
         self.detectar_intencion = detectar_intencion
-        self.reclamo = reclamo
-        self.actualizar = actualizar
-        self.consulta_estado = consulta_estado
-        self.consulta_reclamo = consulta_reclamo
-        self.consultar_facturas = consultar_facturas
+        # Cada mensaje abre su propia UnitOfWork; los casos de uso del mensaje en curso viven en un ContextVar
+        # para que los mensajes concurrentes no compartan sesiones
+        self.abrir_casos = abrir_casos
+        self._casos: ContextVar[CasosDeUso] = ContextVar("chattigo_casos_de_uso")
         self.redis_client = redis_client
         self.memory_reset_interval = timedelta(hours=24)  # Intervalo para resetear la memoria (24 horas)
         self.process_timeout = timedelta(minutes=5)  # Timeout del proceso (5 minutos)
@@ -51,7 +52,52 @@ class ChattigoAdapter:
             logging.error(f"❌ Error al inicializar el cliente de Redis: {str(e)}")
             raise
 
+    @property
+    def reclamo(self) -> RegistrarReclamoUseCase:
+        return self._casos.get().registrar_reclamo
+
+    @property
+    def actualizar(self) -> ActualizarUsuarioUseCase:
+        return self._casos.get().actualizar_usuario
+
+    @property
+    def consulta_estado(self) -> ConsultarEstadoReclamoUseCase:
+        return self._casos.get().consultar_estado
+
+    @property
+    def consulta_reclamo(self) -> ConsultarReclamoUseCase:
+        return self._casos.get().consultar_reclamo
+
+    @property
+    def consultar_facturas(self) -> ConsultarFacturasUseCase:
+        return self._casos.get().consultar_facturas
+
+    def _resetear_memoria(self, lote: int = 1000) -> int:
+        """Borra el historial y el estado de las conversaciones (claves ``user:*``) y devuelve cuántas claves borró.
+
+        No es un FLUSHDB: en la misma base de Redis están las cachés de PR_CAU y de respuestas de
+        los LLM y la analítica de consumos, que vencen por sus propias TTL.
+        """
+        borradas = 0
+        claves = []
+        for clave in self.redis_client.scan_iter(match="user:*", count=lote):
+            claves.append(clave)
+            if len(claves) >= lote:
+                borradas += self.redis_client.delete(*claves)
+                claves = []
+        if claves:
+            borradas += self.redis_client.delete(*claves)
+        return borradas
+
     async def handle_message(self, request: Request) -> Dict[str, str]:
+        async with self.abrir_casos() as casos:
+            token = self._casos.set(casos)
+            try:
+                return await self._handle_message(request)
+            finally:
+                self._casos.reset(token)
+
+    async def _handle_message(self, request: Request) -> Dict[str, str]:
         try:
             # Leer el cuerpo de la solicitud una sola vez
             payload = await request.json()
@@ -70,10 +116,10 @@ class ChattigoAdapter:
             # Resetear la memoria si ha pasado el intervalo de tiempo
             current_time = datetime.now()
             if (current_time - self.last_memory_reset) >= self.memory_reset_interval:
-                self.redis_client.flushdb()  # Limpia toda la base de datos de Redis
+                borradas = self._resetear_memoria()
                 self.last_interaction.clear()
                 self.last_memory_reset = current_time
-                logging.info("🌟 Memoria de Redis reseteada para ahorrar recursos")
+                logging.info(f"🌟 Memoria de Redis reseteada para ahorrar recursos ({borradas} claves de usuarios)")
 
             # Manejo del historial en Redis
             self.redis_client.rpush(historial_clave, f"Usuario: {texto_usuario}")
@@ -130,23 +176,7 @@ class ChattigoAdapter:
 
     def _preprocess_text(self, text: str) -> str:
         logging.info(f"Preprocesando texto original: {text}")
-        text = text.lower()
-        text = re.sub(r'\bk\w*',
-                      lambda m: m.group(0).replace('k', 'qu') if 'k' in m.group(0) else m.group(0).replace('k', 'c'),
-                      text)
-        text = re.sub(r'\bz\w*', lambda m: m.group(0).replace('z', 's') if 'z' in m.group(0) else m.group(0), text)
-        text = re.sub(r'\bx\w*',
-                      lambda m: m.group(0).replace('x', 's') if 'x' in m.group(0) else m.group(0).replace('x', 'j'),
-                      text)
-        text = re.sub(r'\b(k|q)uier[oa]|kere\b', 'quiero', text)
-        text = re.sub(r'\b(ak|ac)tua(l|ll)?(l|ll)?iz(ar|er)|aktuali[zs]ar\b', 'actualizar', text)
-        text = re.sub(r'\b(rek|rec|rel)al[mo]|reclamoo?\b', 'reclamo', text)
-        text = re.sub(r'\b(kom|con|kol)sul(tar|tar)|consul[dt]ar\b', 'consultar', text)
-        text = re.sub(r'\b(ha|as)cer|aser\b', 'hacer', text)
-        text = re.sub(r'\b(direk|dier|dir)ec(c|k)ion|direcsion\b', 'direccion', text)
-        text = re.sub(r'\b(est|es)tadoo?\b', 'estado', text)
-        text = re.sub(r'(\w*?)([aeiou])\2(\w*)', r'\1\2\3', text)
-        text = re.sub(r'(\w)r(\w)e', r'\1er\2', text)
+        text = preprocesar(text)
         logging.info(f"Texto preprocesado: {text}")
         return text
 
@@ -181,36 +211,13 @@ class ChattigoAdapter:
     async def _process_inicio(self, texto: str, historial: str, estado_clave: str) -> str:
         intencion, respuesta = await self._detectar_intencion(texto, historial)
 
-        # Lógica de respaldo para detectar intenciones si el modelo falla
-        texto_lower = texto.lower()
-        if intencion == "Conversar" or intencion not in ["Reclamo", "Actualizar", "Consultar", "ConsultarFacturas"]:
-            if "reclamo" in texto_lower and (
-                    "hacer" in texto_lower or "quiero" in texto_lower or "problema" in texto_lower):
-                intencion = "Reclamo"
-                respuesta = (
-                    "💡 Lamentamos mucho escuchar que estás teniendo problemas con nuestro servicio. "
-                    "Para ayudarte con tu reclamo, por favor, dime tu número de DNI. "
-                    "¡Estaremos atentos para resolverlo lo antes posible! 🙏"
-                )
-            elif "actualizar" in texto_lower or "cambiar" in texto_lower:
-                intencion = "Actualizar"
-                respuesta = (
-                    "📋 ¿Qué dato te gustaría actualizar hoy?\n"
-                    "🏠 Calle\n"
-                    "🏘️ Barrio\n"
-                    "📱 Celular\n"
-                    "✉️ Correo\n"
-                    "Por favor, elige una opción (por ejemplo, escribe 'calle')."
-                )
-            elif ("consultar" in texto_lower or "ver" in texto_lower) and "reclamo" in texto_lower:
-                intencion = "Consultar"
-                respuesta = (
-                    "📋 ¡Hola! Entiendo que deseas ver tus reclamos. "
-                    "Para ayudarte con eso, por favor proporciona tu número de DNI. ✨ ¡Gracias!"
-                )
-            elif "factura" in texto_lower or ("ver" in texto_lower and "factura" in texto_lower):
-                intencion = "ConsultarFacturas"
-                respuesta = "📄 Por favor, dame tu DNI para consultar tu factura. ✨"
+        # Respaldo si el modelo no identificó un flujo: la intención que gana en las reglas, aunque no
+        # haya llegado a la confianza para saltear el LLM
+        if intencion not in INTENCIONES_FLUJO:
+            candidata, confianza = self.detectar_intencion.clasificar(texto)
+            if candidata is not None and confianza >= UMBRAL_RESPALDO:
+                logging.info(f"Intención {candidata} por respaldo de reglas (confianza {confianza})")
+                intencion = candidata
 
         if intencion == "Reclamo":
             self.redis_client.hset(estado_clave, "fase", "pedir_dni")
@@ -244,7 +251,7 @@ class ChattigoAdapter:
         return respuesta
 
     async def _detectar_intencion(self, texto: str, historial: str) -> Tuple[str, str]:
-        respuesta_cruda = self.detectar_intencion.ejecutar_con_historial(texto, historial)
+        respuesta_cruda = await self.detectar_intencion.ejecutar_con_historial(texto, historial)
         try:
             resultado = json.loads(respuesta_cruda)
             return resultado.get("intencion", "Conversar"), resultado.get("respuesta",
@@ -275,16 +282,16 @@ class ChattigoAdapter:
         if not re.match(r'^\d+$', texto):
             return "❌ Eso no parece un DNI válido. Por favor, ingresa solo números."
 
-        # Buscar al usuario por DNI usando el usuario_repository del caso de uso
-        usuario_db1 = self.actualizar.usuario_repository.obtener_de_db1(texto)
+        # Buscar al usuario por DNI: primero en Clientes (lectura indexada, la sincronización la
+        # mantiene al día) y si no está, en PR_CAU
         nombre = "Usuario Desconocido"
-        if usuario_db1:
-            primer_registro = usuario_db1[0]
-            nombre = f"{primer_registro['Apellido'].strip()} {primer_registro['Nombre'].strip()}"
+        usuario_db2 = await ejecutar_db(self.actualizar.usuario_repository.obtener_por_dni, texto)
+        if usuario_db2:
+            nombre = usuario_db2.NOMBRE_COMPLETO.strip()
         else:
-            usuario_db2 = self.actualizar.usuario_repository.obtener_por_dni(texto)
-            if usuario_db2:
-                nombre = usuario_db2.NOMBRE_COMPLETO.strip()
+            usuario_db1 = await ejecutar_db(self.actualizar.usuario_repository.obtener_identidad_db1, texto)
+            if usuario_db1:
+                nombre = f"{usuario_db1['Apellido'].strip()} {usuario_db1['Nombre'].strip()}"
 
         self.redis_client.hset(estado_clave, "fase", "confirmar_dni")
         self.redis_client.hset(estado_clave, "dni", texto)
@@ -319,8 +326,8 @@ class ChattigoAdapter:
         elif accion == "consultar_facturas":
             if not self.consultar_facturas:
                 return "❌ Funcionalidad no disponible: consultar_facturas_usecase no está configurado.\n\n🌟 ¿Necesitas algo más? Puedo ayudarte con un reclamo, actualizar datos, consultar estados o facturas."
-            resultado, status = self.consultar_facturas.ejecutar(dni)
-            if status == 200:
+            resultado, status = await ejecutar_db(self.consultar_facturas.ejecutar_ultima, dni)
+            if status == 200 and resultado["facturas"]:
                 factura = resultado["facturas"][0]
                 respuesta = (f"📄 Factura de {factura['Nombre']} (DNI: {dni}):\n"
                              f"📋 *Código Suministro*: {factura['CodigoSuministro']}\n"
@@ -345,7 +352,7 @@ class ChattigoAdapter:
         dni = estado.get("dni")
         if not self.reclamo:
             return "❌ Funcionalidad no disponible: registrar_reclamo_usecase no está configurado.\n\n🌟 ¿Necesitas algo más? Puedo ayudarte con un reclamo, actualizar datos, consultar estados o facturas."
-        resultado, status = self.reclamo.ejecutar(dni, texto)
+        resultado, status = await ejecutar_db(self.reclamo.ejecutar, dni, texto)
         if status == 201:
             reclamo_id = resultado["id_reclamo"]
             nombre = estado.get("nombre", "Usuario")
@@ -364,7 +371,7 @@ class ChattigoAdapter:
         id_reclamo = int(texto)
         if not self.consulta_reclamo:
             return "❌ Funcionalidad no disponible: consultar_reclamo_usecase no está configurado.\n\n🌟 ¿Necesitas algo más? Puedo ayudarte con un reclamo, actualizar datos, consultar estados o facturas."
-        respuesta, codigo = self.consulta_reclamo.ejecutar(id_reclamo)
+        respuesta, codigo = await ejecutar_db(self.consulta_reclamo.ejecutar, id_reclamo)
         if codigo == 200:
             reclamo = respuesta["reclamo"]
             cliente = respuesta["cliente"]
@@ -394,7 +401,7 @@ class ChattigoAdapter:
         campo = estado.get("campo_actualizar")
         if not self.actualizar:
             return "❌ Funcionalidad no disponible: actualizar_usuario_usecase no está configurado.\n\n🌟 ¿Necesitas algo más? Puedo ayudarte con un reclamo, actualizar datos, consultar estados o facturas."
-        resultado, status = self.actualizar.ejecutar(dni, {campo: texto})
+        resultado, status = await ejecutar_db(self.actualizar.ejecutar, dni, {campo: texto})
         if status == 200:
             nombre = estado.get('nombre', 'Usuario')
             respuesta = f"✅ ¡Actualización exitosa, {nombre}!\n✨ Tu {campo.lower()} ha sido actualizado a: {texto}."
@@ -406,7 +413,7 @@ class ChattigoAdapter:
     async def _format_reclamos(self, dni: str) -> str:
         if not self.consulta_estado:
             return "❌ Funcionalidad no disponible: consultar_estado_reclamo_usecase no está configurado."
-        respuesta, codigo = self.consulta_estado.ejecutar(dni)
+        respuesta, codigo = await ejecutar_db(self.consulta_estado.ejecutar, dni, columnas=COLUMNAS_RESUMEN)
         if codigo == 200:
             if "mensaje" in respuesta:
                 return f"ℹ️ {respuesta['mensaje']}"
@@ -4,7 +4,7 @@ from telegram import Update
 from telegram.ext import ApplicationBuilder, CommandHandler, MessageHandler, filters, ContextTypes
 from application.registrar_reclamo_usecase import RegistrarReclamoUseCase
 from application.actualizar_usuario_usecase import ActualizarUsuarioUseCase
-from application.consultar_estado_reclamo_usecase import ConsultarEstadoReclamoUseCase
+from application.consultar_estado_reclamo_usecase import ConsultarEstadoReclamoUseCase, COLUMNAS_RESUMEN
 from application.consultar_reclamo_usecase import ConsultarReclamoUseCase
 from application.detectar_intencion_usecase import DetectarIntencionUseCase
 import re
@@ -200,7 +200,7 @@ class TelegramAdapter:
                     return
 
                 logging.info(f"Buscando usuario con DNI: {texto_usuario} en DECSA_DB1")
-                usuario_db1 = self.actualizar_usecase.usuario_repository.obtener_de_db1(texto_usuario)
+                usuario_db1 = self.actualizar_usecase.usuario_repository.obtener_identidad_db1(texto_usuario)
                 if usuario_db1:
                     nombre = f"{usuario_db1['Apellido'].strip()} {usuario_db1['Nombre'].strip()}"
                     logging.info(f"Usuario encontrado en DECSA_DB1: {nombre}")
@@ -253,7 +253,7 @@ class TelegramAdapter:
                     campo = estado.get("campo_actualizar")
 
                     usuario_db2 = self.actualizar_usecase.usuario_repository.obtener_por_dni(dni)
-                    usuario_db1 = self.actualizar_usecase.usuario_repository.obtener_de_db1(
+                    usuario_db1 = self.actualizar_usecase.usuario_repository.obtener_identidad_db1(
                         dni) if not usuario_db2 else None
 
                     current_value = "No disponible"
@@ -341,7 +341,7 @@ class TelegramAdapter:
                         resultado, status = self.actualizar_usecase.ejecutar(dni, {campo: valor_actualizar})
                         if status == 200:
                             usuario = self.actualizar_usecase.usuario_repository.obtener_por_dni(
-                                dni) or self.actualizar_usecase.usuario_repository.obtener_de_db1(dni)
+                                dni) or self.actualizar_usecase.usuario_repository.obtener_identidad_db1(dni)
                             # Cambio 4 y 5: Usar NOMBRE_COMPLETO y mostrar datos actualizados
                             respuesta = (f"✅ ¡Actualización exitosa!\n\n✔️ Datos actualizados:\n"
                                          f"📛 Nombre: {usuario.NOMBRE_COMPLETO}\n"
@@ -397,7 +397,7 @@ class TelegramAdapter:
                 f"- Dirección: {reclamo_data.get('direccion', 'No disponible')}"
             )
         else:
-            respuesta, codigo = self.consulta_estado_usecase.ejecutar(reclamo_data) if reclamo_data else (None, 404)
+            respuesta, codigo = self.consulta_estado_usecase.ejecutar(reclamo_data, columnas=COLUMNAS_RESUMEN) if reclamo_data else (None, 404)
             if codigo == 200 and "reclamos" in respuesta:
                 reclamos = respuesta["reclamos"][:5]
                 if not reclamos:
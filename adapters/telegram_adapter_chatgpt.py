@@ -2,7 +2,7 @@ from telegram import Update
 from telegram.ext import ApplicationBuilder, CommandHandler, MessageHandler, filters, ContextTypes
 from application.registrar_reclamo_usecase import RegistrarReclamoUseCase
 from application.actualizar_usuario_usecase import ActualizarUsuarioUseCase
-from application.consultar_estado_reclamo_usecase import ConsultarEstadoReclamoUseCase
+from application.consultar_estado_reclamo_usecase import ConsultarEstadoReclamoUseCase, COLUMNAS_RESUMEN
 from application.consultar_reclamo_usecase import ConsultarReclamoUseCase
 from application.consultar_facturas_usecase import ConsultarFacturasUseCase  # Nueva importación
 from application.detectar_intencion_chatgpt_usecase import DetectarIntencionChatGPTUseCase
@@ -121,7 +121,7 @@ class TelegramAdapterChatGPT:
 
             if estado["fase"] == "inicio":
                 logging.info("Fase inicio: Detectando intención con ChatGPT")
-                respuesta_cruda = self.detectar_intencion_usecase.ejecutar_con_historial(texto_preprocesado, historial)
+                respuesta_cruda = await self.detectar_intencion_usecase.ejecutar_con_historial(texto_preprocesado, historial)
                 try:
                     resultado = json.loads(respuesta_cruda)
                     intencion = resultado.get("intencion", "Conversar")
@@ -167,11 +167,9 @@ class TelegramAdapterChatGPT:
                         "Eso no parece un DNI válido. Por favor, ingresa solo números. Di 'cancelar' o 'salir' para detener el proceso."
                     )
                     return
-                usuario_db1 = self.actualizar_usecase.usuario_repository.obtener_de_db1(texto_usuario)
+                usuario_db1 = self.actualizar_usecase.usuario_repository.obtener_identidad_db1(texto_usuario)
                 if usuario_db1:
-                    # Tomamos el primer registro de la lista para el nombre
-                    primer_registro = usuario_db1[0]
-                    nombre = f"{primer_registro['Apellido'].strip()} {primer_registro['Nombre'].strip()}"
+                    nombre = f"{usuario_db1['Apellido'].strip()} {usuario_db1['Nombre'].strip()}"
                     self.redis_client.hset(estado_clave, "fase", "confirmar_dni")
                     self.redis_client.hset(estado_clave, "dni", texto_usuario)
                     self.redis_client.hset(estado_clave, "nombre", nombre)
@@ -225,9 +223,9 @@ class TelegramAdapterChatGPT:
                         f"Tu {campo.lower()} actual es: *{current_value}*. Dime el nuevo valor para actualizarlo. Di 'cancelar' o 'salir' para detener el proceso."
                     )
                 elif estado.get("accion") == "consultar_facturas":  # Nueva acción
-                    resultado, status = self.consultar_facturas_usecase.ejecutar(dni)
-                    if status == 200:
-                        factura = resultado["factura"]
+                    resultado, status = self.consultar_facturas_usecase.ejecutar_ultima(dni)
+                    if status == 200 and resultado["facturas"]:
+                        factura = resultado["facturas"][0]
                         mensaje = (f"Factura de {factura['Nombre']} (DNI: {dni}):\n"
                                   f"📋 *Código Suministro*: {factura['CodigoSuministro']}\n"
                                   f"📄 *N° Comprobante*: {factura['NumeroComprobante']}\n"
@@ -315,7 +313,7 @@ class TelegramAdapterChatGPT:
                     resultado, status = self.actualizar_usecase.ejecutar(dni, {campo: valor_actualizar})
                     if status == 200:
                         usuario_db2 = self.actualizar_usecase.usuario_repository.obtener_por_dni(dni)
-                        usuario_db1 = self.actualizar_usecase.usuario_repository.obtener_de_db1(dni) if not usuario_db2 else None
+                        usuario_db1 = self.actualizar_usecase.usuario_repository.obtener_identidad_db1(dni) if not usuario_db2 else None
                         if usuario_db2:
                             respuesta = (f"✅ ¡Actualización exitosa, {nombre}!\n\n✔️ Datos actualizados:\n"
                                         f"📛 Nombre: {usuario_db2.NOMBRE_COMPLETO}\n"
@@ -361,7 +359,7 @@ class TelegramAdapterChatGPT:
             logging.warning("format_reclamos llamado con is_single=True y dni, pero se espera un id_reclamo")
             return "Función no implementada para reclamo individual por DNI"
         else:
-            respuesta, codigo = self.consulta_estado_usecase.ejecutar(dni) if dni else (None, 404)
+            respuesta, codigo = self.consulta_estado_usecase.ejecutar(dni, columnas=COLUMNAS_RESUMEN) if dni else (None, 404)
             if codigo == 200:
                 if "mensaje" in respuesta:
                     return respuesta["mensaje"]
@@ -2,7 +2,7 @@ from telegram import Update
 from telegram.ext import ApplicationBuilder, CommandHandler, MessageHandler, filters, ContextTypes
 from application.registrar_reclamo_usecase import RegistrarReclamoUseCase
 from application.actualizar_usuario_usecase import ActualizarUsuarioUseCase
-from application.consultar_estado_reclamo_usecase import ConsultarEstadoReclamoUseCase
+from application.consultar_estado_reclamo_usecase import ConsultarEstadoReclamoUseCase, COLUMNAS_RESUMEN
 from application.consultar_reclamo_usecase import ConsultarReclamoUseCase
 from application.otros_modelos.detectar_intencion_deepseek_usecase import DetectarIntencionDeepSeekUseCase
 import re
@@ -197,7 +197,7 @@ class TelegramAdapterDPSK:
                     return
 
                 logging.info(f"Buscando usuario con DNI: {texto_usuario} en DECSA_DB1")
-                usuario_db1 = self.actualizar_usecase.usuario_repository.obtener_de_db1(texto_usuario)
+                usuario_db1 = self.actualizar_usecase.usuario_repository.obtener_identidad_db1(texto_usuario)
                 if usuario_db1:
                     nombre = f"{usuario_db1['Apellido'].strip()} {usuario_db1['Nombre'].strip()}"
                     logging.info(f"Usuario encontrado en DECSA_DB1: {nombre}")
@@ -250,7 +250,7 @@ class TelegramAdapterDPSK:
                     campo = estado.get("campo_actualizar")
 
                     usuario_db2 = self.actualizar_usecase.usuario_repository.obtener_por_dni(dni)
-                    usuario_db1 = self.actualizar_usecase.usuario_repository.obtener_de_db1(
+                    usuario_db1 = self.actualizar_usecase.usuario_repository.obtener_identidad_db1(
                         dni) if not usuario_db2 else None
 
                     current_value = "No disponible"
@@ -338,7 +338,7 @@ class TelegramAdapterDPSK:
                         resultado, status = self.actualizar_usecase.ejecutar(dni, {campo: valor_actualizar})
                         if status == 200:
                             usuario = self.actualizar_usecase.usuario_repository.obtener_por_dni(
-                                dni) or self.actualizar_usecase.usuario_repository.obtener_de_db1(dni)
+                                dni) or self.actualizar_usecase.usuario_repository.obtener_identidad_db1(dni)
                             respuesta = (f"✅ ¡Actualización exitosa!\n\n✔️ Datos actualizados:\n"
                                          f"📛 Nombre: {usuario.NOMBRE_COMPLETO}\n"
                                          f"🔢 N° Suministro: {usuario.CODIGO_SUMINISTRO}\n"
@@ -393,7 +393,7 @@ class TelegramAdapterDPSK:
                 f"- Dirección: {reclamo_data.get('direccion', 'No disponible')}"
             )
         else:
-            respuesta, codigo = self.consulta_estado_usecase.ejecutar(reclamo_data) if reclamo_data else (None, 404)
+            respuesta, codigo = self.consulta_estado_usecase.ejecutar(reclamo_data, columnas=COLUMNAS_RESUMEN) if reclamo_data else (None, 404)
             if codigo == 200 and "reclamos" in respuesta:
                 reclamos = respuesta["reclamos"][:5]
                 if not reclamos:
@@ -3,7 +3,7 @@ from telegram import Update
 from telegram.ext import ApplicationBuilder, CommandHandler, MessageHandler, filters, ContextTypes
 from application.registrar_reclamo_usecase import RegistrarReclamoUseCase
 from application.actualizar_usuario_usecase import ActualizarUsuarioUseCase
-from application.consultar_estado_reclamo_usecase import ConsultarEstadoReclamoUseCase
+from application.consultar_estado_reclamo_usecase import ConsultarEstadoReclamoUseCase, COLUMNAS_RESUMEN
 from application.consultar_reclamo_usecase import ConsultarReclamoUseCase
 from application.otros_modelos.detectar_intencion_gemini_usecase import DetectarIntencionGeminiUseCase
 import re
@@ -162,7 +162,7 @@ class TelegramAdapterGemini:
                         "Eso no parece un DNI válido. Por favor, ingresa solo números. Di 'cancelar' o 'salir' para detener el proceso."
                     )
                     return
-                usuario_db1 = self.actualizar_usecase.usuario_repository.obtener_de_db1(texto_usuario)
+                usuario_db1 = self.actualizar_usecase.usuario_repository.obtener_identidad_db1(texto_usuario)
                 if usuario_db1:
                     nombre = f"{usuario_db1['Apellido'].strip()} {usuario_db1['Nombre'].strip()}"
                     self.redis_client.hset(estado_clave, "fase", "confirmar_dni")
@@ -287,7 +287,7 @@ class TelegramAdapterGemini:
                     resultado, status = self.actualizar_usecase.ejecutar(dni, {campo: valor_actualizar})
                     if status == 200:
                         usuario_db2 = self.actualizar_usecase.usuario_repository.obtener_por_dni(dni)
-                        usuario_db1 = self.actualizar_usecase.usuario_repository.obtener_de_db1(dni) if not usuario_db2 else None
+                        usuario_db1 = self.actualizar_usecase.usuario_repository.obtener_identidad_db1(dni) if not usuario_db2 else None
                         if usuario_db2:
                             respuesta = (f"✅ ¡Actualización exitosa, {nombre}!\n\n✔️ Datos actualizados:\n"
                                         f"📛 Nombre: {usuario_db2.NOMBRE_COMPLETO}\n"
@@ -333,7 +333,7 @@ class TelegramAdapterGemini:
             logging.warning("format_reclamos llamado con is_single=True y dni, pero se espera un id_reclamo")
             return "Función no implementada para reclamo individual por DNI"
         else:
-            respuesta, codigo = self.consulta_estado_usecase.ejecutar(dni) if dni else (None, 404)
+            respuesta, codigo = self.consulta_estado_usecase.ejecutar(dni, columnas=COLUMNAS_RESUMEN) if dni else (None, 404)
             if codigo == 200:
                 if "mensaje" in respuesta:
                     return respuesta["mensaje"]
@@ -3,9 +3,9 @@ from fastapi import FastAPI
 from infrastructure.settings import Config
 from infrastructure.extensions import init_cors
 from infrastructure.database import init_db
-from routes.user_routes import cliente_router as user_router, init_cliente_services
-from routes.reclamo_routes import reclamo_router, init_reclamo_services
-from routes.factura_routes import factura_router, init_factura_services
+from routes.user_routes import cliente_router as user_router
+from routes.reclamo_routes import reclamo_router
+from routes.factura_routes import factura_router
 import logging
 import os
 
@@ -26,10 +26,6 @@ def create_app():
     app.include_router(reclamo_router, prefix="/api/reclamos")
     app.include_router(factura_router, prefix="/api/facturas")
 
-    init_cliente_services(app)
-    init_reclamo_services(app)
-    init_factura_services(app)
-
     return app
 
 if __name__ == "__main__":
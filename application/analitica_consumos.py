@@ -0,0 +1,167 @@
+# application/analitica_consumos.py
+import numpy as np
+
+# Agregación de consumos por barrio y calle con NumPy, para la analítica de pérdidas. Los lotes de
+# PR_CAU se codifican a enteros (suministro, barrio, calle, período) y todo el cálculo posterior
+# es sobre arrays: una matriz suministro × período y agrupaciones con bincount/lexsort.
+
+SIN_BARRIO = "Sin barrio"
+SIN_CALLE = "Sin calle"
+PERCENTILES = (10, 50, 90)
+
+class Codificador:
+    """Asigna un entero a cada valor distinto, en orden de aparición, a medida que llegan los lotes."""
+
+    def __init__(self, vacio: str = None):
+        self.codigos = {}
+        self.vacio = vacio
+
+    def codificar(self, valores) -> np.ndarray:
+        codigos = self.codigos
+        vacio = self.vacio
+        return np.fromiter(
+            (codigos.setdefault(str(valor).strip() if valor is not None else vacio, len(codigos)) for valor in valores),
+            dtype=np.int64,
+            count=len(valores),
+        )
+
+    @property
+    def valores(self) -> list:
+        return list(self.codigos)
+
+class AcumuladorConsumos:
+    """Junta los lotes ``(suministro, barrio, calle, periodo, consumo)`` como arrays de códigos."""
+
+    def __init__(self, periodos: list):
+        self.periodos = list(periodos)
+        self.suministros = Codificador()
+        self.barrios = Codificador(SIN_BARRIO)
+        self.calles = Codificador(SIN_CALLE)
+        self._indice_periodo = {periodo: i for i, periodo in enumerate(self.periodos)}
+        self._lotes = []
+
+    def agregar(self, lote: list):
+        if not lote:
+            return
+        suministros, barrios, calles, periodos, consumos = zip(*lote)
+        self._lotes.append((
+            self.suministros.codificar(suministros),
+            self.barrios.codificar(barrios),
+            self.calles.codificar(calles),
+            np.fromiter((self._indice_periodo[periodo] for periodo in periodos), dtype=np.int64, count=len(lote)),
+            np.fromiter((np.nan if consumo is None else float(consumo) for consumo in consumos), dtype=np.float64, count=len(lote)),
+        ))
+
+    @property
+    def filas(self) -> int:
+        return sum(len(lote[0]) for lote in self._lotes)
+
+    def matriz(self):
+        """``(consumo, presente, barrio_de, calle_de)``: consumo suministro × período (NaN si no hubo
+        registro), y el barrio/calle de cada suministro según su registro más reciente."""
+        cantidad, periodos = len(self.suministros.codigos), len(self.periodos)
+        if not self._lotes:
+            vacio = np.empty(0, dtype=np.int64)
+            return np.empty((0, periodos)), np.empty((0, periodos), dtype=bool), vacio, vacio
+        suministro, barrio, calle, periodo, consumo = (np.concatenate(columna) for columna in zip(*self._lotes))
+        valido = ~np.isnan(consumo)
+        # Un suministro puede tener más de un registro de CONS_SER en el período: se suman
+        clave = suministro[valido] * periodos + periodo[valido]
+        total = np.bincount(clave, weights=consumo[valido], minlength=cantidad * periodos).reshape(cantidad, periodos)
+        presente = np.bincount(clave, minlength=cantidad * periodos).reshape(cantidad, periodos) > 0
+        total[~presente] = np.nan
+        # Las filas vienen por ID_FAC ascendente y en la asignación con índices repetidos gana el último
+        barrio_de = np.empty(cantidad, dtype=np.int64)
+        barrio_de[suministro] = barrio
+        calle_de = np.empty(cantidad, dtype=np.int64)
+        calle_de[suministro] = calle
+        return total, presente, barrio_de, calle_de
+
+def zscores_suministro(consumo: np.ndarray, presente: np.ndarray, minimo_referencia: int = 3,
+                       desvio_minimo: float = 1.0):
+    """z-score de cada período contra los demás períodos del mismo suministro (deja uno afuera).
+
+    Con el período incluido en su propia media un pico nunca supera sqrt(n-1) desvíos, así que
+    con 6-12 períodos un umbral de 3 casi no saltaría. Devuelve ``(z, referencia)``; z es NaN si
+    el suministro tiene menos de ``minimo_referencia`` otros períodos. ``desvio_minimo`` (kWh)
+    evita z infinitos en suministros de consumo constante.
+    """
+    valores = np.where(presente, consumo, 0.0)
+    n = presente.sum(axis=1, keepdims=True)
+    suma = valores.sum(axis=1, keepdims=True)
+    cuadrados = (valores ** 2).sum(axis=1, keepdims=True)
+    otros = n - presente
+    with np.errstate(divide="ignore", invalid="ignore"):
+        referencia = (suma - valores) / otros
+        varianza = (cuadrados - valores ** 2) / otros - referencia ** 2
+        desvio = np.maximum(np.sqrt(np.clip(varianza, 0.0, None)), desvio_minimo)
+        z = (consumo - referencia) / desvio
+    z[~presente | (otros < minimo_referencia)] = np.nan
+    return z, referencia
+
+def estadisticas_por_grupo(claves: np.ndarray, valores: np.ndarray, grupos: int, percentiles=PERCENTILES) -> dict:
+    """Cantidad, total, media y percentiles (interpolación lineal, como np.percentile) por clave de grupo.
+
+    Un solo lexsort ordena los valores dentro de cada grupo y los percentiles salen por aritmética
+    de índices, sin un np.percentile por grupo.
+    """
+    cantidad = np.bincount(claves, minlength=grupos)
+    total = np.bincount(claves, weights=valores, minlength=grupos)
+    ordenados = valores[np.lexsort((valores, claves))]
+    inicio = np.concatenate(([0], np.cumsum(cantidad)[:-1]))
+    con_datos = cantidad > 0
+    resultado = {"cantidad": cantidad, "total": total, "media": np.full(grupos, np.nan)}
+    resultado["media"][con_datos] = total[con_datos] / cantidad[con_datos]
+    for percentil in percentiles:
+        posicion = inicio[con_datos] + (percentil / 100) * (cantidad[con_datos] - 1)
+        abajo = np.floor(posicion).astype(np.int64)
+        arriba = np.ceil(posicion).astype(np.int64)
+        valores_percentil = np.full(grupos, np.nan)
+        valores_percentil[con_datos] = ordenados[abajo] + (ordenados[arriba] - ordenados[abajo]) * (posicion - abajo)
+        resultado[f"p{percentil}"] = valores_percentil
+    return resultado
+
+def _redondear(valor):
+    return None if valor is None or np.isnan(valor) else round(float(valor), 2)
+
+def agregar_por_nivel(grupo_de: np.ndarray, nombres: list, consumo: np.ndarray, presente: np.ndarray,
+                      atipico: np.ndarray, campo: str) -> list:
+    """Por período, una lista de grupos (barrios o calles) con sus estadísticas de consumo."""
+    periodos = consumo.shape[1]
+    grupos = len(nombres) * periodos
+    # Clave grupo × período sobre todos los (suministro, período) con consumo
+    claves = (grupo_de[:, None] * periodos + np.arange(periodos))[presente]
+    estadisticas = estadisticas_por_grupo(claves, consumo[presente], grupos)
+    atipicos = np.bincount(claves, weights=atipico[presente].astype(np.float64), minlength=grupos)
+    con_datos = estadisticas["cantidad"].reshape(len(nombres), periodos) > 0
+    por_periodo = []
+    for p in range(periodos):
+        filas = []
+        for g in np.flatnonzero(con_datos[:, p]):
+            clave = g * periodos + p
+            filas.append({
+                campo: nombres[g],
+                "suministros": int(estadisticas["cantidad"][clave]),
+                "consumo_total": _redondear(estadisticas["total"][clave]),
+                "consumo_medio": _redondear(estadisticas["media"][clave]),
+                **{f"p{percentil}": _redondear(estadisticas[f"p{percentil}"][clave]) for percentil in PERCENTILES},
+                "atipicos": int(atipicos[clave]),
+            })
+        filas.sort(key=lambda fila: fila["consumo_total"], reverse=True)
+        por_periodo.append(filas)
+    return por_periodo
+
+def series_por_nivel(grupo_de: np.ndarray, nombres: list, consumo: np.ndarray, presente: np.ndarray, campo: str) -> list:
+    """Serie de consumo total y suministros con lectura de cada grupo, en el orden de los períodos."""
+    total = np.zeros((len(nombres), consumo.shape[1]))
+    cantidad = np.zeros((len(nombres), consumo.shape[1]), dtype=np.int64)
+    np.add.at(total, grupo_de, np.where(presente, consumo, 0.0))
+    np.add.at(cantidad, grupo_de, presente)
+    return [
+        {
+            campo: nombre,
+            "consumo_total": [_redondear(valor) if suministros else None for valor, suministros in zip(total[g], cantidad[g])],
+            "suministros": cantidad[g].tolist(),
+        }
+        for g, nombre in enumerate(nombres)
+    ]
@@ -0,0 +1,128 @@
+# application/analitica_consumos_usecase.py
+from application.analitica_consumos import AcumuladorConsumos, zscores_suministro, agregar_por_nivel, series_por_nivel
+from infrastructure.configuracion import leer_config
+from datetime import datetime
+import numpy as np
+import logging
+import time
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+# |z| a partir del cual el consumo de un suministro en un período se marca como atípico
+ANALITICA_UMBRAL_Z = leer_config("ANALITICA_UMBRAL_Z", 3, float)
+# Atípicos guardados por período (los de mayor |z|); el conteo por barrio/calle los incluye a todos
+MAX_ATIPICOS_POR_PERIODO = 500
+
+class AnaliticaConsumosUseCase:
+    """Consumo por barrio y por calle (series, percentiles) y suministros atípicos para detectar pérdidas.
+
+    ``ejecutar`` lo corre el job: lee CONS_SER de PR_CAU por lotes con cursor del servidor, agrega
+    con NumPy y deja el resultado en Redis por período. Los ``obtener_*`` son los que usan los
+    tableros y sólo leen Redis.
+    """
+
+    def __init__(self, usuario_repository, cache, tamano_lote: int = 5000, umbral_z: float = ANALITICA_UMBRAL_Z):
+        self.usuario_repository = usuario_repository
+        self.cache = cache
+        self.tamano_lote = tamano_lote
+        self.umbral_z = umbral_z
+
+    def ejecutar(self, periodos: int = 12):
+        """Recalcula los últimos ``periodos`` períodos y los guarda en la caché."""
+        try:
+            inicio = time.perf_counter()
+            ultimos = self.usuario_repository.ultimos_periodos_db1(periodos)
+            if not ultimos:
+                return {"mensaje": "No hay consumos registrados en PR_CAU"}, 404
+            logging.info(f"Calculando analítica de consumos para los períodos {ultimos[0]} a {ultimos[-1]}")
+
+            acumulador = AcumuladorConsumos(ultimos)
+            for lote in self.usuario_repository.iterar_consumos_db1(ultimos, self.tamano_lote):
+                acumulador.agregar(lote)
+            consumo, presente, barrio_de, calle_de = acumulador.matriz()
+            z, referencia = zscores_suministro(consumo, presente)
+            atipico = np.abs(np.nan_to_num(z)) >= self.umbral_z
+
+            calculado = datetime.now().isoformat(timespec="seconds")
+            barrios, calles = acumulador.barrios.valores, acumulador.calles.valores
+            por_barrio = agregar_por_nivel(barrio_de, barrios, consumo, presente, atipico, "barrio")
+            por_calle = agregar_por_nivel(calle_de, calles, consumo, presente, atipico, "calle")
+            suministros = acumulador.suministros.valores
+            por_periodo = {
+                periodo: {
+                    "periodo": periodo,
+                    "calculado": calculado,
+                    "barrios": por_barrio[p],
+                    "calles": por_calle[p],
+                    "atipicos_total": int(atipico[:, p].sum()),
+                    "atipicos": self._atipicos(p, z, consumo, referencia, atipico, suministros, barrio_de, calle_de, barrios, calles),
+                }
+                for p, periodo in enumerate(ultimos)
+            }
+            series = {
+                "barrio": {"periodos": ultimos, "series": series_por_nivel(barrio_de, barrios, consumo, presente, "barrio")},
+                "calle": {"periodos": ultimos, "series": series_por_nivel(calle_de, calles, consumo, presente, "calle")},
+            }
+            indice = {
+                "periodos": ultimos,
+                "calculado": calculado,
+                "filas": acumulador.filas,
+                "suministros": len(suministros),
+                "umbral_z": self.umbral_z,
+                "segundos": round(time.perf_counter() - inicio, 2),
+            }
+            self.cache.guardar(indice, por_periodo, series)
+            logging.info(f"Analítica de consumos terminada: {indice}")
+            return indice, 200
+        except Exception as e:
+            logging.error(f"Error al calcular la analítica de consumos: {str(e)}")
+            return {"error": "Error al calcular la analítica de consumos", "detalle": str(e)}, 500
+
+    @staticmethod
+    def _atipicos(p, z, consumo, referencia, atipico, suministros, barrio_de, calle_de, barrios, calles) -> list:
+        """Suministros atípicos del período ``p``, de mayor a menor |z|."""
+        indices = np.flatnonzero(atipico[:, p])
+        indices = indices[np.argsort(-np.abs(z[indices, p]), kind="stable")][:MAX_ATIPICOS_POR_PERIODO]
+        return [
+            {
+                "suministro": suministros[i],
+                "barrio": barrios[barrio_de[i]],
+                "calle": calles[calle_de[i]],
+                "consumo": round(float(consumo[i, p]), 2),
+                "referencia": round(float(referencia[i, p]), 2),
+                "z": round(float(z[i, p]), 2),
+            }
+            for i in indices
+        ]
+
+    def obtener_indice(self):
+        try:
+            indice = self.cache.obtener_indice()
+            if indice is None:
+                return {"mensaje": "La analítica de consumos todavía no se calculó"}, 404
+            return indice, 200
+        except Exception as e:
+            logging.error(f"Error al leer la analítica de consumos: {str(e)}")
+            return {"error": "Error al leer la analítica de consumos"}, 500
+
+    def obtener_periodo(self, periodo: str):
+        try:
+            datos = self.cache.obtener_periodo(periodo)
+            if datos is None:
+                return {"mensaje": f"No hay analítica de consumos calculada para el período {periodo}"}, 404
+            return datos, 200
+        except Exception as e:
+            logging.error(f"Error al leer la analítica de consumos del período {periodo}: {str(e)}")
+            return {"error": "Error al leer la analítica de consumos"}, 500
+
+    def obtener_series(self, nivel: str):
+        try:
+            datos = self.cache.obtener_series(nivel)
+            if datos is None:
+                return {"mensaje": "La analítica de consumos todavía no se calculó"}, 404
+            return datos, 200
+        except ValueError as e:
+            return {"error": str(e)}, 400
+        except Exception as e:
+            logging.error(f"Error al leer las series de consumo por {nivel}: {str(e)}")
+            return {"error": "Error al leer la analítica de consumos"}, 500
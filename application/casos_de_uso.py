@@ -0,0 +1,25 @@
+# application/casos_de_uso.py
+from contextlib import asynccontextmanager
+from infrastructure.unit_of_work import UnitOfWork, abrir_unit_of_work
+from application.registrar_reclamo_usecase import RegistrarReclamoUseCase
+from application.actualizar_usuario_usecase import ActualizarUsuarioUseCase
+from application.consultar_estado_reclamo_usecase import ConsultarEstadoReclamoUseCase
+from application.consultar_reclamo_usecase import ConsultarReclamoUseCase
+from application.consultar_facturas_usecase import ConsultarFacturasUseCase
+
+class CasosDeUso:
+    """Casos de uso del chatbot construidos sobre los repositorios de una UnitOfWork."""
+
+    def __init__(self, uow: UnitOfWork):
+        self.uow = uow
+        self.registrar_reclamo = RegistrarReclamoUseCase(uow.reclamo_repository, uow.usuario_repository)
+        self.actualizar_usuario = ActualizarUsuarioUseCase(uow.usuario_repository)
+        self.consultar_estado = ConsultarEstadoReclamoUseCase(uow.reclamo_repository, uow.usuario_repository)
+        self.consultar_reclamo = ConsultarReclamoUseCase(uow.reclamo_repository)
+        self.consultar_facturas = ConsultarFacturasUseCase(uow.usuario_repository)
+
+@asynccontextmanager
+async def abrir_casos_de_uso():
+    """Abre una UnitOfWork y devuelve sus casos de uso; las sesiones se liberan al salir."""
+    async with abrir_unit_of_work() as uow:
+        yield CasosDeUso(uow)
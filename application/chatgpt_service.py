@@ -1,28 +1,93 @@
 # application/chatgpt_service.py
 
 import logging
+import asyncio
+import httpx
 import time
 import json
 import re
-from openai import OpenAI
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient
+from starlette.concurrency import run_in_threadpool
 from infrastructure.settings import Config
+from infrastructure.configuracion import leer_config
+from infrastructure.respuestas_llm_cache import obtener_cache_respuestas_llm
+from infrastructure.respuestas_similares_cache import obtener_cache_similares, es_apertura
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
 
+# Tope por llamada en segundos (incluye los reintentos del cliente): pasado ese tiempo se contesta
+# con el mensaje de error en lugar de dejar la conversación esperando
+CHATGPT_TIMEOUT = leer_config("CHATGPT_TIMEOUT", 15, float)
+CHATGPT_MAX_REINTENTOS = leer_config("CHATGPT_MAX_REINTENTOS", 1, int)
+# Conexiones HTTP a la API compartidas por todas las conversaciones del worker
+CHATGPT_MAX_CONEXIONES = leer_config("CHATGPT_MAX_CONEXIONES", 100, int)
+
+MODELO = "gpt-4o-mini"
+# Entra en la clave de la caché de respuestas: subirla al cambiar el prompt
+VERSION_PROMPT = "v2"
+
+RESPUESTA_ERROR = '{"intencion": "Conversar", "respuesta": "Ups, algo falló. ¿En qué te ayudo?"}'
+RESPUESTA_NO_ENTENDI = '{"intencion": "Conversar", "respuesta": "No entendí bien. ¿En qué te ayudo? Decime si querés un reclamo, actualizar datos, consultar algo o ver tu factura."}'
+
+# De dónde salió cada respuesta de generar_respuesta_con_origen: sólo ORIGEN_LLM es una respuesta
+# nueva del modelo; las de las cachés se repiten y las de error/no entendí las escribimos nosotros
+ORIGEN_LLM = "llm"
+ORIGEN_CACHE = "cache"
+ORIGEN_SIMILAR = "similar"
+ORIGEN_NO_ENTENDI = "no_entendi"
+ORIGEN_ERROR = "error"
+
 class ChatGPTService:
-    def __init__(self, redis_client=None):
-        self.client = OpenAI(api_key=Config.CHATGPT_API_KEY)
+    """Cliente de ChatGPT sobre AsyncOpenAI: mientras una llamada espera a la API el event loop sigue
+    atendiendo otras conversaciones, la API REST y los webhooks.
+
+    Un solo pool de conexiones httpx por servicio (se crea uno por proceso en chattigo_app). Si la
+    tarea que espera se cancela (p. ej. se cortó el request) la cancelación llega hasta httpx y la
+    conexión vuelve al pool.
+    """
+
+    def __init__(self, redis_client=None, client: AsyncOpenAI = None, timeout: float = CHATGPT_TIMEOUT, cache=None, similares=None):
+        self.client = client or AsyncOpenAI(
+            api_key=Config.CHATGPT_API_KEY,
+            max_retries=CHATGPT_MAX_REINTENTOS,
+            timeout=httpx.Timeout(timeout, connect=5.0),
+            http_client=DefaultAsyncHttpxClient(
+                limits=httpx.Limits(max_connections=CHATGPT_MAX_CONEXIONES, max_keepalive_connections=20),
+            ),
+        )
         self.redis_client = redis_client
+        # Sin Redis no hay caché de respuestas, como antes
+        self.cache = cache if cache is not None else (obtener_cache_respuestas_llm(redis_client) if redis_client else None)
+        # Aperturas parecidas ("no tengo luz!!", "no tengo luzz") reusan la respuesta, en memoria del proceso
+        self.similares = similares if similares is not None else obtener_cache_similares()
+        self.timeout = timeout
         logging.info("ChatGPTService inicializado con API Key configurada.")
 
-    def generar_respuesta(self, prompt, historial=""):
+    async def cerrar(self):
+        """Cierra el pool de conexiones HTTP (shutdown de la app)."""
+        await self.client.close()
+
+    async def generar_respuesta(self, prompt, historial=""):
+        respuesta, _ = await self.generar_respuesta_con_origen(prompt, historial)
+        return respuesta
+
+    async def generar_respuesta_con_origen(self, prompt, historial=""):
+        """``(respuesta, origen)``: la misma respuesta que generar_respuesta y de dónde salió (ORIGEN_*)."""
         try:
-            if self.redis_client:
-                cache_key = f"chatgpt:v1:{hash(prompt + historial)}"
-                cached_response = self.redis_client.get(cache_key)
-                if cached_response:
+            cache_key = self.cache.clave("chatgpt", MODELO, VERSION_PROMPT, prompt, historial) if self.cache else None
+            espacio = f"chatgpt:{MODELO}:{VERSION_PROMPT}" if self.similares and es_apertura(historial) else None
+            if cache_key:
+                # redis-py es bloqueante: la lectura va a un hilo para no frenar el event loop
+                cached_response = await run_in_threadpool(self.cache.obtener, cache_key)
+                if cached_response is not None:
                     logging.info(f"Respuesta obtenida del caché: {cached_response}")
-                    return cached_response.decode('utf-8')
+                    if espacio:
+                        self.similares.guardar(espacio, prompt, cached_response)
+                    return cached_response, ORIGEN_CACHE
+            if espacio:
+                similar_response = self.similares.obtener(espacio, prompt)
+                if similar_response is not None:
+                    return similar_response, ORIGEN_SIMILAR
 
             full_prompt = f"""
             Eres DECSA, un asistente virtual oficial de Distribuidora Eléctrica de Caucete S.A. (DECSA). Tu función es ayudar a los usuarios con:
@@ -53,18 +118,22 @@ class ChatGPTService:
 
             start_time = time.time()
 
-            response = self.client.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[
-                    {"role": "system", "content": "Sos un asistente que responde en JSON."},
-                    {"role": "user", "content": full_prompt}
-                ],
-                temperature=0.4,
-                max_tokens=500
+            response = await asyncio.wait_for(
+                self.client.chat.completions.create(
+                    model=MODELO,
+                    messages=[
+                        {"role": "system", "content": "Sos un asistente que responde en JSON."},
+                        {"role": "user", "content": full_prompt}
+                    ],
+                    temperature=0.4,
+                    max_tokens=500
+                ),
+                timeout=self.timeout,
             )
 
             texto_respuesta = response.choices[0].message.content.strip()
-            logging.info(f"Tiempo de respuesta: {time.time() - start_time:.2f} segundos")
+            segundos = time.time() - start_time
+            logging.info(f"Tiempo de respuesta: {segundos:.2f} segundos")
             logging.info(f"Respuesta de ChatGPT: {texto_respuesta}")
 
             # Limpieza de bloques ```json ... ``` si aparecen
@@ -77,18 +146,28 @@ class ChatGPTService:
                 json.loads(texto_respuesta)
             except json.JSONDecodeError:
                 logging.warning(f"Respuesta no es JSON válido: {texto_respuesta}")
-                texto_respuesta = '{"intencion": "Conversar", "respuesta": "No entendí bien. ¿En qué te ayudo? Decime si querés un reclamo, actualizar datos, consultar algo o ver tu factura."}'
+                # El "no entendí" no se cachea: el mismo mensaje vuelve a ir al modelo
+                return RESPUESTA_NO_ENTENDI, ORIGEN_NO_ENTENDI
 
-            if self.redis_client:
-                self.redis_client.setex(cache_key, 3600, texto_respuesta)
-                logging.info(f"Respuesta guardada en caché: {cache_key}")
+            if cache_key:
+                await run_in_threadpool(self.cache.guardar, cache_key, texto_respuesta, segundos)
+            if espacio:
+                self.similares.guardar(espacio, prompt, texto_respuesta)
 
-            return texto_respuesta
+            return texto_respuesta, ORIGEN_LLM
 
+        except asyncio.TimeoutError:
+            logging.error(f"{MODELO} no respondió en {self.timeout:.0f}s")
+            return RESPUESTA_ERROR, ORIGEN_ERROR
+        # asyncio.CancelledError no es Exception: la cancelación se propaga a quien espera
         except Exception as e:
-            logging.error(f"Error con gpt-4o-mini: {str(e)}")
-            return '{"intencion": "Conversar", "respuesta": "Ups, algo falló. ¿En qué te ayudo?"}'
+            logging.error(f"Error con {MODELO}: {str(e)}")
+            return RESPUESTA_ERROR, ORIGEN_ERROR
+
+    async def detectar_intencion(self, mensaje, historial=""):
+        logging.info(f"Enviando a ChatGPT: '{mensaje}'")
+        return await self.generar_respuesta(mensaje, historial)
 
-    def detectar_intencion(self, mensaje, historial=""):
+    async def detectar_intencion_con_origen(self, mensaje, historial=""):
         logging.info(f"Enviando a ChatGPT: '{mensaje}'")
-        return self.generar_respuesta(mensaje, historial)
+        return await self.generar_respuesta_con_origen(mensaje, historial)
@@ -0,0 +1,227 @@
+# application/clasificador_intenciones.py
+from collections import deque
+import unicodedata
+import re
+
+# Clasificador de intenciones por reglas que corre antes del LLM: los mensajes obvios ("no tengo
+# luz", "quiero ver mi factura") se resuelven sin la llamada a la API y sólo los ambiguos o de
+# charla llegan a ChatGPT. Las frases se buscan todas juntas, en una sola pasada, con un
+# autómata de Aho-Corasick sobre el texto preprocesado.
+
+INTENCIONES_FLUJO = ("Reclamo", "Actualizar", "Consultar", "ConsultarFacturas")
+
+# (frase, intención, peso). Una frase terminada en "*" también matchea como prefijo ("factura*"
+# → "facturas"). Una palabra suelta ambigua pesa poco; las frases inequívocas pesan 1. Los verbos
+# genéricos (hacer, poner, cargar) sólo cuentan junto a "reclamo": solos aparecen en cualquier
+# mensaje ("hacer el pago", "cargar saldo").
+REGLAS = (
+    # Reclamo
+    ("reclamo*", "Reclamo", 0.5),
+    ("hacer un reclamo*", "Reclamo", 0.5),
+    ("hacer el reclamo*", "Reclamo", 0.5),
+    ("hacer reclamo*", "Reclamo", 0.5),
+    ("poner un reclamo*", "Reclamo", 0.5),
+    ("presentar un reclamo*", "Reclamo", 0.5),
+    ("cargar un reclamo*", "Reclamo", 0.5),
+    ("nuevo reclamo*", "Reclamo", 0.5),
+    ("problema*", "Reclamo", 0.4),
+    ("no tengo luz", "Reclamo", 1.0),
+    ("no hay luz", "Reclamo", 1.0),
+    ("sin luz", "Reclamo", 1.0),
+    ("sin energia", "Reclamo", 1.0),
+    ("sin corriente", "Reclamo", 1.0),
+    ("corte de luz", "Reclamo", 1.0),
+    ("se corto la luz", "Reclamo", 1.0),
+    ("se fue la luz", "Reclamo", 1.0),
+    ("cable caido", "Reclamo", 1.0),
+    ("poste caido", "Reclamo", 1.0),
+    ("baja tension", "Reclamo", 1.0),
+    # Actualizar
+    ("actualizar", "Actualizar", 0.8),
+    ("cambiar", "Actualizar", 0.6),
+    ("modificar", "Actualizar", 0.6),
+    ("mis datos", "Actualizar", 0.4),
+    ("direccion", "Actualizar", 0.4),
+    ("domicilio", "Actualizar", 0.4),
+    ("calle", "Actualizar", 0.4),
+    ("barrio", "Actualizar", 0.4),
+    ("celular", "Actualizar", 0.4),
+    ("telefono", "Actualizar", 0.4),
+    ("correo", "Actualizar", 0.4),
+    ("mail", "Actualizar", 0.4),
+    ("email", "Actualizar", 0.4),
+    # Consultar (estado de reclamos)
+    ("reclamo*", "Consultar", 0.5),
+    ("consultar", "Consultar", 0.5),
+    ("ver", "Consultar", 0.4),
+    ("estado", "Consultar", 0.5),
+    ("como va", "Consultar", 0.4),
+    ("como esta", "Consultar", 0.4),
+    ("seguimiento", "Consultar", 0.5),
+    ("mis reclamos", "Consultar", 0.5),
+    # Un reclamo ya hecho: lo que sigue ("porque no tengo luz") describe ese reclamo, no uno nuevo
+    ("hice un reclamo*", "Consultar", 1.0),
+    ("hice el reclamo*", "Consultar", 1.0),
+    ("hice reclamo*", "Consultar", 1.0),
+    # ConsultarFacturas
+    ("factura*", "ConsultarFacturas", 1.0),
+    ("boleta*", "ConsultarFacturas", 0.8),
+    ("cuanto debo", "ConsultarFacturas", 1.0),
+    ("cuanto tengo que pagar", "ConsultarFacturas", 1.0),
+    ("deuda", "ConsultarFacturas", 0.8),
+    ("vencimiento*", "ConsultarFacturas", 0.6),
+    ("pagar", "ConsultarFacturas", 0.5),
+)
+
+# Palabras que, antes de una frase de REGLAS y en la misma cláusula, invierten su sentido ("no quiero
+# hacer un reclamo"): el clasificador se abstiene y decide el LLM. Las que son parte de una frase
+# ("no tengo luz") no cuentan.
+NEGACIONES = ("no", "nunca", "ni", "tampoco", "jamas")
+_NEGACION = re.compile(r"\b(?:" + "|".join(NEGACIONES) + r")\b")
+# Fin de cláusula: puntuación o conjunciones que abren una idea nueva ("..., no tengo luz, como va?")
+_CORTE_CLAUSULA = re.compile(r"[,.;:!?¿¡]|\b(?:y|pero|porque|aunque)\b")
+
+# Confianza mínima para contestar sin el LLM
+UMBRAL_CONFIANZA = 0.7
+# Confianza mínima para usar la intención de las reglas cuando el LLM contestó "Conversar" (cubre
+# lo que hacían los respaldos por palabra clave: "actualizar" o "cambiar" solos, "ver reclamo")
+UMBRAL_RESPALDO = 0.6
+
+def preprocesar(texto: str) -> str:
+    """Corrige las variantes de escritura más comunes del chat (k/qu, z/s, "kiero", "rekalmo", vocales repetidas)."""
+    texto = texto.lower()
+    texto = re.sub(r'\bk\w*',
+                   lambda m: m.group(0).replace('k', 'qu') if 'k' in m.group(0) else m.group(0).replace('k', 'c'),
+                   texto)
+    texto = re.sub(r'\bz\w*', lambda m: m.group(0).replace('z', 's') if 'z' in m.group(0) else m.group(0), texto)
+    texto = re.sub(r'\bx\w*',
+                   lambda m: m.group(0).replace('x', 's') if 'x' in m.group(0) else m.group(0).replace('x', 'j'),
+                   texto)
+    texto = re.sub(r'\b(k|q)uier[oa]|kere\b', 'quiero', texto)
+    texto = re.sub(r'\b(ak|ac)tua(l|ll)?(l|ll)?iz(ar|er)|aktuali[zs]ar\b', 'actualizar', texto)
+    texto = re.sub(r'\b(rek|rec|rel)al[mo]|reclamoo?\b', 'reclamo', texto)
+    texto = re.sub(r'\b(kom|con|kol)sul(tar|tar)|consul[dt]ar\b', 'consultar', texto)
+    texto = re.sub(r'\b(ha|as)cer|aser\b', 'hacer', texto)
+    texto = re.sub(r'\b(direk|dier|dir)ec(c|k)ion|direcsion\b', 'direccion', texto)
+    texto = re.sub(r'\b(est|es)tadoo?\b', 'estado', texto)
+    texto = re.sub(r'(\w*?)([aeiou])\2(\w*)', r'\1\2\3', texto)
+    texto = re.sub(r'(\w)r(\w)e', r'\1er\2', texto)
+    return texto
+
+def _sin_tildes(texto: str) -> str:
+    return "".join(caracter for caracter in unicodedata.normalize("NFKD", texto) if not unicodedata.combining(caracter))
+
+class ClasificadorIntenciones:
+    """Autómata de Aho-Corasick sobre las frases de ``REGLAS``.
+
+    Las frases pasan por el mismo ``preprocesar`` que los mensajes, así que se escriben bien y
+    matchean con la forma que queda del texto. ``clasificar`` suma los pesos de las frases
+    encontradas (cada frase una vez) por intención y devuelve ``(intencion, confianza)``; si alguna
+    frase está negada se abstiene.
+    """
+
+    def __init__(self, reglas=REGLAS, umbral: float = UMBRAL_CONFIANZA):
+        self.umbral = umbral
+        # Por estado: transiciones, enlace de falla y salidas (largo, prefijo, índice de la frase)
+        self._siguiente = [{}]
+        self._falla = [0]
+        self._salidas = [[]]
+        self._reglas = []
+        for frase, intencion, peso in reglas:
+            prefijo = frase.endswith("*")
+            patron = _sin_tildes(preprocesar(frase.rstrip("*")))
+            self._agregar(patron, prefijo, len(self._reglas))
+            self._reglas.append((intencion, peso))
+        self._enlazar()
+
+    def _agregar(self, patron: str, prefijo: bool, indice: int):
+        estado = 0
+        for caracter in patron:
+            if caracter not in self._siguiente[estado]:
+                self._siguiente.append({})
+                self._falla.append(0)
+                self._salidas.append([])
+                self._siguiente[estado][caracter] = len(self._siguiente) - 1
+            estado = self._siguiente[estado][caracter]
+        self._salidas[estado].append((len(patron), prefijo, indice))
+
+    def _enlazar(self):
+        """Enlaces de falla por BFS; cada estado hereda las salidas de su enlace."""
+        pendientes = deque(self._siguiente[0].values())
+        while pendientes:
+            estado = pendientes.popleft()
+            for caracter, hijo in self._siguiente[estado].items():
+                falla = self._falla[estado]
+                while falla and caracter not in self._siguiente[falla]:
+                    falla = self._falla[falla]
+                self._falla[hijo] = self._siguiente[falla].get(caracter, 0)
+                self._salidas[hijo] = self._salidas[hijo] + self._salidas[self._falla[hijo]]
+                pendientes.append(hijo)
+
+    def coincidencias(self, texto: str) -> list:
+        """``(inicio, fin, indice)`` de cada aparición de una frase como palabras completas en ``texto`` (sin tildes)."""
+        encontradas = []
+        estado = 0
+        for fin, caracter in enumerate(texto):
+            while estado and caracter not in self._siguiente[estado]:
+                estado = self._falla[estado]
+            estado = self._siguiente[estado].get(caracter, 0)
+            for largo, prefijo, indice in self._salidas[estado]:
+                inicio = fin - largo + 1
+                if inicio > 0 and texto[inicio - 1].isalnum():
+                    continue
+                if not prefijo and fin + 1 < len(texto) and texto[fin + 1].isalnum():
+                    continue
+                encontradas.append((inicio, fin + 1, indice))
+        return encontradas
+
+    def buscar(self, texto: str) -> set:
+        """Índices de las reglas cuyas frases aparecen en ``texto`` como palabras completas."""
+        return {indice for _, _, indice in self.coincidencias(_sin_tildes(texto))}
+
+    def negada(self, texto: str, coincidencias: list = None) -> bool:
+        """True si una negación suelta precede a alguna frase encontrada dentro de la misma cláusula."""
+        texto = _sin_tildes(texto)
+        if coincidencias is None:
+            coincidencias = self.coincidencias(texto)
+        negaciones = [
+            posicion.start() for posicion in _NEGACION.finditer(texto)
+            if not any(inicio <= posicion.start() < fin for inicio, fin, _ in coincidencias)
+        ]
+        if not negaciones:
+            return False
+        cortes = [corte.start() for corte in _CORTE_CLAUSULA.finditer(texto)]
+        return any(
+            negacion < inicio and not any(negacion < corte < inicio for corte in cortes)
+            for inicio, _, _ in coincidencias
+            for negacion in negaciones
+        )
+
+    def puntajes(self, texto: str, indices: set = None) -> dict:
+        puntajes = {}
+        for indice in self.buscar(texto) if indices is None else indices:
+            intencion, peso = self._reglas[indice]
+            puntajes[intencion] = puntajes.get(intencion, 0.0) + peso
+        return puntajes
+
+    def clasificar(self, texto: str):
+        """``(intencion, confianza)`` de un texto ya preprocesado; ``(None, 0.0)`` si no hay una intención que gane.
+
+        La confianza es el puntaje de la ganadora (hasta 1) descontado por la competencia:
+        ``min(1, primero) * (1 - segundo / (2 * primero))``. "quiero hacer un reclamo" da 0.75
+        (Reclamo 1.0 contra Consultar 0.5); "reclamo" solo empata y no decide, y "no quiero hacer
+        un reclamo" tampoco (negada).
+        """
+        texto = _sin_tildes(texto)
+        coincidencias = self.coincidencias(texto)
+        if self.negada(texto, coincidencias):
+            return None, 0.0
+        indices = {indice for _, _, indice in coincidencias}
+        orden = sorted(self.puntajes(texto, indices).items(), key=lambda item: item[1], reverse=True)
+        if not orden:
+            return None, 0.0
+        intencion, primero = orden[0]
+        segundo = orden[1][1] if len(orden) > 1 else 0.0
+        if segundo >= primero:
+            return None, 0.0
+        return intencion, round(min(1.0, primero) * (1 - segundo / (2 * primero)), 3)
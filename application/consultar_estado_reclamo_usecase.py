@@ -3,13 +3,19 @@ from infrastructure.sqlalchemy_reclamo_repository import SQLAlchemyReclamoReposi
 from infrastructure.sqlalchemy_usuario_repository import SQLAlchemyUsuarioRepository
 import logging
 
+# Campos que necesitan los listados del chat ("ID | Estado | Descripción")
+COLUMNAS_RESUMEN = ("ID_RECLAMO", "ESTADO", "DESCRIPCION")
+
 class ConsultarEstadoReclamoUseCase:
     def __init__(self, reclamo_repository: SQLAlchemyReclamoRepository, usuario_repository: SQLAlchemyUsuarioRepository):
         self.reclamo_repository = reclamo_repository
         self.usuario_repository = usuario_repository
 
-    def ejecutar(self, dni: str):
-        """Consulta los últimos 5 reclamos de un cliente a partir de su DNI."""
+    def ejecutar(self, dni: str, limite: int = 5, columnas: tuple = None):
+        """Consulta los últimos ``limite`` reclamos de un cliente a partir de su DNI.
+
+        Con ``columnas`` los reclamos vienen proyectados (sólo esos campos) en lugar de ``to_dict()``.
+        """
         try:
             logging.info(f"Buscando cliente con DNI {dni} para consultar reclamos")
             cliente = self.usuario_repository.obtener_por_dni(dni)
@@ -22,14 +28,11 @@ class ConsultarEstadoReclamoUseCase:
                 return {"reclamos": [], "mensaje": "Error interno: ID de usuario no válido"}, 500
 
             logging.info(f"Cliente encontrado con DNI {dni}, ID_USUARIO: {cliente.ID_USUARIO}")
-            reclamos = self.reclamo_repository.obtener_por_usuario(cliente.ID_USUARIO)
+            reclamos = self.reclamo_repository.obtener_ultimos_por_usuario(cliente.ID_USUARIO, limite, columnas)
             if not reclamos:
                 logging.info(f"No se encontraron reclamos para ID_USUARIO {cliente.ID_USUARIO}")
                 return {"reclamos": [], "mensaje": "No tienes reclamos registrados"}, 200
 
-            # Ordenar los reclamos por ID_RECLAMO (descendente) y limitar a los últimos 5
-            reclamos = sorted(reclamos, key=lambda r: r.ID_RECLAMO, reverse=True)[:5]
-
             logging.info(f"Reclamos encontrados para DNI {dni}: {len(reclamos)} reclamos")
             return {
                 "cliente": {
@@ -39,7 +42,7 @@ class ConsultarEstadoReclamoUseCase:
                     "barrio": cliente.BARRIO,
                     "codigo_suministro": cliente.CODIGO_SUMINISTRO
                 },
-                "reclamos": [reclamo.to_dict() for reclamo in reclamos]
+                "reclamos": reclamos if columnas else [reclamo.to_dict() for reclamo in reclamos]
             }, 200
         except Exception as e:
             logging.error(f"Error al consultar reclamos para DNI {dni}: {str(e)}")
@@ -1,6 +1,7 @@
 # application/consultar_facturas_usecase.py
 import logging
 from datetime import datetime
+from application.formato_facturas import cargar_facturas, formatear_facturas
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
 
@@ -8,48 +9,165 @@ class ConsultarFacturasUseCase:
     def __init__(self, usuario_repository):
         self.usuario_repository = usuario_repository
 
-    def ejecutar(self, dni: str):
+    def ejecutar(self, dni: str, limite: int = None, offset: int = 0, desde=None, hasta=None, estado: str = None):
         try:
-            datos = self.usuario_repository.obtener_de_db1(dni)
+            datos = self.usuario_repository.obtener_facturas_db1(dni, limite, offset, desde, hasta, estado)
             if not datos:
                 logging.warning(f"No se encontraron datos para el DNI {dni} en PR_CAU")
                 return {"mensaje": "No se encontraron datos para ese DNI"}, 404
 
-            # Verificar si el cliente existe pero no tiene facturas
+            # Verificar si el cliente existe pero no tiene facturas (o ninguna pasa los filtros)
             if not any(dato.get("NumeroComprobante") for dato in datos):
                 logging.info(f"Cliente con DNI {dni} encontrado, pero no tiene facturas")
                 return {"facturas": [], "mensaje": "No tienes facturas registradas"}, 200
 
-            # Formatear la información de las facturas
-            facturas = []
-            for dato in datos:
-                if not dato.get("NumeroComprobante"):  # Saltar filas sin factura
-                    continue
-                factura_info = {
-                    "Nombre": f"{dato['Apellido']} {dato['Nombre']}".strip() or "Usuario Desconocido",
-                    "DNI": dato["Dni"],
-                    "CodigoSuministro": dato["CodigoSuministro"] if dato["CodigoSuministro"] else "No disponible",
-                    "NumeroComprobante": dato["NumeroComprobante"] if dato["NumeroComprobante"] else "No disponible",
-                    "FechaEmision": (dato["FechaEmision"].strftime("%d/%m/%Y")
-                                     if dato["FechaEmision"] and isinstance(dato["FechaEmision"], datetime)
-                                     else "No disponible"),
-                    "Estado": "Pagada" if dato["EstadoFactura"] == "P" else "Pendiente",
-                    "Total": float(dato["TotalFactura"]) if dato["TotalFactura"] is not None else 0.0,
-                    "Vencimiento": (dato["VencimientoFactura"].strftime("%d/%m/%Y")
-                                    if dato["VencimientoFactura"] and isinstance(dato["VencimientoFactura"], datetime)
-                                    else "No disponible"),
-                    "ObservacionPostal": dato["ObservacionPostal"] if dato["ObservacionPostal"] else "No disponible",
-                    "Barrio": dato["Barrio"] if dato["Barrio"] else "No disponible",
-                    "Calle": dato["Calle"] if dato["Calle"] else "No disponible",
-                    "NumeroMedidor": dato["NumeroMedidor"] if dato["NumeroMedidor"] else "No disponible",
-                    "Periodo": dato["Periodo"] if dato["Periodo"] else "No disponible",
-                    "Consumo": float(dato["Consumo"]) if dato["Consumo"] is not None else 0.0
-                }
-                facturas.append(factura_info)
+            # Formatear la información de las facturas, saltando filas sin factura
+            facturas = [self._formatear(dato) for dato in datos if dato.get("NumeroComprobante")]
 
             logging.info(f"Facturas encontradas para el DNI {dni}: {len(facturas)}")
             return {"facturas": facturas}, 200
 
+        except ValueError as e:
+            logging.warning(f"Filtro de facturas inválido para el DNI {dni}: {str(e)}")
+            return {"error": str(e)}, 400
         except Exception as e:
             logging.error(f"Error al consultar factura para el DNI {dni}: {str(e)}")
-            return {"error": "Error al consultar las facturas", "detalle": str(e)}, 500
\ No newline at end of file
+            return {"error": "Error al consultar las facturas", "detalle": str(e)}, 500
+
+    def ejecutar_tabla(self, dnis: list, desde=None, hasta=None, estado: str = None):
+        """Facturas de varios DNIs (consultas de operador) en un DataFrame formateado por columnas.
+
+        Mismas filas y formato que ejecutar() DNI por DNI, sin paginar; los DNIs que no están en
+        PR_CAU o no tienen facturas no aparecen (ver application.formato_facturas).
+        """
+        try:
+            columnas, filas = self.usuario_repository.obtener_filas_facturas_db1(dnis, desde, hasta, estado)
+            facturas = formatear_facturas(cargar_facturas(columnas, filas))
+            logging.info(f"Facturas encontradas para {len(dnis)} DNIs: {len(facturas)}")
+            return facturas, 200
+        except ValueError as e:
+            logging.warning(f"Filtro de facturas inválido: {str(e)}")
+            return {"error": str(e)}, 400
+        except Exception as e:
+            logging.error(f"Error al consultar facturas de {len(dnis)} DNIs: {str(e)}")
+            return {"error": "Error al consultar las facturas", "detalle": str(e)}, 500
+
+    def ejecutar_ultima(self, dni: str):
+        """Sólo la factura más reciente; el chat muestra una y no necesita el historial."""
+        try:
+            dato = self.usuario_repository.obtener_ultima_factura_db1(dni)
+            if not dato:
+                logging.warning(f"No se encontraron datos para el DNI {dni} en PR_CAU")
+                return {"mensaje": "No se encontraron datos para ese DNI"}, 404
+            if not dato.get("NumeroComprobante"):
+                logging.info(f"Cliente con DNI {dni} encontrado, pero no tiene facturas")
+                return {"facturas": [], "mensaje": "No tienes facturas registradas"}, 200
+            return {"facturas": [self._formatear(dato)]}, 200
+        except Exception as e:
+            logging.error(f"Error al consultar la última factura para el DNI {dni}: {str(e)}")
+            return {"error": "Error al consultar las facturas", "detalle": str(e)}, 500
+
+    # Variación porcentual del último período a partir de la cual el consumo se considera en aumento/baja
+    UMBRAL_TENDENCIA_PCT = 5.0
+
+    def resumir(self, dni: str, periodos: int = 6, hoy: datetime = None):
+        """Deuda y tendencia de consumo calculadas en PR_CAU, listas para mostrar en el chat.
+
+        Las facturas impagas con vencimiento anterior a ``hoy`` (por defecto, ahora) cuentan como vencidas.
+        """
+        try:
+            identidad = self.usuario_repository.obtener_identidad_db1(dni)
+            if not identidad:
+                logging.warning(f"No se encontraron datos para el DNI {dni} en PR_CAU")
+                return {"mensaje": "No se encontraron datos para ese DNI"}, 404
+
+            resumen = self.usuario_repository.obtener_resumen_facturas_db1(dni, hoy or datetime.now())
+            # Del más antiguo al más reciente, que es como se lee una tendencia
+            consumos = list(reversed(self.usuario_repository.obtener_consumos_db1(dni, periodos)))
+
+            deuda = {
+                "total": round(float(resumen["TotalAdeudado"] or 0), 2),
+                "facturas_impagas": int(resumen["FacturasImpagas"] or 0),
+                "facturas_vencidas": int(resumen["FacturasVencidas"] or 0),
+                "total_vencido": round(float(resumen["TotalVencido"] or 0), 2),
+                "proximo_vencimiento": (resumen["ProximoVencimiento"].strftime("%d/%m/%Y")
+                                        if isinstance(resumen["ProximoVencimiento"], datetime) else None),
+            }
+            consumo = [
+                {
+                    "periodo": fila["Periodo"],
+                    "kwh": float(fila["Consumo"] or 0),
+                    "variacion": float(fila["Variacion"]) if fila["Variacion"] is not None else None,
+                    "variacion_pct": (round(float(fila["Variacion"]) * 100 / float(fila["ConsumoAnterior"]), 1)
+                                      if fila["Variacion"] is not None and fila["ConsumoAnterior"] else None),
+                }
+                for fila in consumos
+            ]
+            tendencia = self._tendencia(consumo)
+            nombre = f"{identidad.get('Apellido') or ''} {identidad.get('Nombre') or ''}".strip() or "Usuario Desconocido"
+            return {
+                "nombre": nombre,
+                "dni": dni,
+                "cantidad_facturas": int(resumen["CantidadFacturas"] or 0),
+                "deuda": deuda,
+                "consumo": consumo,
+                "tendencia": tendencia,
+                "mensaje": self._mensaje_resumen(nombre, deuda, consumo, tendencia),
+            }, 200
+        except Exception as e:
+            logging.error(f"Error al resumir facturas para el DNI {dni}: {str(e)}")
+            return {"error": "Error al resumir las facturas", "detalle": str(e)}, 500
+
+    @classmethod
+    def _tendencia(cls, consumo: list) -> str:
+        if not consumo or consumo[-1]["variacion_pct"] is None:
+            return "sin_datos"
+        if consumo[-1]["variacion_pct"] > cls.UMBRAL_TENDENCIA_PCT:
+            return "en_aumento"
+        if consumo[-1]["variacion_pct"] < -cls.UMBRAL_TENDENCIA_PCT:
+            return "en_baja"
+        return "estable"
+
+    @staticmethod
+    def _mensaje_resumen(nombre: str, deuda: dict, consumo: list, tendencia: str) -> str:
+        if deuda["facturas_impagas"]:
+            lineas = [f"💳 {nombre}, debés ${deuda['total']:.2f} en {deuda['facturas_impagas']} factura(s) impaga(s)."]
+            if deuda["facturas_vencidas"]:
+                lineas.append(f"⚠️ {deuda['facturas_vencidas']} vencida(s) por ${deuda['total_vencido']:.2f}.")
+            if deuda["proximo_vencimiento"]:
+                lineas.append(f"⏰ Próximo vencimiento: {deuda['proximo_vencimiento']}.")
+        else:
+            lineas = [f"✅ {nombre}, no tenés facturas impagas."]
+        if consumo:
+            lineas.append("🔋 Consumo: " + " | ".join(f"{fila['periodo']}: {fila['kwh']:g} kWh" for fila in consumo))
+            ultimo = consumo[-1]
+            if tendencia == "en_aumento":
+                lineas.append(f"📈 Tu consumo subió {ultimo['variacion_pct']:g}% respecto del período anterior.")
+            elif tendencia == "en_baja":
+                lineas.append(f"📉 Tu consumo bajó {abs(ultimo['variacion_pct']):g}% respecto del período anterior.")
+            elif tendencia == "estable":
+                lineas.append("➖ Tu consumo se mantiene estable.")
+        return "\n".join(lineas)
+
+    @staticmethod
+    def _formatear(dato: dict) -> dict:
+        return {
+            "Nombre": f"{dato['Apellido']} {dato['Nombre']}".strip() or "Usuario Desconocido",
+            "DNI": dato["Dni"],
+            "CodigoSuministro": dato["CodigoSuministro"] if dato["CodigoSuministro"] else "No disponible",
+            "NumeroComprobante": dato["NumeroComprobante"] if dato["NumeroComprobante"] else "No disponible",
+            "FechaEmision": (dato["FechaEmision"].strftime("%d/%m/%Y")
+                             if dato["FechaEmision"] and isinstance(dato["FechaEmision"], datetime)
+                             else "No disponible"),
+            "Estado": "Pagada" if dato["EstadoFactura"] == "P" else "Pendiente",
+            "Total": float(dato["TotalFactura"]) if dato["TotalFactura"] is not None else 0.0,
+            "Vencimiento": (dato["VencimientoFactura"].strftime("%d/%m/%Y")
+                            if dato["VencimientoFactura"] and isinstance(dato["VencimientoFactura"], datetime)
+                            else "No disponible"),
+            "ObservacionPostal": dato["ObservacionPostal"] if dato["ObservacionPostal"] else "No disponible",
+            "Barrio": dato["Barrio"] if dato["Barrio"] else "No disponible",
+            "Calle": dato["Calle"] if dato["Calle"] else "No disponible",
+            "NumeroMedidor": dato["NumeroMedidor"] if dato["NumeroMedidor"] else "No disponible",
+            "Periodo": dato["Periodo"] if dato["Periodo"] else "No disponible",
+            "Consumo": float(dato["Consumo"]) if dato["Consumo"] is not None else 0.0
+        }
\ No newline at end of file
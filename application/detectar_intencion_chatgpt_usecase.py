@@ -1,12 +1,120 @@
 # application/detectar_intencion_chatgpt_usecase.py
-from application.chatgpt_service import ChatGPTService
+from starlette.concurrency import run_in_threadpool
+from application.chatgpt_service import ChatGPTService, ORIGEN_LLM
+from application.clasificador_intenciones import ClasificadorIntenciones, INTENCIONES_FLUJO, preprocesar
+from infrastructure.configuracion import leer_config
+import logging
+import json
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+# Confianza de las reglas a partir de la cual no se llama a ChatGPT (más de 1 las deshabilita)
+INTENCION_REGLAS_UMBRAL = leer_config("INTENCION_REGLAS_UMBRAL", 0.7, float)
+# Probabilidad del modelo de intenciones a partir de la cual no se llama a ChatGPT
+INTENCION_MODELO_UMBRAL = leer_config("INTENCION_MODELO_UMBRAL", 0.85, float)
+
+# Respuesta de las intenciones resueltas sin ChatGPT (los mismos textos que usa ChattigoAdapter)
+RESPUESTAS_REGLAS = {
+    "Reclamo": (
+        "💡 Lamentamos mucho escuchar que estás teniendo problemas con nuestro servicio. "
+        "Para ayudarte con tu reclamo, por favor, dime tu número de DNI. "
+        "¡Estaremos atentos para resolverlo lo antes posible! 🙏"
+    ),
+    "Actualizar": (
+        "📋 ¿Qué dato te gustaría actualizar hoy?\n"
+        "🏠 Calle\n"
+        "🏘️ Barrio\n"
+        "📱 Celular\n"
+        "✉️ Correo\n"
+        "Por favor, elige una opción (por ejemplo, escribe 'calle')."
+    ),
+    "Consultar": (
+        "📋 ¡Hola! Entiendo que deseas ver tus reclamos. "
+        "Para ayudarte con eso, por favor proporciona tu número de DNI. ✨ ¡Gracias!"
+    ),
+    "ConsultarFacturas": "📄 Por favor, dame tu DNI para consultar tu factura. ✨",
+}
 
 class DetectarIntencionChatGPTUseCase:
-    def __init__(self, chatgpt_service: ChatGPTService):
+    """Detección de intención en tres pasos, del más barato al más caro: reglas, el modelo de
+    intenciones entrenado (ambos en proceso, sin red) y sólo si ninguno decide, ChatGPT.
+
+    Devuelve siempre el JSON ``{"intencion", "respuesta"}`` del modelo; lo resuelto en proceso
+    lleva además ``"origen"`` ("reglas" o "modelo"). El modelo sólo saltea a ChatGPT en las
+    intenciones de flujo: la charla necesita el texto que escribe el LLM. Las intenciones que
+    contesta el modelo de ChatGPT (no las de sus cachés) se registran (si hay ``registro``) para
+    reentrenar el modelo.
+    """
+
+    def __init__(self, chatgpt_service: ChatGPTService, clasificador: ClasificadorIntenciones = None,
+                 umbral: float = INTENCION_REGLAS_UMBRAL, modelo=None, umbral_modelo: float = INTENCION_MODELO_UMBRAL,
+                 registro=None):
         self.chatgpt_service = chatgpt_service
+        self.clasificador = clasificador or ClasificadorIntenciones(umbral=umbral)
+        self.modelo = modelo
+        self.umbral_modelo = umbral_modelo
+        self.registro = registro
+        self.mensajes = 0
+        self.por_origen = {"reglas": 0, "modelo": 0, "llm": 0}
+        self.por_intencion = {}
+
+    def clasificar(self, mensaje):
+        """``(intencion, confianza)`` de las reglas sobre el mensaje preprocesado."""
+        return self.clasificador.clasificar(preprocesar(mensaje or ""))
+
+    def _resuelta(self, intencion, origen):
+        self.por_origen[origen] += 1
+        self.por_intencion[intencion] = self.por_intencion.get(intencion, 0) + 1
+        return json.dumps({"intencion": intencion, "respuesta": RESPUESTAS_REGLAS[intencion], "origen": origen},
+                          ensure_ascii=False)
+
+    def _en_proceso(self, texto):
+        self.mensajes += 1
+        intencion, confianza = self.clasificador.clasificar(texto)
+        if intencion is not None and confianza >= self.clasificador.umbral:
+            logging.info(f"Intención {intencion} resuelta por reglas (confianza {confianza}), sin llamar a ChatGPT")
+            return self._resuelta(intencion, "reglas")
+        if self.modelo is not None:
+            intencion, probabilidad = self.modelo.predecir(texto)
+            if intencion in INTENCIONES_FLUJO and probabilidad >= self.umbral_modelo:
+                logging.info(f"Intención {intencion} resuelta por el modelo {self.modelo.version} (p={probabilidad:.3f}), sin llamar a ChatGPT")
+                return self._resuelta(intencion, "modelo")
+        return None
+
+    async def _registrar(self, texto, respuesta_cruda, origen):
+        self.por_origen["llm"] += 1
+        # Sólo las respuestas nuevas del modelo son etiquetas: las de caché repetirían el par (y
+        # sumarían votos al deduplicar) y las de error o "no entendí" las escribimos nosotros
+        if self.registro is None or origen != ORIGEN_LLM:
+            return
+        try:
+            intencion = json.loads(respuesta_cruda).get("intencion")
+        except (ValueError, AttributeError):
+            return
+        # Escritura bloqueante en disco (con lock): va a un hilo para no frenar el event loop
+        await run_in_threadpool(self.registro.registrar, texto, intencion, ORIGEN_LLM)
+
+    async def ejecutar(self, mensaje):
+        return await self.ejecutar_con_historial(mensaje, "")
 
-    def ejecutar(self, mensaje):
-        return self.chatgpt_service.detectar_intencion(mensaje)
+    async def ejecutar_con_historial(self, mensaje, historial):
+        texto = preprocesar(mensaje or "")
+        respuesta = self._en_proceso(texto)
+        if respuesta is not None:
+            return respuesta
+        respuesta_cruda, origen = await self.chatgpt_service.detectar_intencion_con_origen(mensaje, historial)
+        await self._registrar(texto, respuesta_cruda, origen)
+        return respuesta_cruda
 
-    def ejecutar_con_historial(self, mensaje, historial):
-        return self.chatgpt_service.detectar_intencion(mensaje, historial)
\ No newline at end of file
+    def resumen(self) -> dict:
+        sin_llm = self.por_origen["reglas"] + self.por_origen["modelo"]
+        return {
+            "mensajes": self.mensajes,
+            "resueltos_sin_llm": sin_llm,
+            "proporcion_sin_llm": round(sin_llm / self.mensajes, 4) if self.mensajes else 0.0,
+            "por_origen": dict(self.por_origen),
+            "por_intencion": dict(self.por_intencion),
+            "umbral": self.clasificador.umbral,
+            "modelo": self.modelo.version if self.modelo is not None else None,
+            "umbral_modelo": self.umbral_modelo,
+        }
@@ -0,0 +1,197 @@
+# application/exportar_reclamos_usecase.py
+import logging
+import glob
+import os
+import re
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from infrastructure.configuracion import leer_config
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+# Export de Reclamos + Clientes a Parquet para BI. Columnas planas (sin el dict "cliente" del
+# listado), en el orden de SQLAlchemyReclamoRepository.COLUMNAS_LISTADO salvo el ID_USUARIO
+# repetido de Clientes. Cada lote del cursor se escribe como un row group: la memoria queda
+# acotada al tamaño del lote sin importar el largo de la tabla.
+ESQUEMA_RECLAMOS = pa.schema([
+    ("ID_RECLAMO", pa.int64()),
+    ("ID_USUARIO", pa.int64()),
+    ("DESCRIPCION", pa.string()),
+    ("ESTADO", pa.string()),
+    ("FECHA_RECLAMO", pa.timestamp("ms")),
+    ("FECHA_CIERRE", pa.timestamp("ms")),
+    ("NOMBRE_COMPLETO", pa.string()),
+    ("DNI", pa.string()),
+    ("CELULAR", pa.string()),
+    ("EMAIL", pa.string()),
+    ("CALLE", pa.string()),
+    ("BARRIO", pa.string()),
+    ("CODIGO_POSTAL", pa.string()),
+    ("CODIGO_SUMINISTRO", pa.string()),
+    ("NUMERO_MEDIDOR", pa.string()),
+])
+# Posiciones en la fila de COLUMNAS_LISTADO de cada columna del esquema (la 6 es Clientes.ID_USUARIO)
+_POSICIONES = (0, 1, 2, 3, 4, 5, 7, 8, 9, 10, 11, 12, 13, 14, 15)
+
+COMPRESION = "zstd"
+# Archivos del export incremental: reclamos_<primer ID_RECLAMO>_<último ID_RECLAMO>.parquet
+_ARCHIVO = re.compile(r"^reclamos_(\d+)_(\d+)\.parquet$")
+# IDs por debajo de la marca de agua que cada corrida incremental vuelve a leer. ID_RECLAMO es
+# IDENTITY: se asigna al insertar pero las transacciones pueden confirmarse en otro orden, así que
+# un reclamo con ID menor que la marca puede aparecer después de exportada la marca. Los que ya
+# están en los archivos se descartan; uno que tarde más que la ventana en confirmarse sólo entra
+# con --completo.
+VENTANA_RELECTURA = leer_config("EXPORT_RECLAMOS_VENTANA", 1000, int)
+
+def lote_a_tabla(filas: list) -> pa.Table:
+    """Tabla de Arrow con ESQUEMA_RECLAMOS desde las tuplas del cursor (una columna por vez)."""
+    columnas = list(zip(*filas))
+    return pa.Table.from_arrays(
+        [pa.array(columnas[posicion], type=campo.type) for posicion, campo in zip(_POSICIONES, ESQUEMA_RECLAMOS)],
+        schema=ESQUEMA_RECLAMOS,
+    )
+
+class _SalidaEnPartes:
+    """Archivo de sólo escritura que acumula lo escrito hasta que se retira con ``retirar``.
+
+    ``tell`` devuelve la posición total (ParquetWriter la usa para los offsets del footer), así
+    que se puede ir enviando el archivo por partes mientras se escribe.
+    """
+
+    def __init__(self):
+        self._partes = []
+        self._posicion = 0
+        self.closed = False
+
+    def write(self, datos) -> int:
+        datos = bytes(datos)
+        self._partes.append(datos)
+        self._posicion += len(datos)
+        return len(datos)
+
+    def tell(self) -> int:
+        return self._posicion
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def retirar(self) -> bytes:
+        datos = b"".join(self._partes)
+        self._partes.clear()
+        return datos
+
+class EscritorParquet:
+    """Escribe lotes de filas de reclamos como row groups de un Parquet.
+
+    Sin ``destino`` el archivo se arma en memoria por partes: ``escribir`` y ``cerrar`` devuelven
+    los bytes generados desde la llamada anterior, para transmitirlos (StreamingResponse).
+    """
+
+    def __init__(self, destino: str = None):
+        self._salida = _SalidaEnPartes() if destino is None else None
+        self._escritor = pq.ParquetWriter(
+            destino if destino is not None else pa.PythonFile(self._salida, mode="w"),
+            ESQUEMA_RECLAMOS,
+            compression=COMPRESION,
+        )
+        self.filas = 0
+        self.ultimo_id = None
+
+    def _retirar(self) -> bytes:
+        return self._salida.retirar() if self._salida is not None else b""
+
+    def escribir(self, filas: list) -> bytes:
+        if filas:
+            self._escritor.write_table(lote_a_tabla(filas))
+            self.filas += len(filas)
+            self.ultimo_id = filas[-1][0]
+        return self._retirar()
+
+    def cerrar(self) -> bytes:
+        self._escritor.close()
+        return self._retirar()
+
+def ultimo_id_exportado(directorio: str) -> int:
+    """Marca de agua del export incremental: el mayor ID_RECLAMO de los archivos del directorio."""
+    ultimos = [
+        int(coincidencia.group(2))
+        for archivo in glob.glob(os.path.join(directorio, "reclamos_*.parquet"))
+        if (coincidencia := _ARCHIVO.match(os.path.basename(archivo)))
+    ]
+    return max(ultimos, default=0)
+
+def ids_exportados(directorio: str, desde: int) -> set:
+    """ID_RECLAMO >= ``desde`` que ya están en los archivos del directorio (sólo lee esa columna)."""
+    ids = set()
+    for archivo in glob.glob(os.path.join(directorio, "reclamos_*.parquet")):
+        coincidencia = _ARCHIVO.match(os.path.basename(archivo))
+        if coincidencia and int(coincidencia.group(2)) >= desde:
+            columna = pq.read_table(archivo, columns=["ID_RECLAMO"]).column("ID_RECLAMO").to_pylist()
+            ids.update(id_reclamo for id_reclamo in columna if id_reclamo >= desde)
+    return ids
+
+class ExportarReclamosUseCase:
+    """Export incremental de reclamos a un directorio de archivos Parquet.
+
+    Cada corrida escribe en un archivo nuevo los ID_RECLAMO mayores que la marca de agua (el
+    nombre del último archivo) más los de la ``ventana`` de abajo que todavía no estaban
+    exportados. Los cambios de estado de reclamos ya exportados no se vuelven a exportar; para
+    eso está ``completo``, que reemplaza todos los archivos por uno solo.
+    """
+
+    def __init__(self, reclamo_repository, tamano_lote: int = 5000, ventana: int = VENTANA_RELECTURA):
+        self.reclamo_repository = reclamo_repository
+        self.tamano_lote = tamano_lote
+        self.ventana = ventana
+
+    def ejecutar(self, directorio: str, completo: bool = False):
+        temporal = escritor = None
+        try:
+            os.makedirs(directorio, exist_ok=True)
+            marca = 0 if completo else ultimo_id_exportado(directorio)
+            after = max(marca - self.ventana, 0)
+            exportados = ids_exportados(directorio, after + 1) if after < marca else set()
+            temporal = os.path.join(directorio, f".reclamos_{marca}.parquet.tmp")
+            logging.info(f"Exportando reclamos con ID_RECLAMO > {after} a {directorio} "
+                         f"({len(exportados)} ya exportados en la ventana)")
+
+            escritor = EscritorParquet(temporal)
+            primero = None
+            for lote in self.reclamo_repository.iterar_filas(self.tamano_lote, after or None):
+                if exportados:
+                    lote = [fila for fila in lote if fila[0] not in exportados]
+                if primero is None and lote:
+                    primero = lote[0][0]
+                escritor.escribir(lote)
+            escritor.cerrar()
+
+            if not escritor.filas:
+                os.remove(temporal)
+                logging.info("No hay reclamos nuevos para exportar")
+                return {"exportados": 0, "ultimo_id_reclamo": marca, "archivo": None}, 200
+            # El archivo aparece con su nombre final sólo completo: una corrida cortada no mueve la marca
+            archivo = os.path.join(directorio, f"reclamos_{primero:010d}_{escritor.ultimo_id:010d}.parquet")
+            anteriores = glob.glob(os.path.join(directorio, "reclamos_*.parquet")) if completo else []
+            os.replace(temporal, archivo)
+            # Un export completo reemplaza a los incrementales anteriores
+            for anterior in anteriores:
+                if anterior != archivo and _ARCHIVO.match(os.path.basename(anterior)):
+                    os.remove(anterior)
+            resumen = {"exportados": escritor.filas, "ultimo_id_reclamo": max(marca, escritor.ultimo_id), "archivo": archivo}
+            logging.info(f"Export de reclamos terminado: {resumen}")
+            return resumen, 200
+        except Exception as e:
+            logging.error(f"Error al exportar los reclamos a Parquet: {str(e)}")
+            if escritor is not None:
+                try:
+                    escritor.cerrar()
+                except Exception:
+                    pass
+            if temporal is not None and os.path.exists(temporal):
+                os.remove(temporal)
+            return {"error": "Error al exportar los reclamos", "detalle": str(e)}, 500
@@ -0,0 +1,73 @@
+# application/formato_facturas.py
+import io
+import logging
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+# Camino columnar de ConsultarFacturasUseCase para consultas de operador/masivas: mismo
+# resultado que _formatear fila por fila, pero calculado por columnas sobre un DataFrame.
+
+NO_DISPONIBLE = "No disponible"
+
+# Columnas de texto que se muestran tal cual o "No disponible" si vienen vacías
+_COLUMNAS_TEXTO = (
+    "CodigoSuministro", "NumeroComprobante", "ObservacionPostal", "Barrio", "Calle", "NumeroMedidor", "Periodo",
+)
+
+# Orden de las columnas de salida (el de ConsultarFacturasUseCase._formatear)
+COLUMNAS_FACTURA = (
+    "Nombre", "DNI", "CodigoSuministro", "NumeroComprobante", "FechaEmision", "Estado", "Total",
+    "Vencimiento", "ObservacionPostal", "Barrio", "Calle", "NumeroMedidor", "Periodo", "Consumo",
+)
+
+def _texto(serie: pd.Series) -> pd.Series:
+    vacia = serie.isna() | (serie.astype(object) == "")
+    return serie.astype(object).where(~vacia, NO_DISPONIBLE)
+
+def _fecha(serie: pd.Series) -> pd.Series:
+    # strftime es por elemento; las facturas comparten pocas fechas (ciclos de facturación), así
+    # que se formatea cada fecha distinta una vez. El código -1 (NaT) toma el "No disponible" final.
+    codigos, fechas = pd.factorize(pd.to_datetime(serie, errors="coerce"))
+    textos = np.append(fechas.strftime("%d/%m/%Y").to_numpy(dtype=object), NO_DISPONIBLE)
+    return pd.Series(textos[codigos], index=serie.index)
+
+def _numero(serie: pd.Series) -> pd.Series:
+    # Los Decimal de pyodbc llegan como object; to_numeric los pasa a float64
+    return pd.to_numeric(serie, errors="coerce").astype("float64").fillna(0.0)
+
+def cargar_facturas(columnas: list, filas: list) -> pd.DataFrame:
+    """DataFrame desde las tuplas del cursor, sin pasar por un dict por fila."""
+    return pd.DataFrame.from_records(filas, columns=columnas)
+
+def formatear_facturas(filas: pd.DataFrame) -> pd.DataFrame:
+    """Formatea las filas factura × consumo de obtener_facturas_db1 (columnas por label) en bloque."""
+    filas = filas[filas["NumeroComprobante"].notna() & (filas["NumeroComprobante"].astype(object) != "")]
+    nombre = (filas["Apellido"].fillna("").astype(str) + " " + filas["Nombre"].fillna("").astype(str)).str.strip()
+    formateadas = pd.DataFrame({
+        "Nombre": nombre.where(nombre != "", "Usuario Desconocido"),
+        "DNI": filas["Dni"],
+        "FechaEmision": _fecha(filas["FechaEmision"]),
+        "Estado": np.where(filas["EstadoFactura"] == "P", "Pagada", "Pendiente"),
+        "Total": _numero(filas["TotalFactura"]),
+        "Vencimiento": _fecha(filas["VencimientoFactura"]),
+        "Consumo": _numero(filas["Consumo"]),
+        **{columna: _texto(filas[columna]) for columna in _COLUMNAS_TEXTO},
+    })
+    return formateadas.loc[:, list(COLUMNAS_FACTURA)].reset_index(drop=True)
+
+def a_json(facturas: pd.DataFrame) -> bytes:
+    """``{"facturas": [...]}`` serializado directo desde el DataFrame."""
+    registros = facturas.to_json(orient="records", force_ascii=False, double_precision=15)
+    return b'{"facturas":' + registros.encode("utf-8") + b"}"
+
+def a_arrow_ipc(facturas: pd.DataFrame) -> bytes:
+    """Stream IPC de Arrow (application/vnd.apache.arrow.stream) para clientes columnares."""
+    tabla = pa.Table.from_pandas(facturas, preserve_index=False)
+    salida = io.BytesIO()
+    with pa.ipc.new_stream(salida, tabla.schema) as escritor:
+        escritor.write_table(tabla)
+    return salida.getvalue()
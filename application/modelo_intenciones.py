@@ -0,0 +1,190 @@
+# application/modelo_intenciones.py
+from datetime import datetime
+import numpy as np
+import unicodedata
+import logging
+import zlib
+import json
+import os
+import re
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+# Modelo de intenciones liviano (CPU, en proceso): regresión logística multinomial sobre
+# n-gramas hasheados, con NumPy. Se entrena offline con los pares (texto preprocesado, intención)
+# que etiquetó ChatGPT (python -m infrastructure.entrenar_modelo_intenciones) y predice en
+# microsegundos. Cada entrenamiento se guarda como una versión en disco; el archivo "actual" del
+# directorio dice cuál se sirve.
+
+# Columnas del espacio hasheado (2^18): pocas colisiones con los vocabularios de chat
+DIMENSION = 1 << 18
+ARCHIVO_ACTUAL = "actual"
+_VERSION = re.compile(r"^intenciones_(\d{8}-\d{6})\.npz$")
+_PALABRA = re.compile(r"\w+")
+
+def _sin_tildes(texto: str) -> str:
+    return "".join(caracter for caracter in unicodedata.normalize("NFKD", texto) if not unicodedata.combining(caracter))
+
+def caracteristicas(texto: str, dimension: int = DIMENSION) -> np.ndarray:
+    """Índices (sin repetir) de palabras, pares de palabras y trigramas de caracteres de cada palabra.
+
+    El hash es crc32 y no ``hash()``, que cambia en cada proceso: el modelo guardado tiene que
+    ver las mismas columnas al cargarse en otro worker.
+    """
+    palabras = _PALABRA.findall(_sin_tildes(texto.lower()))
+    terminos = [f"p:{palabra}" for palabra in palabras]
+    terminos += [f"b:{a} {b}" for a, b in zip(palabras, palabras[1:])]
+    for palabra in palabras:
+        marcada = f"<{palabra}>"
+        terminos += [f"c:{marcada[i:i + 3]}" for i in range(len(marcada) - 2)]
+    # Término constante: hace de sesgo por clase
+    terminos.append("sesgo")
+    return np.unique(np.fromiter((zlib.crc32(termino.encode("utf-8")) % dimension for termino in terminos),
+                                 dtype=np.int64, count=len(terminos)))
+
+def _softmax(logits: np.ndarray) -> np.ndarray:
+    logits = logits - logits.max(axis=-1, keepdims=True)
+    exp = np.exp(logits)
+    return exp / exp.sum(axis=-1, keepdims=True)
+
+class ModeloIntenciones:
+    """Pesos ``(columnas usadas × clases)``: sólo se guardan las columnas que aparecieron al entrenar.
+
+    ``_fila`` lleva cada columna hasheada a su fila de pesos (las no vistas, a una fila de ceros).
+    """
+
+    def __init__(self, clases: list, columnas: np.ndarray, pesos: np.ndarray, metadatos: dict = None):
+        self.clases = list(clases)
+        self.columnas = np.asarray(columnas, dtype=np.int64)
+        self.pesos = np.vstack([np.asarray(pesos, dtype=np.float32), np.zeros((1, len(self.clases)), dtype=np.float32)])
+        self.metadatos = metadatos or {}
+        self.dimension = int(self.metadatos.get("dimension", DIMENSION))
+        self._fila = np.full(self.dimension, len(self.columnas), dtype=np.int32)
+        self._fila[self.columnas] = np.arange(len(self.columnas), dtype=np.int32)
+
+    @property
+    def version(self):
+        return self.metadatos.get("version")
+
+    def probabilidades(self, texto: str) -> np.ndarray:
+        return _softmax(self.pesos[self._fila[caracteristicas(texto, self.dimension)]].sum(axis=0))
+
+    def predecir(self, texto: str):
+        """``(intencion, probabilidad)`` de un texto ya preprocesado."""
+        probabilidades = self.probabilidades(texto)
+        mejor = int(probabilidades.argmax())
+        return self.clases[mejor], float(probabilidades[mejor])
+
+    @classmethod
+    def entrenar(cls, textos: list, intenciones: list, epocas: int = 300, tasa: float = 0.5,
+                 regularizacion: float = 1e-4, dimension: int = DIMENSION):
+        """Descenso por gradiente (AdaGrad) de la entropía cruzada, con todos los ejemplos en cada época.
+
+        Con decenas de miles de mensajes cortos entra holgado en memoria y tarda segundos.
+        """
+        clases = sorted(set(intenciones))
+        indice_clase = {clase: i for i, clase in enumerate(clases)}
+        y = np.array([indice_clase[intencion] for intencion in intenciones], dtype=np.int64)
+        listas = [caracteristicas(texto, dimension) for texto in textos]
+        # Matriz dispersa como (columna, fila del ejemplo) de cada término, remapeada a columnas usadas
+        columnas, compactas = np.unique(np.concatenate(listas), return_inverse=True)
+        filas = np.repeat(np.arange(len(listas)), [len(lista) for lista in listas])
+        largos = np.array([len(lista) for lista in listas])
+        inicios = np.concatenate(([0], np.cumsum(largos)[:-1]))
+        objetivo = np.eye(len(clases), dtype=np.float64)[y]
+
+        pesos = np.zeros((len(columnas), len(clases)))
+        acumulado = np.full_like(pesos, 1e-8)
+        for _ in range(epocas):
+            logits = np.add.reduceat(pesos[compactas], inicios, axis=0)
+            error = (_softmax(logits) - objetivo) / len(y)
+            # Suma por columna con bincount (una pasada por clase; np.add.at es varias veces más lento)
+            contribucion = error[filas]
+            gradiente = np.column_stack([
+                np.bincount(compactas, weights=contribucion[:, c], minlength=len(columnas)) for c in range(len(clases))
+            ])
+            gradiente += regularizacion * pesos
+            acumulado += gradiente ** 2
+            pesos -= tasa * gradiente / np.sqrt(acumulado)
+        metadatos = {"dimension": dimension, "ejemplos": len(y), "epocas": epocas, "tasa": tasa,
+                     "regularizacion": regularizacion, "clases": clases}
+        return cls(clases, columnas, pesos, metadatos)
+
+    def guardar(self, directorio: str, activar: bool = False) -> str:
+        """Escribe una versión nueva ``intenciones_<fecha-hora>.npz``; con ``activar`` pasa a ser la actual."""
+        os.makedirs(directorio, exist_ok=True)
+        version = datetime.now().strftime("%Y%m%d-%H%M%S")
+        self.metadatos["version"] = version
+        archivo = os.path.join(directorio, f"intenciones_{version}.npz")
+        temporal = archivo + ".tmp"
+        with open(temporal, "wb") as salida:
+            np.savez_compressed(salida, columnas=self.columnas, pesos=self.pesos[:-1],
+                                metadatos=np.array(json.dumps(self.metadatos, ensure_ascii=False)))
+        os.replace(temporal, archivo)
+        if activar:
+            activar_version(directorio, version)
+        logging.info(f"Modelo de intenciones guardado: {archivo}")
+        return archivo
+
+    @classmethod
+    def cargar(cls, archivo: str):
+        with np.load(archivo) as datos:
+            metadatos = json.loads(str(datos["metadatos"]))
+            return cls(metadatos["clases"], datos["columnas"], datos["pesos"], metadatos)
+
+def evaluar(modelo: ModeloIntenciones, textos: list, intenciones: list, umbral: float, intenciones_flujo=()) -> dict:
+    """Exactitud contra las etiquetas (las de ChatGPT), por clase, y lo que pasaría al servirlo con ``umbral``.
+
+    ``cobertura`` es la proporción de mensajes que el modelo resolvería sin ChatGPT (intención de
+    flujo con probabilidad >= umbral) y ``exactitud_cubiertos`` cuántos de esos acierta: es el
+    número que importa para subir o bajar INTENCION_MODELO_UMBRAL.
+    """
+    if not textos:
+        return {"ejemplos": 0}
+    predicciones = [modelo.predecir(texto) for texto in textos]
+    aciertos = np.array([prediccion == real for (prediccion, _), real in zip(predicciones, intenciones)])
+    cubiertos = np.array([prediccion in intenciones_flujo and probabilidad >= umbral for prediccion, probabilidad in predicciones])
+    por_clase = {}
+    for clase in sorted(set(intenciones) | set(modelo.clases)):
+        reales = np.array([real == clase for real in intenciones])
+        predichas = np.array([prediccion == clase for prediccion, _ in predicciones])
+        verdaderos = int((reales & predichas).sum())
+        por_clase[clase] = {
+            "ejemplos": int(reales.sum()),
+            "precision": round(verdaderos / predichas.sum(), 4) if predichas.any() else None,
+            "recall": round(verdaderos / reales.sum(), 4) if reales.any() else None,
+        }
+    return {
+        "ejemplos": len(textos),
+        "exactitud": round(float(aciertos.mean()), 4),
+        "umbral": umbral,
+        "cobertura": round(float(cubiertos.mean()), 4),
+        "exactitud_cubiertos": round(float(aciertos[cubiertos].mean()), 4) if cubiertos.any() else None,
+        "por_clase": por_clase,
+    }
+
+def versiones(directorio: str) -> list:
+    """Versiones guardadas en el directorio, de la más vieja a la más nueva."""
+    if not os.path.isdir(directorio):
+        return []
+    return sorted(coincidencia.group(1) for archivo in os.listdir(directorio) if (coincidencia := _VERSION.match(archivo)))
+
+def activar_version(directorio: str, version: str):
+    if version not in versiones(directorio):
+        raise ValueError(f"No existe la versión {version} del modelo de intenciones en {directorio}")
+    temporal = os.path.join(directorio, ARCHIVO_ACTUAL + ".tmp")
+    with open(temporal, "w", encoding="utf-8") as salida:
+        salida.write(version)
+    os.replace(temporal, os.path.join(directorio, ARCHIVO_ACTUAL))
+
+def cargar_modelo_actual(directorio: str):
+    """El modelo de la versión activa del directorio, o None si todavía no se entrenó ninguno."""
+    try:
+        with open(os.path.join(directorio, ARCHIVO_ACTUAL), encoding="utf-8") as entrada:
+            version = entrada.read().strip()
+        modelo = ModeloIntenciones.cargar(os.path.join(directorio, f"intenciones_{version}.npz"))
+        logging.info(f"Modelo de intenciones {version} cargado ({len(modelo.columnas)} columnas, clases {modelo.clases})")
+        return modelo
+    except FileNotFoundError:
+        logging.info(f"No hay modelo de intenciones activo en {directorio}")
+        return None
@@ -2,30 +2,36 @@ import logging
 import time
 from openai import OpenAI
 from infrastructure.settings import Config
+from infrastructure.respuestas_llm_cache import obtener_cache_respuestas_llm
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
 
+MODELO = "deepseek-chat"
+# Entra en la clave de la caché de respuestas: subirla al cambiar el prompt
+VERSION_PROMPT = "v3"
+
 
 class DeepSeekService:
-    def __init__(self, redis_client=None):
+    def __init__(self, redis_client=None, cache=None):
         self.client = OpenAI(api_key=Config.DEEPSEEK_API_KEY, base_url="https://api.deepseek.com")
         self.redis_client = redis_client
+        self.cache = cache if cache is not None else (obtener_cache_respuestas_llm(redis_client) if redis_client else None)
         logging.info("DeepSeekService inicializado con API Key y endpoint configurados.")
 
     def generar_respuesta(self, prompt):
         try:
-            # Verificar caché
-            if self.redis_client:
-                cache_key = f"deepseek:v3:{hash(prompt)}"  # Usar hash para claves únicas
-                cached_response = self.redis_client.get(cache_key)
-                if cached_response:
+            # Verificar caché (sin historial: el prompt no lo usa)
+            cache_key = self.cache.clave("deepseek", MODELO, VERSION_PROMPT, prompt) if self.cache else None
+            if cache_key:
+                cached_response = self.cache.obtener(cache_key)
+                if cached_response is not None:
                     logging.info(f"Respuesta obtenida del caché: {cached_response}")
-                    return cached_response.decode('utf-8')
+                    return cached_response
 
             # Generar respuesta con streaming
             start_time = time.time()
             response = self.client.chat.completions.create(
-                model="deepseek-chat",
+                model=MODELO,
                 messages=[
                     {"role": "system",
                      "content": "Eres DECSA. Responde en JSON con 'intencion' (Reclamo, Actualizar, Consultar, Conversar) y 'respuesta'."},
@@ -61,10 +67,9 @@ class DeepSeekService:
                 texto_respuesta = texto_respuesta[4:].strip()
             logging.info(f"Respuesta completa de DeepSeek: {texto_respuesta}")
 
-            # Guardar en caché
-            if self.redis_client:
-                self.redis_client.setex(cache_key, 3600, texto_respuesta)
-                logging.info(f"Respuesta guardada en caché con clave: {cache_key}")
+            # Guardar en caché (sólo si es JSON con una intención conocida)
+            if cache_key:
+                self.cache.guardar(cache_key, texto_respuesta, total_time)
 
             return texto_respuesta
         except Exception as e:
@@ -3,25 +3,41 @@ import logging
 import time
 import google.generativeai as genai
 from infrastructure.settings import Config
+from infrastructure.respuestas_llm_cache import obtener_cache_respuestas_llm
+from infrastructure.respuestas_similares_cache import obtener_cache_similares, es_apertura
 import json
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
 
+MODELO = "gemini-1.5-flash"
+# Entra en la clave de la caché de respuestas: subirla al cambiar el prompt
+VERSION_PROMPT = "v1"
+
 class GeminiService:
-    def __init__(self, redis_client=None):
+    def __init__(self, redis_client=None, cache=None, similares=None):
         genai.configure(api_key=Config.GEMINI_API_KEY)
-        self.model = genai.GenerativeModel("gemini-1.5-flash")
+        self.model = genai.GenerativeModel(MODELO)
         self.redis_client = redis_client
+        self.cache = cache if cache is not None else (obtener_cache_respuestas_llm(redis_client) if redis_client else None)
+        # Aperturas parecidas ("no tengo luz!!", "no tengo luzz") reusan la respuesta, en memoria del proceso
+        self.similares = similares if similares is not None else obtener_cache_similares()
         logging.info("GeminiService inicializado con API Key configurada.")
 
     def generar_respuesta(self, prompt, historial=""):
         try:
-            if self.redis_client:
-                cache_key = f"gemini:v1:{hash(prompt + historial)}"
-                cached_response = self.redis_client.get(cache_key)
-                if cached_response:
+            cache_key = self.cache.clave("gemini", MODELO, VERSION_PROMPT, prompt, historial) if self.cache else None
+            espacio = f"gemini:{MODELO}:{VERSION_PROMPT}" if self.similares and es_apertura(historial) else None
+            if cache_key:
+                cached_response = self.cache.obtener(cache_key)
+                if cached_response is not None:
                     logging.info(f"Respuesta obtenida del caché: {cached_response}")
-                    return cached_response.decode('utf-8')
+                    if espacio:
+                        self.similares.guardar(espacio, prompt, cached_response)
+                    return cached_response
+            if espacio:
+                similar_response = self.similares.obtener(espacio, prompt)
+                if similar_response is not None:
+                    return similar_response
 
             full_prompt = f"""
             Eres DECSA, un asistente virtual oficial de Distribuidora Eléctrica de Caucete S.A. (DECSA). Tu función es ayudar a los usuarios con:
@@ -72,11 +88,12 @@ class GeminiService:
                 json.loads(texto_respuesta)
             except json.JSONDecodeError:
                 logging.warning(f"Respuesta incompleta o inválida: {texto_respuesta}")
-                texto_respuesta = '{"intencion": "Conversar", "respuesta": "No entendí bien tu mensaje. ¿En qué puedo ayudarte hoy? Puedes decirme si quieres hacer un reclamo, actualizar datos o consultar algo."}'
+                return '{"intencion": "Conversar", "respuesta": "No entendí bien tu mensaje. ¿En qué puedo ayudarte hoy? Puedes decirme si quieres hacer un reclamo, actualizar datos o consultar algo."}'
 
-            if self.redis_client:
-                self.redis_client.setex(cache_key, 3600, texto_respuesta)
-                logging.info(f"Respuesta guardada en caché con clave: {cache_key}")
+            if cache_key:
+                self.cache.guardar(cache_key, texto_respuesta, first_chunk_time - start_time)
+            if espacio:
+                self.similares.guardar(espacio, prompt, texto_respuesta)
 
             return texto_respuesta
         except Exception as e:
@@ -0,0 +1,70 @@
+# application/sincronizar_clientes_usecase.py
+import logging
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+class SincronizarClientesUseCase:
+    """Copia incremental de PERSONAS (+ suministro y domicilio) de PR_CAU a Clientes de DECSA_EXC.
+
+    Con Clientes al día, el chat valida un DNI con una sola lectura indexada en db2 y
+    copiar_cliente_a_db2 queda como respaldo para las altas posteriores a la última corrida.
+    Cada corrida hace dos pasadas:
+
+    1. Personas nuevas: COD_PER mayor que la marca de agua, en lotes por COD_PER.
+    2. Personas ya sincronizadas con facturas nuevas (ID_FAC mayor que la marca), porque la
+       última factura define el suministro, el medidor y el domicilio.
+
+    Las marcas se guardan en SincronizacionClientes después de cada lote, así una corrida
+    interrumpida retoma donde quedó.
+    """
+
+    NOMBRE = "pr_cau_clientes"
+
+    def __init__(self, usuario_repository, tamano_lote: int = 500):
+        self.usuario_repository = usuario_repository
+        self.tamano_lote = tamano_lote
+
+    def ejecutar(self, completo: bool = False):
+        """``completo=True`` vuelve a recorrer todas las personas desde COD_PER 0."""
+        try:
+            marca = self.usuario_repository.obtener_marca_sincronizacion(self.NOMBRE)
+            desde_cod_per = 0 if completo else marca["ULTIMO_COD_PER"]
+            desde_id_fac = marca["ULTIMO_ID_FAC"]
+            # Tope fijo para la pasada de facturas: lo que se facture durante la corrida queda para la próxima
+            hasta_id_fac = self.usuario_repository.ultimo_id_factura_db1()
+            logging.info(f"Sincronizando clientes desde COD_PER {desde_cod_per} y facturas ({desde_id_fac}, {hasta_id_fac}]")
+
+            resumen = {"leidos": 0, "insertados": 0, "actualizados": 0, "lotes": 0}
+            ultimo_cod_per = self._recorrer(resumen, desde_cod_per, guardar_marca=True)
+
+            if not completo and desde_cod_per > 0 and hasta_id_fac > desde_id_fac:
+                self._recorrer(resumen, 0, hasta_cod_per=desde_cod_per,
+                               facturas_desde=desde_id_fac, facturas_hasta=hasta_id_fac)
+            self.usuario_repository.guardar_marca_sincronizacion(self.NOMBRE, ultimo_id_fac=hasta_id_fac)
+
+            resumen.update({"ultimo_cod_per": ultimo_cod_per, "ultimo_id_fac": hasta_id_fac})
+            logging.info(f"Sincronización de clientes terminada: {resumen}")
+            return resumen, 200
+        except Exception as e:
+            logging.error(f"Error al sincronizar clientes desde PR_CAU: {str(e)}")
+            return {"error": "Error al sincronizar clientes", "detalle": str(e)}, 500
+
+    def _recorrer(self, resumen: dict, despues_cod_per: int, guardar_marca: bool = False, **filtros) -> int:
+        """Recorre identidades por lotes (keyset sobre COD_PER) y las escribe en Clientes."""
+        cursor = despues_cod_per
+        while True:
+            identidades = self.usuario_repository.obtener_identidades_db1(cursor, self.tamano_lote, **filtros)
+            if not identidades:
+                break
+            insertados, actualizados = self.usuario_repository.upsert_clientes_db2(identidades)
+            cursor = identidades[-1]["IdPersona"]
+            if guardar_marca:
+                self.usuario_repository.guardar_marca_sincronizacion(self.NOMBRE, ultimo_cod_per=cursor)
+            resumen["leidos"] += len(identidades)
+            resumen["insertados"] += insertados
+            resumen["actualizados"] += actualizados
+            resumen["lotes"] += 1
+            logging.info(f"Lote de clientes hasta COD_PER {cursor}: {insertados} insertados, {actualizados} actualizados")
+            if len(identidades) < self.tamano_lote:
+                break
+        return cursor
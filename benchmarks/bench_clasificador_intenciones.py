@@ -0,0 +1,82 @@
+# benchmarks/bench_clasificador_intenciones.py
+"""Proporción de mensajes que el clasificador por reglas resuelve sin llamar a ChatGPT, y su costo.
+
+Uso: python benchmarks/bench_clasificador_intenciones.py [--archivo mensajes.txt] [--repeticiones 2000]
+
+Sin --archivo usa una muestra de mensajes típicos del chat; con --archivo, un mensaje por línea
+(p. ej. los "Usuario: ..." del historial exportado de Redis). No necesita infrastructure.settings:
+sólo se mide application.clasificador_intenciones, contra buscar cada frase de REGLAS por separado
+con una regex, que es lo que costaría sumar reglas al respaldo por palabras clave.
+"""
+import argparse
+import logging
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from application.clasificador_intenciones import ClasificadorIntenciones, REGLAS, preprocesar
+
+MUESTRA = (
+    "hola", "buenas tardes", "gracias!", "quiero hacer un reclamo", "kiero aser un rekalmo",
+    "no tengo luz desde ayer", "se cortó la luz en todo el barrio", "hay un cable caído en la esquina",
+    "estoy sin luz", "reclamo", "quiero ver el estado de mi reclamo", "como va mi reclamo?",
+    "consultar reclamo", "quiero ver mi factura", "cuánto debo?", "me llegó la boleta muy alta",
+    "necesito la factura de este mes", "quiero actualizar mis datos", "cambiar celular",
+    "quiero cambiar mi dirección", "actualizar correo", "cambiar", "que puedo hacer",
+    "quiero ver mi factura y hacer un reclamo", "tengo baja tensión", "cuándo vence la factura?",
+    "necesito hablar con alguien", "a qué hora atienden?", "dónde queda la oficina?",
+    "el medidor hace ruido", "me cobraron de más", "se quemó la heladera por un pico de tensión",
+    "quiero darme de baja", "ok", "sí", "no entiendo", "buen día, quería consultar algo",
+    "mi telefono cambió", "problemas con el servicio", "ya pagué la factura",
+)
+
+def buscar_con_regex(patrones, texto: str) -> set:
+    return {indice for indice, patron in enumerate(patrones) if patron.search(texto)}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--archivo", help="Mensajes, uno por línea")
+    parser.add_argument("--repeticiones", type=int, default=2_000)
+    args = parser.parse_args()
+
+    if args.archivo:
+        with open(args.archivo, encoding="utf-8") as archivo:
+            mensajes = [linea.strip().removeprefix("Usuario: ") for linea in archivo if linea.strip()]
+    else:
+        mensajes = list(MUESTRA)
+    preprocesados = [preprocesar(mensaje) for mensaje in mensajes]
+
+    clasificador = ClasificadorIntenciones()
+    resueltos = {}
+    for mensaje, texto in zip(mensajes, preprocesados):
+        intencion, confianza = clasificador.clasificar(texto)
+        decide = intencion is not None and confianza >= clasificador.umbral
+        if decide:
+            resueltos[intencion] = resueltos.get(intencion, 0) + 1
+        logging.info(f"{mensaje!r}: {intencion} ({confianza}) -> {'reglas' if decide else 'ChatGPT'}")
+    total = sum(resueltos.values())
+    print(f"{len(mensajes)} mensajes, umbral {clasificador.umbral}")
+    print(f"Resueltos sin llamar a ChatGPT: {total} ({total / len(mensajes):.0%}) {resueltos}")
+
+    # Frases de REGLAS como regex con límites de palabra (sin quitar tildes, que el autómata sí hace)
+    patrones = [
+        re.compile(r"\b" + re.escape(preprocesar(frase.rstrip("*"))) + ("" if frase.endswith("*") else r"\b"))
+        for frase, _, _ in REGLAS
+    ]
+    for nombre, buscar in (
+        ("Aho-Corasick (una pasada)", clasificador.buscar),
+        ("Una regex por frase", lambda texto: buscar_con_regex(patrones, texto)),
+    ):
+        inicio = time.perf_counter()
+        for _ in range(args.repeticiones):
+            for texto in preprocesados:
+                buscar(texto)
+        segundos = time.perf_counter() - inicio
+        print(f"{nombre:<28} {segundos / (args.repeticiones * len(preprocesados)) * 1e6:6.1f} µs/mensaje")
+
+if __name__ == "__main__":
+    logging.basicConfig(level=os.getenv("BENCH_LOG_LEVEL", "WARNING"), format="%(message)s")
+    main()
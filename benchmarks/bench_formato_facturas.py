@@ -0,0 +1,86 @@
+# benchmarks/bench_formato_facturas.py
+"""Compara el formateo de facturas fila por fila (ConsultarFacturasUseCase) contra el camino columnar con pandas.
+
+Uso: python benchmarks/bench_formato_facturas.py [--filas 10000 100000] [--repeticiones 3]
+
+Las filas son sintéticas, con las mismas columnas (labels) que devuelve obtener_facturas_db1,
+así que no necesita infrastructure.settings ni acceso a PR_CAU. Ambos caminos arrancan de las
+tuplas del cursor y terminan en el JSON de la respuesta (que los dos caminos den el mismo JSON
+lo verifica test/test_sqlalchemy_usuario_repository.py).
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import pyarrow as pa
+from application.consultar_facturas_usecase import ConsultarFacturasUseCase
+from application.formato_facturas import cargar_facturas, formatear_facturas, a_json, a_arrow_ipc
+
+COLUMNAS = [
+    "IdPersona", "Apellido", "Nombre", "Dni", "Sexo", "Telefono", "Email", "CodigoPostal", "FechaAlta",
+    "Observaciones", "CodigoSuministro", "NumeroComprobante", "FechaEmision", "EstadoFactura", "TotalFactura",
+    "VencimientoFactura", "ObservacionPostal", "Barrio", "Calle", "NumeroMedidor", "Periodo", "Consumo",
+]
+
+def generar_filas(cantidad: int) -> list:
+    inicio = datetime(2020, 1, 1)
+    filas = []
+    for i in range(cantidad):
+        emision = inicio + timedelta(days=i % 1500)
+        filas.append((
+            i // 40, "PEREZ", "JUAN", str(20000000 + i // 40), "M", "264111", None, "5400", inicio, "",
+            f"S{i // 40}", f"C{i:08d}", emision if i % 97 else None, "P" if i % 3 else "N",
+            Decimal(f"{1000 + i % 500}.{i % 100:02d}"), emision + timedelta(days=15),
+            "OK" if i % 5 else None, "CENTRO", "SAN MARTIN", f"M{i // 40}", f"{emision:%Y/%m}",
+            Decimal(100 + i % 300) if i % 50 else None,
+        ))
+    return filas
+
+def medir(nombre: str, funcion, repeticiones: int):
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        resultado = funcion()
+        tiempos.append(time.perf_counter() - inicio)
+    print(f"  {nombre:<26} mejor {min(tiempos):8.3f}s  promedio {sum(tiempos) / len(tiempos):8.3f}s  ({len(resultado) / 1024 / 1024:.1f} MB)")
+    return min(tiempos)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--filas", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--repeticiones", type=int, default=3)
+    args = parser.parse_args()
+
+    for cantidad in args.filas:
+        filas = generar_filas(cantidad)
+
+        def fila_por_fila():
+            datos = [dict(zip(COLUMNAS, fila)) for fila in filas]
+            facturas = [ConsultarFacturasUseCase._formatear(dato) for dato in datos if dato.get("NumeroComprobante")]
+            return json.dumps({"facturas": facturas}, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+        def columnar_json():
+            return a_json(formatear_facturas(cargar_facturas(COLUMNAS, filas)))
+
+        def columnar_arrow():
+            return a_arrow_ipc(formatear_facturas(cargar_facturas(COLUMNAS, filas)))
+
+        assert pa.ipc.open_stream(columnar_arrow()).read_all().num_rows == cantidad
+
+        print(f"{cantidad} filas, {args.repeticiones} repeticiones")
+        t_filas = medir("Fila por fila + json", fila_por_fila, args.repeticiones)
+        t_json = medir("Columnar (pandas) + JSON", columnar_json, args.repeticiones)
+        t_arrow = medir("Columnar + Arrow IPC", columnar_arrow, args.repeticiones)
+        print(f"  Aceleración: JSON {t_filas / t_json:.1f}x, Arrow IPC {t_filas / t_arrow:.1f}x")
+
+if __name__ == "__main__":
+    # Los casos de uso loguean cada consulta a nivel INFO
+    logging.getLogger().setLevel(os.getenv("BENCH_LOG_LEVEL", "WARNING"))
+    main()
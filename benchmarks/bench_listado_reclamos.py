@@ -0,0 +1,86 @@
+# benchmarks/bench_listado_reclamos.py
+"""Compara el listado de reclamos por ORM + to_dict() contra la proyección de columnas (ReclamoListado).
+
+Uso: python benchmarks/bench_listado_reclamos.py [--filas 100000] [--clientes 5000] [--repeticiones 3]
+
+Usa una base SQLite en memoria con datos sintéticos, así que no necesita
+infrastructure.settings ni acceso a DECSA_EXC.
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from pydantic_core import to_json
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import StaticPool
+from domain.entities import Base, Cliente, Reclamo
+from infrastructure.sqlalchemy_reclamo_repository import SQLAlchemyReclamoRepository
+
+def poblar(engine, filas: int, clientes: int):
+    inicio = datetime(2024, 1, 1)
+    with engine.begin() as conexion:
+        conexion.execute(insert(Cliente), [
+            {
+                "ID_USUARIO": i, "DNI": str(20000000 + i), "NOMBRE_COMPLETO": f"CLIENTE {i}",
+                "CELULAR": f"264{i:07d}", "EMAIL": f"cliente{i}@mail.com", "CODIGO_POSTAL": "5400",
+                "CODIGO_SUMINISTRO": f"S{i}", "NUMERO_MEDIDOR": f"M{i}", "CALLE": "SAN MARTIN", "BARRIO": "CENTRO",
+            }
+            for i in range(1, clientes + 1)
+        ])
+        conexion.execute(insert(Reclamo), [
+            {
+                "ID_RECLAMO": i, "ID_USUARIO": i % clientes + 1, "DESCRIPCION": f"Corte de luz en la zona {i}",
+                "ESTADO": "Resuelto" if i % 3 == 0 else "Pendiente",
+                "FECHA_RECLAMO": inicio + timedelta(minutes=i),
+                "FECHA_CIERRE": inicio + timedelta(minutes=i, hours=5) if i % 3 == 0 else None,
+            }
+            for i in range(1, filas + 1)
+        ])
+
+def medir(nombre: str, funcion, repeticiones: int):
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        resultado = funcion()
+        tiempos.append(time.perf_counter() - inicio)
+    print(f"{nombre:<28} mejor {min(tiempos):8.3f}s  promedio {sum(tiempos) / len(tiempos):8.3f}s  ({len(resultado) / 1024 / 1024:.1f} MB)")
+    return min(tiempos)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--filas", type=int, default=100_000)
+    parser.add_argument("--clientes", type=int, default=5_000)
+    parser.add_argument("--repeticiones", type=int, default=3)
+    args = parser.parse_args()
+
+    engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    Base.metadata.create_all(engine, tables=[Cliente.__table__, Reclamo.__table__])
+    poblar(engine, args.filas, args.clientes)
+
+    def orm_to_dict():
+        with Session(engine) as session:
+            reclamos = SQLAlchemyReclamoRepository(session).listar_todos()
+            return json.dumps([r.to_dict() for r in reclamos], ensure_ascii=False).encode("utf-8")
+
+    def proyeccion():
+        with Session(engine) as session:
+            return to_json(SQLAlchemyReclamoRepository(session).listar_pagina())
+
+    assert json.loads(orm_to_dict()) == json.loads(proyeccion()), "Las dos rutas deben devolver el mismo JSON"
+
+    print(f"{args.filas} reclamos, {args.clientes} clientes, {args.repeticiones} repeticiones")
+    t_orm = medir("ORM + to_dict()", orm_to_dict, args.repeticiones)
+    t_proyeccion = medir("Proyección de columnas", proyeccion, args.repeticiones)
+    print(f"Aceleración: {t_orm / t_proyeccion:.1f}x")
+
+if __name__ == "__main__":
+    # Los repositorios loguean cada consulta a nivel INFO
+    logging.getLogger().setLevel(os.getenv("BENCH_LOG_LEVEL", "WARNING"))
+    main()
@@ -0,0 +1,103 @@
+# benchmarks/bench_sentencias.py
+"""Costo por llamada de las búsquedas por clave: session.query(...) armado en cada llamada contra select() de módulo.
+
+Uso: python benchmarks/bench_sentencias.py [--llamadas 5000] [--repeticiones 3]
+
+Usa una base SQLite en memoria, así que no necesita infrastructure.settings ni acceso a DECSA_EXC:
+lo que se mide es el lado de Python (armar la consulta, su clave de caché y, sin caché, compilarla),
+que es igual con pyodbc. Cada llamada abre su Session, como una UnitOfWork por request.
+"""
+import argparse
+import logging
+import os
+import sys
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from sqlalchemy import create_engine, insert, select
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import StaticPool
+from domain.entities import Base, Cliente, Reclamo
+from infrastructure.pool_telemetry import instrumentar
+from infrastructure.sqlalchemy_reclamo_repository import SQLAlchemyReclamoRepository, CON_CLIENTE
+
+CLIENTES = 1_000
+RECLAMOS = 10_000
+
+def crear_engine(nombre: str, query_cache_size: int = 500):
+    engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False},
+                           query_cache_size=query_cache_size)
+    Base.metadata.create_all(engine, tables=[Cliente.__table__, Reclamo.__table__])
+    with engine.begin() as conexion:
+        conexion.execute(insert(Cliente), [
+            {"ID_USUARIO": i, "DNI": str(20000000 + i), "NOMBRE_COMPLETO": f"CLIENTE {i}",
+             "CODIGO_SUMINISTRO": f"S{i}", "NUMERO_MEDIDOR": f"M{i}"}
+            for i in range(1, CLIENTES + 1)
+        ])
+        conexion.execute(insert(Reclamo), [
+            {"ID_RECLAMO": i, "ID_USUARIO": i % CLIENTES + 1, "DESCRIPCION": f"Corte de luz {i}",
+             "ESTADO": "Pendiente", "FECHA_RECLAMO": datetime(2024, 1, 1)}
+            for i in range(1, RECLAMOS + 1)
+        ])
+    return engine, instrumentar(engine, nombre)
+
+# Cómo estaban escritas las búsquedas antes de armar las sentencias una sola vez
+def query_por_id(session, id_reclamo):
+    return session.query(Reclamo).options(CON_CLIENTE).filter(Reclamo.ID_RECLAMO == id_reclamo).first()
+
+def query_ultimos(session, id_usuario):
+    consulta = (
+        select(Reclamo.ID_RECLAMO, Reclamo.ESTADO, Reclamo.FECHA_RECLAMO)
+        .where(Reclamo.ID_USUARIO == id_usuario)
+        .order_by(Reclamo.ID_RECLAMO.desc())
+        .limit(5)
+    )
+    return [dict(fila) for fila in session.execute(consulta).mappings()]
+
+def repositorio_por_id(session, id_reclamo):
+    return SQLAlchemyReclamoRepository(session).obtener_por_id(id_reclamo)
+
+def repositorio_ultimos(session, id_usuario):
+    return SQLAlchemyReclamoRepository(session).obtener_ultimos_por_usuario(id_usuario, 5, ("ID_RECLAMO", "ESTADO", "FECHA_RECLAMO"))
+
+def medir(nombre: str, engine, funcion, llamadas: int, repeticiones: int) -> float:
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        for i in range(llamadas):
+            with Session(engine) as session:
+                funcion(session, i % CLIENTES + 1)
+        tiempos.append((time.perf_counter() - inicio) / llamadas)
+    print(f"{nombre:<48} mejor {min(tiempos) * 1e6:8.1f} µs/llamada  promedio {sum(tiempos) / len(tiempos) * 1e6:8.1f} µs")
+    return min(tiempos)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--llamadas", type=int, default=5_000)
+    parser.add_argument("--repeticiones", type=int, default=3)
+    args = parser.parse_args()
+
+    engine, telemetria = crear_engine("bench")
+    engine_sin_cache, _ = crear_engine("bench_sin_cache", query_cache_size=0)
+    with Session(engine) as session:
+        assert query_por_id(session, 7).ID_RECLAMO == repositorio_por_id(session, 7).ID_RECLAMO
+        assert query_ultimos(session, 7) == repositorio_ultimos(session, 7)
+
+    print(f"{args.llamadas} llamadas, {args.repeticiones} repeticiones")
+    for titulo, antes, despues in (
+        ("Reclamo por ID (con cliente)", query_por_id, repositorio_por_id),
+        ("Últimos 5 reclamos (columnas)", query_ultimos, repositorio_ultimos),
+    ):
+        print(titulo)
+        t_antes = medir("  query()/select() armado por llamada", engine, antes, args.llamadas, args.repeticiones)
+        t_despues = medir("  select() de módulo (repositorio)", engine, despues, args.llamadas, args.repeticiones)
+        medir("  select() de módulo, sin caché de compilación", engine_sin_cache, despues, args.llamadas, args.repeticiones)
+        print(f"  Aceleración: {t_antes / t_despues:.1f}x")
+    print(f"Caché de sentencias: {telemetria.resumen()['cache_sentencias']}")
+
+if __name__ == "__main__":
+    # Los repositorios loguean cada consulta a nivel INFO
+    logging.getLogger().setLevel(os.getenv("BENCH_LOG_LEVEL", "WARNING"))
+    main()
@@ -7,23 +7,22 @@ from fastapi import FastAPI, Request, HTTPException, Depends
 from pydantic import BaseModel
 from infrastructure.settings import Config
 from infrastructure.extensions import init_cors
-from infrastructure.database import init_db, get_db_session, get_db
-from infrastructure.sqlalchemy_usuario_repository import SQLAlchemyUsuarioRepository
-from infrastructure.sqlalchemy_reclamo_repository import SQLAlchemyReclamoRepository
-from application.registrar_reclamo_usecase import RegistrarReclamoUseCase
-from application.consultar_estado_reclamo_usecase import ConsultarEstadoReclamoUseCase
-from application.consultar_reclamo_usecase import ConsultarReclamoUseCase
-from routes.user_routes import cliente_router as user_router, init_cliente_services, get_actualizar_cliente_usecase
-from routes.reclamo_routes import reclamo_router, init_reclamo_services
-from routes.factura_routes import factura_router, init_factura_services, get_consultar_facturas_usecase
+from infrastructure.database import init_db, get_db
+from routes.user_routes import cliente_router as user_router
+from routes.reclamo_routes import reclamo_router
+from routes.factura_routes import factura_router
 from routes.autenticacion_routes import router as usuario_router
 from routes.roles_routes import router as rol_router
 from routes.chatbot_routes import router as chatbot_router, set_detectar_intencion_usecase
+from routes.admin_db_routes import router as admin_db_router
+from routes.consumos_routes import router as consumos_router
 from adapters.chattigo_adapter import ChattigoAdapter, ChattigoMessage, ChattigoResponse
-from infrastructure.redis_client import RedisClient
+from infrastructure.redis_client import obtener_redis
 from infrastructure.payload_handler import PayloadHandler
 from application.chatgpt_service import ChatGPTService
 from application.detectar_intencion_chatgpt_usecase import DetectarIntencionChatGPTUseCase
+from application.modelo_intenciones import cargar_modelo_actual
+from infrastructure.ejemplos_intenciones import RegistroEjemplosIntencion, MODELO_INTENCIONES_DIR
 import logging
 import os
 import json
@@ -42,47 +41,31 @@ def create_app():
 
     init_db(app)
     init_cors(app)
-    redis_client = RedisClient().get_client()
+    redis_client = obtener_redis()
 
     app.include_router(user_router, prefix="/api/usuarios")
     app.include_router(reclamo_router, prefix="/api/reclamos")
     app.include_router(factura_router, prefix="/api/facturas")
     app.include_router(usuario_router, prefix="/api/admin/usuarios", tags=["Usuarios"])
     app.include_router(rol_router, prefix="/api/admin/roles", tags=["Roles"])
+    app.include_router(admin_db_router, prefix="/api/admin/db", tags=["Base de datos"])
+    app.include_router(consumos_router, prefix="/api/admin/consumos", tags=["Consumos"])
     app.include_router(chatbot_router, prefix="/api/chattigo", tags=["Chattigo"])
 
-    init_cliente_services(app)
-    init_reclamo_services(app)
-    init_factura_services(app)
-
     chatgpt_service = ChatGPTService(redis_client=redis_client)
-    detectar_intencion_usecase = DetectarIntencionChatGPTUseCase(chatgpt_service)
+    app.add_event_handler("shutdown", chatgpt_service.cerrar)
+    # Reglas y modelo de intenciones en proceso antes de ChatGPT; lo que etiqueta ChatGPT se registra para reentrenar
+    detectar_intencion_usecase = DetectarIntencionChatGPTUseCase(
+        chatgpt_service,
+        modelo=cargar_modelo_actual(MODELO_INTENCIONES_DIR),
+        registro=RegistroEjemplosIntencion(),
+    )
     app.detectar_intencion_usecase = detectar_intencion_usecase
 
     set_detectar_intencion_usecase(detectar_intencion_usecase)
 
-    actualizar_cliente_usecase = get_actualizar_cliente_usecase()
-    consultar_facturas_usecase = get_consultar_facturas_usecase()
-
-    # Inicializar los repositorios y casos de uso para el ChattigoAdapter
-    session_db1 = get_db_session(app, bind='db1')
-    session_db2 = get_db_session(app, bind='db2')
-    usuario_repository = SQLAlchemyUsuarioRepository(session_db1, session_db2)
-    reclamo_repository = SQLAlchemyReclamoRepository(session_db2)
-
-    registrar_reclamo_usecase = RegistrarReclamoUseCase(reclamo_repository, usuario_repository)
-    consultar_estado_usecase = ConsultarEstadoReclamoUseCase(reclamo_repository, usuario_repository)
-    consultar_reclamo_usecase = ConsultarReclamoUseCase(reclamo_repository)
-
-    adapter = ChattigoAdapter(
-        app.detectar_intencion_usecase,
-        registrar_reclamo_usecase,
-        actualizar_cliente_usecase,
-        consultar_estado_usecase,
-        consultar_reclamo_usecase,
-        consultar_facturas_usecase,
-        redis_client
-    )
+    # El adapter abre una UnitOfWork (sesiones db1/db2 y casos de uso) por cada mensaje
+    adapter = ChattigoAdapter(app.detectar_intencion_usecase, redis_client)
 
     # Endpoint para Chattigo
     @app.post("/webhook/chattigo", response_model=ChattigoResponse)
@@ -0,0 +1,64 @@
+# domain/dtos.py
+from pydantic import BaseModel
+from datetime import datetime
+from typing import List, Optional
+
+class ClienteResumen(BaseModel):
+    nombre: Optional[str] = None
+    dni: Optional[str] = None
+    celular: Optional[str] = None
+    email: Optional[str] = None
+
+class ReclamoListado(BaseModel):
+    """Esquema de un reclamo en los listados; misma forma que ``Reclamo.to_dict()``."""
+    ID_RECLAMO: int
+    ID_USUARIO: int
+    DESCRIPCION: str
+    ESTADO: Optional[str] = None
+    FECHA_RECLAMO: Optional[datetime] = None
+    FECHA_CIERRE: Optional[datetime] = None
+    cliente: ClienteResumen
+    calle: Optional[str] = None
+    barrio: Optional[str] = None
+    codigo_postal: Optional[str] = None
+    numeroSuministro: Optional[str] = None
+    medidor: Optional[str] = None
+
+def fila_a_listado(fila) -> dict:
+    """Arma el dict de ReclamoListado desde una fila de columnas (Reclamos LEFT JOIN Clientes).
+
+    La fila viene en el orden de SQLAlchemyReclamoRepository.COLUMNAS_LISTADO. Es el camino
+    rápido de los listados: sin entidades ORM ni validación por fila, se serializa con
+    ``pydantic_core.to_json``.
+    """
+    (id_reclamo, id_usuario, descripcion, estado, fecha_reclamo, fecha_cierre,
+     id_cliente, nombre, dni, celular, email, calle, barrio, codigo_postal, suministro, medidor) = fila
+    if id_cliente is None:
+        cliente = {"nombre": "Desconocido", "dni": "Desconocido", "celular": "N/A", "email": "N/A"}
+        calle, barrio, codigo_postal, suministro, medidor = "Sin calle", "Sin barrio", "N/A", "N/A", "N/A"
+    else:
+        cliente = {"nombre": nombre, "dni": dni, "celular": celular, "email": email}
+    return {
+        "ID_RECLAMO": id_reclamo,
+        "ID_USUARIO": id_usuario,
+        "DESCRIPCION": descripcion,
+        "ESTADO": estado,
+        "FECHA_RECLAMO": fecha_reclamo,
+        "FECHA_CIERRE": fecha_cierre,
+        "cliente": cliente,
+        "calle": calle,
+        "barrio": barrio,
+        "codigo_postal": codigo_postal,
+        "numeroSuministro": suministro,
+        "medidor": medidor,
+    }
+
+class PaginaReclamos(BaseModel):
+    reclamos: List[ReclamoListado]
+    siguiente: Optional[int] = None
+
+class BusquedaReclamos(BaseModel):
+    total: int
+    limit: int
+    offset: int
+    reclamos: List[ReclamoListado]
@@ -1,5 +1,5 @@
 # domain/entities.py
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, ForeignKey, Table
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, ForeignKey, Table, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.ext.declarative import declarative_base
 from datetime import datetime
@@ -39,7 +39,8 @@ class Cliente(Base):
     CALLE = Column(String(200), nullable=True)
     BARRIO = Column(String(200), nullable=True)
 
-    reclamos = relationship("Reclamo", back_populates="cliente", lazy="joined")
+    # Lazy por defecto; los repositorios lo cargan con raiseload (los reclamos se piden a su repositorio)
+    reclamos = relationship("Reclamo", back_populates="cliente", lazy="select")
 
     def to_dict(self, include_reclamos=False):
         data = {
@@ -64,6 +65,12 @@ class Cliente(Base):
 class Reclamo(Base):
     __tablename__ = 'Reclamos'
     __bind_key__ = 'db2'
+    __table_args__ = (
+        # Listados filtrados por estado y rango de fechas
+        Index('IX_Reclamos_ESTADO_FECHA_RECLAMO', 'ESTADO', 'FECHA_RECLAMO'),
+        # Reclamos de un cliente ordenados por ID (últimos reclamos)
+        Index('IX_Reclamos_ID_USUARIO_ID_RECLAMO', 'ID_USUARIO', 'ID_RECLAMO'),
+    )
 
     ID_RECLAMO = Column(Integer, primary_key=True)
     ID_USUARIO = Column(Integer, ForeignKey('Clientes.ID_USUARIO'), nullable=False)
@@ -95,6 +102,18 @@ class Reclamo(Base):
             'medidor': self.cliente.NUMERO_MEDIDOR if self.cliente else "N/A",
         }
 
+class SincronizacionClientes(Base):
+    """Marcas de agua de la sincronización PR_CAU → Clientes (una fila por proceso)."""
+    __tablename__ = 'SincronizacionClientes'
+    __bind_key__ = 'db2'
+
+    NOMBRE = Column(String(50), primary_key=True)
+    # Última PERSONAS.COD_PER copiada: las personas nuevas tienen COD_PER mayor
+    ULTIMO_COD_PER = Column(Integer, nullable=False, default=0)
+    # Última FACTURAS.ID_FAC revisada: una factura nueva puede cambiar el suministro de la persona
+    ULTIMO_ID_FAC = Column(Integer, nullable=False, default=0)
+    FECHA_SINCRONIZACION = Column(DateTime, nullable=True)
+
 class Rol(Base):
     __tablename__ = 'Rol'
     IdRol = Column(Integer, primary_key=True)
@@ -0,0 +1,35 @@
+# infrastructure/analitica_consumos.py
+from infrastructure.database import get_db_session
+from infrastructure.sqlalchemy_usuario_repository import SQLAlchemyUsuarioRepository
+from infrastructure.analitica_consumos_cache import CacheAnaliticaConsumos
+from application.analitica_consumos_usecase import AnaliticaConsumosUseCase
+import argparse
+import logging
+import json
+import sys
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+# Analítica de consumos por barrio/calle para correr desde cron/Programador de tareas (deja el resultado en Redis):
+#   python -m infrastructure.analitica_consumos [--periodos 12] [--tamano-lote 5000]
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Calcula la analítica de consumos de PR_CAU y la guarda en Redis")
+    parser.add_argument("--periodos", type=int, default=12, help="Últimos períodos a analizar (por defecto 12)")
+    parser.add_argument("--tamano-lote", type=int, default=5000, help="Filas de CONS_SER por lote del cursor (por defecto 5000)")
+    args = parser.parse_args(argv)
+
+    session_db1 = get_db_session(bind="db1")
+    try:
+        # Sólo lee PR_CAU: sin sesión de DECSA_EXC
+        repositorio = SQLAlchemyUsuarioRepository(session_db1, None)
+        usecase = AnaliticaConsumosUseCase(repositorio, CacheAnaliticaConsumos(), args.tamano_lote)
+        resultado, status = usecase.ejecutar(args.periodos)
+    finally:
+        session_db1.close()
+    print(json.dumps(resultado, ensure_ascii=False, default=str))
+    return 0 if status == 200 else 1
+
+if __name__ == "__main__":
+    logging.info("📊 Iniciando analítica de consumos por barrio y calle...")
+    sys.exit(main())
@@ -0,0 +1,57 @@
+# infrastructure/analitica_consumos_cache.py
+from infrastructure.configuracion import leer_config
+from infrastructure.redis_client import AccesoRedis
+import logging
+import json
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+# Resultados de la analítica de consumos por barrio/calle. Los escribe el job
+# (python -m infrastructure.analitica_consumos) y los tableros sólo los leen: la agregación
+# nunca corre en el camino de un request. La TTL cubre un par de corridas salteadas del job.
+ANALITICA_CONSUMOS_TTL = leer_config("ANALITICA_CONSUMOS_TTL", 172800, int)
+
+PREFIJO = "analitica:consumos"
+NIVELES = ("barrio", "calle")
+
+class CacheAnaliticaConsumos(AccesoRedis):
+    """Claves en Redis:
+
+    - ``analitica:consumos:indice``: períodos calculados y datos de la última corrida.
+    - ``analitica:consumos:periodo:<periodo>``: agregados por barrio y calle y suministros atípicos.
+    - ``analitica:consumos:series:<nivel>``: serie de consumo de cada barrio o calle.
+    """
+
+    def __init__(self, redis_client=None, ttl: int = ANALITICA_CONSUMOS_TTL):
+        super().__init__(redis_client)
+        self.ttl = ttl
+
+    @staticmethod
+    def clave(*partes) -> str:
+        return ":".join((PREFIJO, *(str(parte) for parte in partes)))
+
+    def guardar(self, indice: dict, por_periodo: dict, series: dict):
+        """Escribe una corrida completa en un solo pipeline (MULTI): los tableros nunca ven una mezcla de corridas."""
+        pipe = self.redis.pipeline()
+        for periodo, datos in por_periodo.items():
+            pipe.set(self.clave("periodo", periodo), json.dumps(datos, ensure_ascii=False), ex=self.ttl)
+        for nivel, datos in series.items():
+            pipe.set(self.clave("series", nivel), json.dumps(datos, ensure_ascii=False), ex=self.ttl)
+        pipe.set(self.clave("indice"), json.dumps(indice, ensure_ascii=False), ex=self.ttl)
+        pipe.execute()
+        logging.info(f"Analítica de consumos guardada en Redis: {len(por_periodo)} períodos")
+
+    def _leer(self, clave: str):
+        texto = self.redis.get(clave)
+        return json.loads(texto) if texto is not None else None
+
+    def obtener_indice(self):
+        return self._leer(self.clave("indice"))
+
+    def obtener_periodo(self, periodo: str):
+        return self._leer(self.clave("periodo", periodo))
+
+    def obtener_series(self, nivel: str):
+        if nivel not in NIVELES:
+            raise ValueError(f"Nivel no válido: {nivel}. Valores posibles: {', '.join(NIVELES)}")
+        return self._leer(self.clave("series", nivel))
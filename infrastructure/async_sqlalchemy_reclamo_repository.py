@@ -0,0 +1,74 @@
+# infrastructure/async_sqlalchemy_reclamo_repository.py
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import iterate_in_threadpool
+from infrastructure.database import ejecutar_db
+from infrastructure.sqlalchemy_reclamo_repository import SQLAlchemyReclamoRepository
+from domain.entities import Reclamo
+from domain.dtos import fila_a_listado
+import logging
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+class AsyncSQLAlchemyReclamoRepository:
+    """Versión awaitable de SQLAlchemyReclamoRepository.
+
+    Reutiliza las consultas del repositorio síncrono sobre el ``sync_session``
+    de la AsyncSession, ejecutándolas con ``ejecutar_db`` para no bloquear el event loop.
+    """
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+        sync_session = session.sync_session if isinstance(session, AsyncSession) else session
+        self.repositorio = SQLAlchemyReclamoRepository(sync_session)
+
+    async def obtener_por_id(self, id_reclamo: int):
+        return await ejecutar_db(self.repositorio.obtener_por_id, id_reclamo)
+
+    async def obtener_por_usuario(self, id_usuario: int):
+        return await ejecutar_db(self.repositorio.obtener_por_usuario, id_usuario)
+
+    async def obtener_ultimos_por_usuario(self, id_usuario: int, n: int = 5, columnas: tuple = None):
+        return await ejecutar_db(self.repositorio.obtener_ultimos_por_usuario, id_usuario, n, columnas)
+
+    async def guardar(self, reclamo: Reclamo):
+        return await ejecutar_db(self.repositorio.guardar, reclamo)
+
+    async def actualizar_estado(self, id_reclamo: int, nuevo_estado: str):
+        return await ejecutar_db(self.repositorio.actualizar_estado, id_reclamo, nuevo_estado)
+
+    async def actualizar_estado_masivo(self, nuevo_estado: str, ids: list = None, filtros: dict = None):
+        return await ejecutar_db(self.repositorio.actualizar_estado_masivo, nuevo_estado, ids, filtros)
+
+    async def listar_todos(self):
+        return await ejecutar_db(self.repositorio.listar_todos)
+
+    async def listar_pendientes(self):
+        return await ejecutar_db(self.repositorio.listar_pendientes)
+
+    async def listar_pagina(self, limit: int = None, after: int = None):
+        return await ejecutar_db(self.repositorio.listar_pagina, limit, after)
+
+    async def buscar(self, **filtros):
+        return await ejecutar_db(self.repositorio.buscar, **filtros)
+
+    async def iterar_lotes(self, tamano_lote: int = 500, after: int = None):
+        """Lotes de reclamos desde un cursor del servidor sin bloquear el event loop."""
+        if isinstance(self.session, AsyncSession):
+            consulta = self.repositorio.consulta_listado(after).execution_options(yield_per=tamano_lote)
+            resultado = await self.session.stream(consulta)
+            async for lote in resultado.partitions():
+                yield [fila_a_listado(fila) for fila in lote]
+        else:
+            async for lote in iterate_in_threadpool(self.repositorio.iterar_lotes(tamano_lote, after)):
+                yield lote
+
+    async def iterar_filas(self, tamano_lote: int = 5000, after: int = None):
+        """Lotes de tuplas de COLUMNAS_LISTADO desde un cursor del servidor sin bloquear el event loop."""
+        if isinstance(self.session, AsyncSession):
+            consulta = self.repositorio.consulta_listado(after).execution_options(yield_per=tamano_lote)
+            resultado = await self.session.stream(consulta)
+            async for lote in resultado.partitions():
+                yield [tuple(fila) for fila in lote]
+        else:
+            async for lote in iterate_in_threadpool(self.repositorio.iterar_filas(tamano_lote, after)):
+                yield lote
\ No newline at end of file
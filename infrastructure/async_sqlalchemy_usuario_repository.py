@@ -0,0 +1,59 @@
+# infrastructure/async_sqlalchemy_usuario_repository.py
+from sqlalchemy.ext.asyncio import AsyncSession
+from infrastructure.database import ejecutar_db
+from infrastructure.sqlalchemy_usuario_repository import SQLAlchemyUsuarioRepository
+from domain.entities import Cliente
+import logging
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+class AsyncSQLAlchemyUsuarioRepository:
+    """Versión awaitable de SQLAlchemyUsuarioRepository sobre AsyncSession para PR_CAU (db1) y DECSA_EXC (db2)."""
+
+    def __init__(self, session_db1: AsyncSession, session_db2: AsyncSession):
+        self.session_db1 = session_db1
+        self.session_db2 = session_db2
+        self.repositorio = SQLAlchemyUsuarioRepository(
+            session_db1.sync_session if isinstance(session_db1, AsyncSession) else session_db1,
+            session_db2.sync_session if isinstance(session_db2, AsyncSession) else session_db2
+        )
+
+    async def obtener_por_dni(self, dni: str):
+        return await ejecutar_db(self.repositorio.obtener_por_dni, dni)
+
+    async def obtener_de_db1(self, dni: str):
+        return await ejecutar_db(self.repositorio.obtener_de_db1, dni)
+
+    async def obtener_identidad_db1(self, dni: str):
+        return await ejecutar_db(self.repositorio.obtener_identidad_db1, dni)
+
+    async def obtener_facturas_db1(self, dni: str, limite: int = None, offset: int = 0,
+                                   desde=None, hasta=None, estado: str = None):
+        return await ejecutar_db(self.repositorio.obtener_facturas_db1, dni, limite, offset, desde, hasta, estado)
+
+    async def obtener_filas_facturas_db1(self, dnis: list, desde=None, hasta=None, estado: str = None):
+        return await ejecutar_db(self.repositorio.obtener_filas_facturas_db1, dnis, desde, hasta, estado)
+
+    async def obtener_ultima_factura_db1(self, dni: str):
+        return await ejecutar_db(self.repositorio.obtener_ultima_factura_db1, dni)
+
+    async def obtener_resumen_facturas_db1(self, dni: str, hoy):
+        return await ejecutar_db(self.repositorio.obtener_resumen_facturas_db1, dni, hoy)
+
+    async def obtener_consumos_db1(self, dni: str, periodos: int = 6):
+        return await ejecutar_db(self.repositorio.obtener_consumos_db1, dni, periodos)
+
+    async def existe_en_db2(self, dni: str):
+        return await ejecutar_db(self.repositorio.existe_en_db2, dni)
+
+    async def guardar_cliente_en_db2(self, cliente: Cliente):
+        return await ejecutar_db(self.repositorio.guardar_cliente_en_db2, cliente)
+
+    async def copiar_cliente_a_db2(self, dni: str):
+        return await ejecutar_db(self.repositorio.copiar_cliente_a_db2, dni)
+
+    async def copiar_clientes_a_db2(self, dnis: list):
+        return await ejecutar_db(self.repositorio.copiar_clientes_a_db2, dnis)
+
+    async def actualizar_cliente(self, cliente: Cliente):
+        return await ejecutar_db(self.repositorio.actualizar_cliente, cliente)
@@ -0,0 +1,16 @@
+# infrastructure/configuracion.py
+from infrastructure.settings import Config
+import os
+
+# Parámetros de ajuste (TTL, umbrales, tamaños de pool, flags): el atributo de Config si está
+# definido, si no la variable de entorno del mismo nombre y si no el valor por defecto.
+_VERDADEROS = ("1", "true", "si", "sí")
+
+def leer_config(nombre: str, defecto=None, tipo=str):
+    """El parámetro ``nombre`` convertido con ``tipo`` (``defecto`` también pasa por ``tipo``)."""
+    valor = getattr(Config, nombre, os.getenv(nombre, defecto))
+    return valor if valor is None else tipo(valor)
+
+def leer_config_bool(nombre: str, defecto: bool = False) -> bool:
+    """Flags: "1", "true", "si" o "sí" (sin importar mayúsculas) activan; cualquier otro valor desactiva."""
+    return str(getattr(Config, nombre, os.getenv(nombre, defecto))).lower() in _VERDADEROS
@@ -1,33 +1,305 @@
 # infrastructure/database.py
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy import create_engine, event, exc
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+from sqlalchemy.util import greenlet_spawn
 from infrastructure.settings import Config
+from infrastructure.configuracion import leer_config, leer_config_bool
+from infrastructure.pool_telemetry import QueuePoolMedido, AsyncAdaptedQueuePoolMedido, instrumentar
+import itertools
+import threading
 import logging
+import time
+import os
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
 
-engine_db1 = create_engine(Config.SQLALCHEMY_BINDS["db1"], pool_size=10, max_overflow=20)
-engine_db2 = create_engine(Config.SQLALCHEMY_BINDS["db2"], pool_size=10, max_overflow=20)
+# Pool por bind: Config.SQLALCHEMY_POOL_OPTIONS = {"db1": {"pool_size": 10, ...}, "db2": {...}}
+# o variables de entorno <BIND>_POOL_SIZE, <BIND>_MAX_OVERFLOW, <BIND>_POOL_PRE_PING, <BIND>_POOL_RECYCLE, <BIND>_POOL_TIMEOUT
+_OPCIONES_POOL_DEFAULT = {
+    "pool_size": 10,
+    "max_overflow": 20,
+    "pool_pre_ping": True,
+    "pool_recycle": 1800,
+    "pool_timeout": 30,
+}
+
+# Las réplicas de db1 usan la configuración de db1 salvo que "db1_replicas" tenga la suya
+_HERENCIA_POOL = {"db1_replicas": "db1"}
+
+def _opciones_pool(bind: str) -> dict:
+    configuradas = getattr(Config, "SQLALCHEMY_POOL_OPTIONS", None) or {}
+    propia = bind in configuradas or any(os.getenv(f"{bind.upper()}_{clave.upper()}") for clave in _OPCIONES_POOL_DEFAULT)
+    if not propia and bind in _HERENCIA_POOL:
+        bind = _HERENCIA_POOL[bind]
+    opciones = dict(_OPCIONES_POOL_DEFAULT)
+    for clave, default in _OPCIONES_POOL_DEFAULT.items():
+        valor = os.getenv(f"{bind.upper()}_{clave.upper()}")
+        if valor is not None:
+            opciones[clave] = valor.lower() in ("1", "true", "si", "sí") if isinstance(default, bool) else type(default)(valor)
+    opciones.update(configuradas.get(bind, {}))
+    return opciones
+
+# Con pyodbc (SQL Server) los executemany de las altas en lote viajan en un único round trip
+DB_FAST_EXECUTEMANY = leer_config_bool("DB_FAST_EXECUTEMANY", True)
+
+# Sentencias compiladas que guarda cada engine (por estructura de la consulta; ver "cache_sentencias"
+# en /api/admin/db/pools). Si la tasa de hits baja con el tráfico, subirla.
+DB_QUERY_CACHE_SIZE = leer_config("DB_QUERY_CACHE_SIZE", 500, int)
+
+def _opciones_driver(url: str) -> dict:
+    if DB_FAST_EXECUTEMANY and url.startswith("mssql+pyodbc"):
+        return {"fast_executemany": True}
+    return {}
+
+def _crear_engine(nombre: str, url: str, bind: str = None):
+    engine = create_engine(url, poolclass=QueuePoolMedido, pool_logging_name=nombre, query_cache_size=DB_QUERY_CACHE_SIZE,
+                           **_opciones_driver(url), **_opciones_pool(bind or nombre))
+    instrumentar(engine, nombre)
+    return engine
+
+def _crear_async_engine(nombre: str, url: str, bind: str):
+    engine = create_async_engine(url, poolclass=AsyncAdaptedQueuePoolMedido, pool_logging_name=nombre,
+                                 query_cache_size=DB_QUERY_CACHE_SIZE, **_opciones_pool(bind))
+    instrumentar(engine.sync_engine, nombre)
+    return engine
+
+engine_db1 = _crear_engine("db1", Config.SQLALCHEMY_BINDS["db1"])
+engine_db2 = _crear_engine("db2", Config.SQLALCHEMY_BINDS["db2"])
 
 SessionLocal_db1 = sessionmaker(autocommit=False, autoflush=False, bind=engine_db1)
 SessionLocal_db2 = sessionmaker(autocommit=False, autoflush=False, bind=engine_db2)
 
+# Modo async opcional (DB_ASYNC_MODE=true): las rutas usan AsyncEngine para no bloquear el event loop
+DB_ASYNC_MODE = leer_config_bool("DB_ASYNC_MODE", False)
+
+# Drivers async equivalentes a los síncronos configurados en SQLALCHEMY_BINDS
+_DRIVERS_ASYNC = {
+    "mssql+pyodbc": "mssql+aioodbc",
+    "sqlite": "sqlite+aiosqlite",
+    "sqlite+pysqlite": "sqlite+aiosqlite",
+}
+
+def _url_async(bind: str) -> str:
+    """Devuelve la URL async del bind: SQLALCHEMY_ASYNC_BINDS si está configurada, si no la deriva de la síncrona."""
+    binds_async = getattr(Config, "SQLALCHEMY_ASYNC_BINDS", None) or {}
+    if bind in binds_async:
+        return binds_async[bind]
+    url = Config.SQLALCHEMY_BINDS[bind]
+    driver, separador, resto = url.partition("://")
+    return f"{_DRIVERS_ASYNC.get(driver, driver)}{separador}{resto}"
+
+async_engine_db1 = None
+async_engine_db2 = None
+AsyncSessionLocal_db1 = None
+AsyncSessionLocal_db2 = None
+
+if DB_ASYNC_MODE:
+    async_engine_db1 = _crear_async_engine("db1_async", _url_async("db1"), "db1")
+    async_engine_db2 = _crear_async_engine("db2_async", _url_async("db2"), "db2")
+    AsyncSessionLocal_db1 = async_sessionmaker(async_engine_db1, autoflush=False, expire_on_commit=False)
+    AsyncSessionLocal_db2 = async_sessionmaker(async_engine_db2, autoflush=False, expire_on_commit=False)
+
+# Réplicas de lectura de PR_CAU (db1). db1 sólo se lee desde este backend, así que
+# toda sesión de db1 puede ir a una réplica y el primario de facturación queda libre.
+def _leer_replicas_db1() -> list:
+    replicas = getattr(Config, "DB1_READ_REPLICAS", None)
+    if replicas is None:
+        replicas = os.getenv("DB1_READ_REPLICAS", "")
+    if isinstance(replicas, str):
+        replicas = replicas.split(",")
+    return [url.strip() for url in replicas if url and url.strip()]
+
+DB1_REPLICA_STRATEGY = leer_config("DB1_REPLICA_STRATEGY", "round_robin").lower()
+DB1_REPLICA_COOLDOWN = leer_config("DB1_REPLICA_COOLDOWN", 30, float)
+
+class _SesionReplicaDb1(Session):
+    """Sesión de lectura de db1 sobre una réplica.
+
+    Mientras la réplica esté marcada como no saludable las consultas van al primario,
+    y si una lectura falla por la réplica se repite una vez contra el primario.
+    """
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        if self.info["replica"].no_saludable_hasta <= time.monotonic():
+            return self.info["engine"]
+        return self.info["primario"]
+
+    def execute(self, *args, **kwargs):
+        try:
+            return super().execute(*args, **kwargs)
+        except exc.DBAPIError:
+            if self.info["replica"].no_saludable_hasta <= time.monotonic():
+                raise
+            logging.warning(f"Reintentando la lectura de db1 en el primario tras fallar {self.info['replica'].nombre}")
+            self.rollback()
+            return super().execute(*args, **kwargs)
+
+class _ReplicaDb1:
+    """Engine (y engine async si corresponde) de una réplica de lectura de db1."""
+
+    def __init__(self, nombre: str, url: str, url_async: str = None):
+        self.nombre = nombre
+        self.engine = _crear_engine(nombre, url, "db1_replicas")
+        self.session_local = sessionmaker(
+            class_=_SesionReplicaDb1, autocommit=False, autoflush=False,
+            info={"replica": self, "engine": self.engine, "primario": engine_db1},
+        )
+        self.async_engine = None
+        self.async_session_local = None
+        if url_async:
+            self.async_engine = _crear_async_engine(f"{nombre}_async", url_async, "db1_replicas")
+            self.async_session_local = async_sessionmaker(
+                self.async_engine, sync_session_class=_SesionReplicaDb1, autoflush=False, expire_on_commit=False,
+                info={"replica": self, "engine": self.async_engine.sync_engine, "primario": async_engine_db1.sync_engine},
+            )
+        self.no_saludable_hasta = 0.0
+
+    def engines(self):
+        engines = [self.engine]
+        if self.async_engine is not None:
+            engines.append(self.async_engine.sync_engine)
+        return engines
+
+    def conexiones_en_uso(self) -> int:
+        total = 0
+        for engine in self.engines():
+            checkedout = getattr(engine.pool, "checkedout", None)
+            total += checkedout() if checkedout else 0
+        return total
+
+class ReplicaRouter:
+    """Reparte las sesiones de db1 entre las réplicas sanas (round_robin o least_connections).
+
+    Si una réplica falla al conectar o pierde la conexión se marca como no saludable
+    durante ``cooldown`` segundos; sin réplicas sanas las sesiones van al primario.
+    """
+
+    def __init__(self, replicas: list, estrategia: str = "round_robin", cooldown: float = 30):
+        self.replicas = replicas
+        self.estrategia = estrategia
+        self.cooldown = cooldown
+        self._turno = itertools.count()
+        self._lock = threading.Lock()
+        for replica in replicas:
+            for engine in replica.engines():
+                event.listen(engine, "handle_error", self._al_fallar(replica))
+
+    def _al_fallar(self, replica):
+        def handle_error(context):
+            if context.is_disconnect or context.connection is None or isinstance(
+                context.sqlalchemy_exception, (exc.OperationalError, exc.InterfaceError)
+            ):
+                self.marcar_no_saludable(replica, context.original_exception)
+        return handle_error
+
+    def marcar_no_saludable(self, replica, error=None):
+        with self._lock:
+            ya_marcada = replica.no_saludable_hasta > time.monotonic()
+            replica.no_saludable_hasta = time.monotonic() + self.cooldown
+        if not ya_marcada:
+            logging.warning(f"Réplica {replica.nombre} de db1 marcada como no saludable por {self.cooldown:.0f}s: {str(error)}")
+
+    def saludables(self) -> list:
+        ahora = time.monotonic()
+        return [replica for replica in self.replicas if replica.no_saludable_hasta <= ahora]
+
+    def elegir(self, solo_async: bool = False):
+        """Devuelve la réplica para la próxima sesión o None si hay que usar el primario."""
+        candidatas = self.saludables()
+        if solo_async:
+            candidatas = [replica for replica in candidatas if replica.async_session_local is not None]
+        if not candidatas:
+            return None
+        if self.estrategia == "least_connections":
+            return min(candidatas, key=lambda replica: replica.conexiones_en_uso())
+        return candidatas[next(self._turno) % len(candidatas)]
+
+    def estado(self) -> list:
+        ahora = time.monotonic()
+        return [
+            {
+                "replica": replica.nombre,
+                "saludable": replica.no_saludable_hasta <= ahora,
+                "conexiones_en_uso": replica.conexiones_en_uso(),
+            }
+            for replica in self.replicas
+        ]
+
+def _crear_router_db1():
+    urls = _leer_replicas_db1()
+    if not urls:
+        return None
+    urls_async = getattr(Config, "DB1_READ_REPLICAS_ASYNC", None) or []
+    replicas = []
+    for i, url in enumerate(urls):
+        url_async = None
+        if DB_ASYNC_MODE:
+            if i < len(urls_async):
+                url_async = urls_async[i]
+            else:
+                driver, separador, resto = url.partition("://")
+                url_async = f"{_DRIVERS_ASYNC.get(driver, driver)}{separador}{resto}"
+        replicas.append(_ReplicaDb1(f"db1_replica_{i}", url, url_async))
+    logging.info(f"db1 con {len(replicas)} réplica(s) de lectura, estrategia {DB1_REPLICA_STRATEGY}")
+    return ReplicaRouter(replicas, DB1_REPLICA_STRATEGY, DB1_REPLICA_COOLDOWN)
+
+router_db1 = _crear_router_db1()
+
 def init_db(app):
     app.engine_db1 = engine_db1
     app.engine_db2 = engine_db2
+    if DB_ASYNC_MODE:
+        app.async_engine_db1 = async_engine_db1
+        app.async_engine_db2 = async_engine_db2
+        if hasattr(app, "add_event_handler"):
+            app.add_event_handler("shutdown", cerrar_engines_async)
+        logging.info("Bases de datos inicializadas con FastAPI (modo async)")
+        return
     logging.info("Bases de datos inicializadas con FastAPI")
 
-def get_db_session(app=None, bind=None):
+async def cerrar_engines_async():
+    """Libera las conexiones de los pools async al apagar la aplicación."""
+    engines = [async_engine_db1, async_engine_db2]
+    if router_db1 is not None:
+        engines.extend(replica.async_engine for replica in router_db1.replicas)
+    for engine in engines:
+        if engine is not None:
+            await engine.dispose()
+
+def get_db_session(app=None, bind=None, primario: bool = False):
+    """Sesión síncrona del bind. Las de db1 van a una réplica sana salvo que se pida el primario."""
     if bind == "db1":
+        replica = None if primario or router_db1 is None else router_db1.elegir()
+        if replica is not None:
+            return replica.session_local()
         return SessionLocal_db1()
     return SessionLocal_db2()
 
-def get_db(bind: str = "db2"):
+def get_async_db_session(bind=None, primario: bool = False):
+    if not DB_ASYNC_MODE:
+        raise RuntimeError("El modo async no está habilitado (DB_ASYNC_MODE).")
     if bind == "db1":
-        db = SessionLocal_db1()
-    else:
-        db = SessionLocal_db2()
+        replica = None if primario or router_db1 is None else router_db1.elegir(solo_async=True)
+        if replica is not None:
+            return replica.async_session_local()
+        return AsyncSessionLocal_db1()
+    return AsyncSessionLocal_db2()
+
+async def ejecutar_db(fn, *args, **kwargs):
+    """Ejecuta código de repositorio síncrono desde una corrutina.
+
+    En modo async los repositorios trabajan sobre el ``sync_session`` de una
+    ``AsyncSession``; correrlos dentro de ``greenlet_spawn`` hace que cada
+    espera del driver (aioodbc/aiosqlite) libere el event loop.
+    """
+    if DB_ASYNC_MODE:
+        return await greenlet_spawn(fn, *args, **kwargs)
+    return fn(*args, **kwargs)
+
+def get_db(bind: str = "db2"):
+    db = get_db_session(bind=bind)
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
@@ -0,0 +1,75 @@
+# infrastructure/ejemplos_intenciones.py
+from infrastructure.configuracion import leer_config
+from datetime import datetime
+import threading
+import logging
+import json
+import time
+import os
+import re
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+# Pares (texto preprocesado, intención) que etiquetó DetectarIntencionChatGPTUseCase, para entrenar
+# el modelo de intenciones (python -m infrastructure.entrenar_modelo_intenciones). Van a disco, en
+# un JSONL por día que sólo crece: Redis no sirve de almacén porque el ChattigoAdapter resetea la
+# memoria de las conversaciones cada 24 h y el dataset tiene que acumularse durante semanas.
+INTENCION_EJEMPLOS_MAX = leer_config("INTENCION_EJEMPLOS_MAX", 50000, int)
+# Directorio de las versiones del modelo (intenciones_<fecha-hora>.npz y el archivo "actual")
+MODELO_INTENCIONES_DIR = leer_config("MODELO_INTENCIONES_DIR", "modelos/intenciones")
+# Directorio de los pares (ejemplos_<fecha>.jsonl); los archivos viejos se pueden borrar o archivar a mano
+INTENCION_EJEMPLOS_DIR = leer_config("INTENCION_EJEMPLOS_DIR", os.path.join(MODELO_INTENCIONES_DIR, "ejemplos"))
+
+_ARCHIVO = re.compile(r"^ejemplos_\d{8}\.jsonl$")
+
+class RegistroEjemplosIntencion:
+    """Un JSON por línea en ``ejemplos_<AAAAMMDD>.jsonl``.
+
+    Cada par es una sola escritura en modo append, así que varios workers pueden registrar en el
+    mismo archivo sin pisarse. ``leer`` devuelve como mucho los últimos ``maximo`` pares.
+    """
+
+    def __init__(self, directorio: str = INTENCION_EJEMPLOS_DIR, maximo: int = INTENCION_EJEMPLOS_MAX):
+        self.directorio = directorio
+        self.maximo = maximo
+        self._lock = threading.Lock()
+
+    def _archivo_del_dia(self) -> str:
+        return os.path.join(self.directorio, f"ejemplos_{datetime.now().strftime('%Y%m%d')}.jsonl")
+
+    def registrar(self, texto: str, intencion: str, origen: str):
+        """Agrega un par; si el disco falla sólo se loguea (la respuesta al usuario no depende de esto)."""
+        if not texto or not intencion:
+            return
+        linea = json.dumps({"texto": texto, "intencion": intencion, "origen": origen, "ts": int(time.time())},
+                           ensure_ascii=False) + "\n"
+        try:
+            with self._lock:
+                os.makedirs(self.directorio, exist_ok=True)
+                with open(self._archivo_del_dia(), "a", encoding="utf-8") as salida:
+                    salida.write(linea)
+        except OSError as e:
+            logging.warning(f"No se pudo registrar el ejemplo de intención: {str(e)}")
+
+    def archivos(self) -> list:
+        """Archivos de pares, del más viejo al más nuevo."""
+        if not os.path.isdir(self.directorio):
+            return []
+        return [os.path.join(self.directorio, archivo) for archivo in sorted(os.listdir(self.directorio)) if _ARCHIVO.match(archivo)]
+
+    def leer(self) -> list:
+        """Los últimos ``maximo`` pares guardados, del más viejo al más nuevo (las líneas rotas se saltean)."""
+        ejemplos = []
+        for archivo in reversed(self.archivos()):
+            with open(archivo, encoding="utf-8") as entrada:
+                del_dia = []
+                for linea in entrada:
+                    try:
+                        del_dia.append(json.loads(linea))
+                    except ValueError:
+                        # Una línea a medio escribir si el proceso murió durante el append
+                        logging.warning(f"Línea inválida en {archivo}, se saltea")
+            ejemplos = del_dia + ejemplos
+            if len(ejemplos) >= self.maximo:
+                break
+        return ejemplos[-self.maximo:]
@@ -0,0 +1,132 @@
+# infrastructure/entrenar_modelo_intenciones.py
+from application.clasificador_intenciones import INTENCIONES_FLUJO, preprocesar
+from application.detectar_intencion_chatgpt_usecase import INTENCION_MODELO_UMBRAL
+from application.modelo_intenciones import ModeloIntenciones, evaluar, activar_version
+from infrastructure.ejemplos_intenciones import RegistroEjemplosIntencion, MODELO_INTENCIONES_DIR
+from collections import Counter
+import argparse
+import logging
+import zlib
+import json
+import sys
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+# Entrenamiento offline del modelo de intenciones, para correr a mano o desde cron:
+#   python -m infrastructure.entrenar_modelo_intenciones [--archivo pares.jsonl] [--sin-registro] [--activar]
+# Lee los pares que registró DetectarIntencionChatGPTUseCase en INTENCION_EJEMPLOS_DIR (y/o un JSONL con
+# {"texto", "intencion"} por línea), guarda una versión nueva en MODELO_INTENCIONES_DIR e imprime
+# la evaluación contra las etiquetas de ChatGPT de los mensajes que no se usaron para entrenar.
+
+# Semilla para arrancar sin historial: las frases guía del prompt de test/test_detectar_intencion.py
+# y los ejemplos de los prompts de ChatGPT/Gemini, más charla típica
+SEMILLA = (
+    ("quiero hacer un reclamo", "Reclamo"),
+    ("como hago un reclamo", "Reclamo"),
+    ("no tengo luz", "Reclamo"),
+    ("tengo un problema con el servicio electrico", "Reclamo"),
+    ("se corto la luz en mi casa", "Reclamo"),
+    ("hay un cable cortado en la calle", "Reclamo"),
+    ("el poste de luz esta por caerse", "Reclamo"),
+    ("se me quemaron los artefactos por la tension", "Reclamo"),
+    ("la luz va y viene", "Reclamo"),
+    ("quiero actualizar mi direccion", "Actualizar"),
+    ("actualizar mi correo", "Actualizar"),
+    ("como actualizo mis datos", "Actualizar"),
+    ("cambiar mi celular", "Actualizar"),
+    ("me mude y quiero cambiar la direccion", "Actualizar"),
+    ("tengo un numero de telefono nuevo", "Actualizar"),
+    ("quiero corregir mi email", "Actualizar"),
+    ("consultar el estado de mi reclamo", "Consultar"),
+    ("consultar estado", "Consultar"),
+    ("como esta mi reclamo", "Consultar"),
+    ("ya hice un reclamo y nadie vino", "Consultar"),
+    ("quiero saber si atendieron mi reclamo", "Consultar"),
+    ("ver mis reclamos", "Consultar"),
+    ("quiero ver mi factura", "ConsultarFacturas"),
+    ("cuanto tengo que pagar este mes", "ConsultarFacturas"),
+    ("cuando vence la boleta", "ConsultarFacturas"),
+    ("necesito la ultima factura", "ConsultarFacturas"),
+    ("cuanto consumi el mes pasado", "ConsultarFacturas"),
+    ("tengo deuda", "ConsultarFacturas"),
+    ("hola", "Conversar"),
+    ("buenas tardes", "Conversar"),
+    ("gracias", "Conversar"),
+    ("muchas gracias por la ayuda", "Conversar"),
+    ("chau", "Conversar"),
+    ("quien sos", "Conversar"),
+    ("en que me podes ayudar", "Conversar"),
+    ("a que hora atienden", "Conversar"),
+    ("donde queda la oficina", "Conversar"),
+    ("ok", "Conversar"),
+)
+
+# Uno de cada N textos (por hash, estable entre corridas) queda afuera del entrenamiento para evaluar
+PARTES_EVALUACION = 5
+
+def cargar_pares(archivo: str = None, registro: bool = True) -> list:
+    """Pares ``(texto, intencion, origen)`` de la semilla, el registro y el archivo, con el texto ya preprocesado."""
+    pares = [(preprocesar(texto), intencion, "semilla") for texto, intencion in SEMILLA]
+    if registro:
+        pares += [(ejemplo["texto"], ejemplo["intencion"], ejemplo.get("origen", "llm")) for ejemplo in RegistroEjemplosIntencion().leer()]
+    if archivo:
+        with open(archivo, encoding="utf-8") as entrada:
+            for linea in entrada:
+                if linea.strip():
+                    ejemplo = json.loads(linea)
+                    pares.append((preprocesar(ejemplo["texto"]), ejemplo["intencion"], ejemplo.get("origen", "llm")))
+    return pares
+
+def deduplicar(pares: list) -> list:
+    """Un ejemplo por texto, con la intención más votada (ChatGPT no siempre etiqueta igual)."""
+    votos = {}
+    origenes = {}
+    for texto, intencion, origen in pares:
+        if texto and intencion:
+            votos.setdefault(texto, Counter())[intencion] += 1
+            origenes.setdefault(texto, origen)
+    return [(texto, contador.most_common(1)[0][0], origenes[texto]) for texto, contador in votos.items()]
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Entrena el modelo de intenciones con los pares etiquetados por ChatGPT")
+    parser.add_argument("--archivo", help="JSONL con {\"texto\", \"intencion\"} por línea, además del registro")
+    parser.add_argument("--sin-registro", action="store_true", help="No leer los pares registrados en INTENCION_EJEMPLOS_DIR")
+    parser.add_argument("--directorio", default=MODELO_INTENCIONES_DIR, help=f"Versiones del modelo (por defecto {MODELO_INTENCIONES_DIR})")
+    parser.add_argument("--epocas", type=int, default=300)
+    parser.add_argument("--umbral", type=float, default=INTENCION_MODELO_UMBRAL, help="Umbral de servicio para la evaluación")
+    parser.add_argument("--activar", action="store_true", help="Dejar la versión nueva como actual si pasa --min-exactitud")
+    parser.add_argument("--min-exactitud", type=float, default=0.9, help="Exactitud mínima sobre los cubiertos para activar")
+    args = parser.parse_args(argv)
+
+    pares = deduplicar(cargar_pares(args.archivo, registro=not args.sin_registro))
+    evaluacion = [par for par in pares if par[2] != "semilla" and zlib.crc32(par[0].encode("utf-8")) % PARTES_EVALUACION == 0]
+    if not evaluacion:
+        # Sin etiquetas de ChatGPT todavía: se evalúa (optimista) sobre la misma semilla
+        logging.warning("No hay pares etiquetados por ChatGPT para evaluar; la evaluación es sobre la semilla")
+    en_evaluacion = {texto for texto, _, _ in evaluacion}
+    entrenamiento = [par for par in pares if par[0] not in en_evaluacion]
+    logging.info(f"{len(entrenamiento)} pares para entrenar, {len(evaluacion)} para evaluar")
+
+    modelo = ModeloIntenciones.entrenar([texto for texto, _, _ in entrenamiento],
+                                        [intencion for _, intencion, _ in entrenamiento], epocas=args.epocas)
+    evaluados = evaluacion or entrenamiento
+    reporte = evaluar(modelo, [texto for texto, _, _ in evaluados], [intencion for _, intencion, _ in evaluados],
+                      args.umbral, INTENCIONES_FLUJO)
+    reporte["sobre"] = "llm" if evaluacion else "semilla"
+    modelo.metadatos["evaluacion"] = reporte
+    archivo = modelo.guardar(args.directorio)
+
+    exactitud = reporte.get("exactitud_cubiertos")
+    activado = bool(args.activar and evaluacion and exactitud is not None and exactitud >= args.min_exactitud)
+    if activado:
+        activar_version(args.directorio, modelo.version)
+    elif args.activar:
+        logging.warning(f"La versión {modelo.version} no se activó: exactitud sobre los cubiertos {exactitud} "
+                        f"(mínimo {args.min_exactitud}, evaluada sobre {reporte['sobre']})")
+    print(json.dumps({"archivo": archivo, "version": modelo.version, "activada": activado, "evaluacion": reporte},
+                     ensure_ascii=False, indent=2))
+    return 0
+
+if __name__ == "__main__":
+    logging.info("🧠 Entrenando modelo de intenciones...")
+    sys.exit(main())
@@ -0,0 +1,37 @@
+# infrastructure/exportar_reclamos.py
+from infrastructure.database import get_db_session
+from infrastructure.sqlalchemy_reclamo_repository import SQLAlchemyReclamoRepository
+from application.exportar_reclamos_usecase import ExportarReclamosUseCase, VENTANA_RELECTURA
+import argparse
+import logging
+import json
+import sys
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+# Export de reclamos a Parquet para BI, para correr desde cron/Programador de tareas:
+#   python -m infrastructure.exportar_reclamos DIRECTORIO [--tamano-lote 5000] [--ventana 1000] [--completo]
+# Conviene programar también un --completo periódico (p. ej. semanal): es lo único que lleva a BI
+# los cambios de estado y los reclamos que se confirmaron fuera de la ventana de relectura.
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Exporta Reclamos + Clientes de DECSA_EXC a archivos Parquet")
+    parser.add_argument("directorio", help="Directorio de los archivos reclamos_<desde>_<hasta>.parquet")
+    parser.add_argument("--tamano-lote", type=int, default=5000, help="Reclamos por lote/row group (por defecto 5000)")
+    parser.add_argument("--ventana", type=int, default=VENTANA_RELECTURA,
+                        help=f"IDs debajo de la marca de agua que se vuelven a revisar (por defecto {VENTANA_RELECTURA})")
+    parser.add_argument("--completo", action="store_true", help="Exporta todos los reclamos en un archivo y reemplaza los anteriores")
+    args = parser.parse_args(argv)
+
+    session = get_db_session(bind="db2")
+    try:
+        usecase = ExportarReclamosUseCase(SQLAlchemyReclamoRepository(session), args.tamano_lote, args.ventana)
+        resultado, status = usecase.ejecutar(args.directorio, completo=args.completo)
+    finally:
+        session.close()
+    print(json.dumps(resultado, ensure_ascii=False, default=str))
+    return 0 if status == 200 else 1
+
+if __name__ == "__main__":
+    logging.info("📦 Iniciando export de reclamos a Parquet...")
+    sys.exit(main())
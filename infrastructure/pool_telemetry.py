@@ -0,0 +1,168 @@
+# infrastructure/pool_telemetry.py
+from sqlalchemy import event, exc
+from sqlalchemy.engine.interfaces import CacheStats
+from sqlalchemy.pool import QueuePool, AsyncAdaptedQueuePool
+import threading
+import logging
+import time
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+# Límites superiores (en ms) de los buckets del histograma de espera en el checkout
+BUCKETS_ESPERA_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 5000)
+
+class TelemetriaPool:
+    """Contadores de un pool de conexiones (un bind: db1, db2, réplicas, engines async)."""
+
+    def __init__(self, bind: str):
+        self.bind = bind
+        self.engine = None
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.checkins = 0
+        self.conexiones_creadas = 0
+        self.invalidaciones = 0
+        self.invalidaciones_suaves = 0
+        self.timeouts = 0
+        self.histograma = [0] * (len(BUCKETS_ESPERA_MS) + 1)
+        self.espera_total_ms = 0.0
+        self.espera_max_ms = 0.0
+        # Caché de compilación de sentencias del engine: hit = SQL ya compilado para esa estructura
+        self.sentencias_cacheadas = 0
+        self.sentencias_compiladas = 0
+        self.sentencias_sin_cache = 0
+
+    def registrar_espera(self, espera_ms: float, timeout: bool = False):
+        with self._lock:
+            if timeout:
+                self.timeouts += 1
+            for i, limite in enumerate(BUCKETS_ESPERA_MS):
+                if espera_ms <= limite:
+                    self.histograma[i] += 1
+                    break
+            else:
+                self.histograma[-1] += 1
+            self.espera_total_ms += espera_ms
+            self.espera_max_ms = max(self.espera_max_ms, espera_ms)
+
+    def incrementar(self, contador: str):
+        with self._lock:
+            setattr(self, contador, getattr(self, contador) + 1)
+
+    def registrar_sentencia(self, cache_hit):
+        if cache_hit == CacheStats.CACHE_HIT:
+            self.incrementar("sentencias_cacheadas")
+        elif cache_hit == CacheStats.CACHE_MISS:
+            self.incrementar("sentencias_compiladas")
+        else:
+            self.incrementar("sentencias_sin_cache")
+
+    def _resumen_sentencias(self) -> dict:
+        cache = getattr(self.engine, "_compiled_cache", None)
+        ejecutadas = self.sentencias_cacheadas + self.sentencias_compiladas
+        return {
+            "hits": self.sentencias_cacheadas,
+            "misses": self.sentencias_compiladas,
+            "sin_cache": self.sentencias_sin_cache,
+            "tasa_hits": round(self.sentencias_cacheadas / ejecutadas, 4) if ejecutadas else 0.0,
+            "entradas": len(cache) if cache is not None else 0,
+            "capacidad": getattr(cache, "capacity", 0),
+        }
+
+    def resumen(self) -> dict:
+        pool = self.engine.pool if self.engine is not None else None
+        esperas = sum(self.histograma)
+        with self._lock:
+            resumen = {
+                "bind": self.bind,
+                "checkouts": self.checkouts,
+                "checkins": self.checkins,
+                "conexiones_creadas": self.conexiones_creadas,
+                "invalidaciones": self.invalidaciones,
+                "invalidaciones_suaves": self.invalidaciones_suaves,
+                "timeouts": self.timeouts,
+                "espera_checkout_ms": {
+                    "buckets": {
+                        **{f"<={limite}": n for limite, n in zip(BUCKETS_ESPERA_MS, self.histograma)},
+                        f">{BUCKETS_ESPERA_MS[-1]}": self.histograma[-1],
+                    },
+                    "promedio": round(self.espera_total_ms / esperas, 3) if esperas else 0.0,
+                    "maximo": round(self.espera_max_ms, 3),
+                },
+                "cache_sentencias": self._resumen_sentencias(),
+            }
+        if isinstance(pool, QueuePool):
+            resumen.update({
+                "pool_size": pool.size(),
+                "conexiones_en_uso": pool.checkedout(),
+                "conexiones_libres": pool.checkedin(),
+                # overflow() es negativo mientras el pool base no se llenó
+                "overflow_en_uso": max(pool.overflow(), 0),
+            })
+        return resumen
+
+_telemetrias: dict = {}
+_telemetrias_lock = threading.Lock()
+
+def obtener_telemetria(bind: str) -> TelemetriaPool:
+    with _telemetrias_lock:
+        if bind not in _telemetrias:
+            _telemetrias[bind] = TelemetriaPool(bind)
+        return _telemetrias[bind]
+
+def resumen_pools() -> list:
+    return [telemetria.resumen() for telemetria in list(_telemetrias.values())]
+
+class _EsperaMedida:
+    """Mide cuánto tarda ``_do_get`` en entregar una conexión (espera en la cola o conexión nueva por overflow).
+
+    El bind sale de ``pool_logging_name``, que el pool conserva al recrearse con ``dispose()``.
+    """
+
+    def _do_get(self):
+        inicio = time.perf_counter()
+        try:
+            conexion = super()._do_get()
+        except exc.TimeoutError:
+            obtener_telemetria(self._orig_logging_name).registrar_espera((time.perf_counter() - inicio) * 1000, timeout=True)
+            raise
+        obtener_telemetria(self._orig_logging_name).registrar_espera((time.perf_counter() - inicio) * 1000)
+        return conexion
+
+class QueuePoolMedido(_EsperaMedida, QueuePool):
+    pass
+
+class AsyncAdaptedQueuePoolMedido(_EsperaMedida, AsyncAdaptedQueuePool):
+    pass
+
+def instrumentar(engine, bind: str):
+    """Registra los eventos de pool del engine (síncrono o ``AsyncEngine.sync_engine``) bajo el nombre del bind."""
+    telemetria = obtener_telemetria(bind)
+    telemetria.engine = engine
+
+    @event.listens_for(engine, "connect")
+    def al_conectar(dbapi_connection, connection_record):
+        telemetria.incrementar("conexiones_creadas")
+
+    @event.listens_for(engine, "checkout")
+    def al_checkout(dbapi_connection, connection_record, connection_proxy):
+        telemetria.incrementar("checkouts")
+
+    @event.listens_for(engine, "checkin")
+    def al_checkin(dbapi_connection, connection_record):
+        telemetria.incrementar("checkins")
+
+    @event.listens_for(engine, "invalidate")
+    def al_invalidar(dbapi_connection, connection_record, exception):
+        telemetria.incrementar("invalidaciones")
+        logging.warning(f"Conexión invalidada en el pool {bind}: {str(exception)}")
+
+    @event.listens_for(engine, "soft_invalidate")
+    def al_invalidar_suave(dbapi_connection, connection_record, exception):
+        telemetria.incrementar("invalidaciones_suaves")
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def al_ejecutar(conn, cursor, statement, parameters, context, executemany):
+        telemetria.registrar_sentencia(context.cache_hit if context is not None else None)
+
+    return telemetria
@@ -0,0 +1,178 @@
+# infrastructure/pr_cau_cache.py
+from infrastructure.configuracion import leer_config, leer_config_bool
+from infrastructure.redis_client import AccesoRedis
+from datetime import date, datetime
+from decimal import Decimal
+import threading
+import logging
+import redis
+import json
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+# Caché read-through (en Redis) de las consultas a PR_CAU por DNI: un mismo DNI se consulta
+# varias veces en un flujo de chat (pedir_dni, copia a DECSA_EXC, facturas) y otra vez en cada
+# reintento. Las TTL van en segundos, por tipo de entrada.
+PR_CAU_CACHE_ENABLED = leer_config_bool("PR_CAU_CACHE_ENABLED", True)
+PR_CAU_CACHE_TTL = {
+    "identidad": leer_config("PR_CAU_CACHE_TTL_IDENTIDAD", 600, int),
+    **dict.fromkeys(("facturas", "ultima_factura", "resumen_facturas", "consumos"), leer_config("PR_CAU_CACHE_TTL_FACTURAS", 300, int)),
+}
+# DNI inexistente en PR_CAU: TTL corta para no repetir la consulta en cada reintento del usuario
+PR_CAU_CACHE_TTL_NEGATIVO = leer_config("PR_CAU_CACHE_TTL_NEGATIVO", 60, int)
+# Segundos sin usar Redis después de un error de conexión (se consulta PR_CAU directo)
+PR_CAU_CACHE_COOLDOWN = leer_config("PR_CAU_CACHE_COOLDOWN", 30, float)
+
+# El número cambia con el formato de serializar(): las entradas del formato anterior no se leen y vencen solas
+PREFIJO = "prcau:2"
+
+# Los valores que JSON no representa van marcados con su tipo ({"$d": "12.50"}) para volver igual
+# que los devolvió el driver: una columna que llegó como int o float sigue siéndolo en un hit, y una
+# DECIMAL sigue siendo Decimal
+_MARCAS = {"$d": Decimal, "$t": datetime.fromisoformat, "$f": date.fromisoformat}
+
+def _a_json(valor):
+    if isinstance(valor, Decimal):
+        return {"$d": str(valor)}
+    if isinstance(valor, datetime):
+        return {"$t": valor.isoformat()}
+    if isinstance(valor, date):
+        return {"$f": valor.isoformat()}
+    raise TypeError(f"Tipo no serializable en la caché de PR_CAU: {type(valor).__name__}")
+
+def _de_json(objeto: dict):
+    if len(objeto) == 1:
+        (marca, valor), = objeto.items()
+        if marca in _MARCAS:
+            return _MARCAS[marca](valor)
+    return objeto
+
+def serializar(filas) -> str:
+    """Forma compacta: columnas una sola vez y las filas como listas de valores.
+
+    ``None`` (DNI inexistente) se guarda como ``null``; un dict suelto como una única fila.
+    """
+    if filas is None:
+        return "null"
+    unica = isinstance(filas, dict)
+    filas = [filas] if unica else filas
+    columnas = list(filas[0]) if filas else []
+    return json.dumps(
+        {"u": unica, "c": columnas, "f": [[fila[columna] for columna in columnas] for fila in filas]},
+        separators=(",", ":"),
+        ensure_ascii=False,
+        default=_a_json,
+    )
+
+def deserializar(texto: str):
+    datos = json.loads(texto, object_hook=_de_json)
+    if datos is None:
+        return None
+    columnas = datos["c"]
+    filas = [dict(zip(columnas, fila)) for fila in datos["f"]]
+    return filas[0] if datos["u"] else filas
+
+class CachePrCau(AccesoRedis):
+    """Entradas ``<PREFIJO>:<tipo>:<dni>[:<parámetros>]`` con TTL propia.
+
+    Cada DNI lleva además un set ``<PREFIJO>:claves:<dni>`` con sus claves, para invalidar todas
+    las variantes (p. ej. las páginas de facturas) cuando se escribe el cliente. Si Redis no
+    responde la caché se saltea y se consulta PR_CAU directamente.
+    """
+
+    descripcion = "Caché de PR_CAU"
+    alternativa = "se consulta la base"
+
+    def __init__(self, redis_client=None, ttl: dict = None, ttl_negativo: int = PR_CAU_CACHE_TTL_NEGATIVO,
+                 cooldown: float = PR_CAU_CACHE_COOLDOWN):
+        super().__init__(redis_client, cooldown)
+        self.ttl = dict(PR_CAU_CACHE_TTL, **(ttl or {}))
+        self.ttl_negativo = ttl_negativo
+        self.hits = 0
+        self.misses = 0
+        self.invalidaciones = 0
+
+    def _incrementar(self, contador: str):
+        with self._lock:
+            setattr(self, contador, getattr(self, contador) + 1)
+
+    @staticmethod
+    def clave(tipo: str, dni: str, *parametros) -> str:
+        clave = f"{PREFIJO}:{tipo}:{dni}"
+        if parametros:
+            clave += ":" + ":".join("" if parametro is None else str(parametro) for parametro in parametros)
+        return clave
+
+    def leer_a_traves(self, tipo: str, dni: str, cargar, *parametros):
+        """Devuelve la entrada cacheada o ejecuta ``cargar()`` y la guarda (incluso si es None/vacía)."""
+        if not self._disponible():
+            return cargar()
+        clave = self.clave(tipo, dni, *parametros)
+        try:
+            texto = self.redis.get(clave)
+        except redis.RedisError as e:
+            self._fallo("lectura", e)
+            return cargar()
+        if texto is not None:
+            self._incrementar("hits")
+            return deserializar(texto)
+
+        self._incrementar("misses")
+        valor = cargar()
+        ttl = self.ttl[tipo] if valor else self.ttl_negativo
+        # Fuera del try: un valor que no se puede serializar es un error del código, no de Redis
+        texto = serializar(valor)
+        try:
+            clave_dni = self.clave("claves", dni)
+            pipe = self.redis.pipeline()
+            pipe.set(clave, texto, ex=ttl)
+            pipe.sadd(clave_dni, clave)
+            pipe.expire(clave_dni, max(self.ttl.values()))
+            pipe.execute()
+        except redis.RedisError as e:
+            self._fallo("escritura", e)
+        return valor
+
+    def invalidar(self, *dnis: str):
+        """Borra todas las entradas de los DNI (identidad, facturas y última factura)."""
+        dnis = [dni for dni in dnis if dni]
+        if not dnis or not self._disponible():
+            return
+        claves_dni = [self.clave("claves", dni) for dni in dnis]
+        try:
+            pipe = self.redis.pipeline()
+            for clave_dni in claves_dni:
+                pipe.smembers(clave_dni)
+            claves = [clave for miembros in pipe.execute() for clave in miembros]
+            self.redis.delete(*claves_dni, *claves)
+            self._incrementar("invalidaciones")
+            logging.info(f"Caché de PR_CAU invalidada para {len(dnis)} DNI: {len(claves)} entradas")
+        except redis.RedisError as e:
+            self._fallo("invalidación", e)
+
+    def resumen(self) -> dict:
+        with self._lock:
+            consultas = self.hits + self.misses
+            return {
+                "habilitada": PR_CAU_CACHE_ENABLED,
+                "hits": self.hits,
+                "misses": self.misses,
+                "tasa_hits": round(self.hits / consultas, 4) if consultas else 0.0,
+                "errores": self.errores,
+                "invalidaciones": self.invalidaciones,
+                "ttl": self.ttl,
+                "ttl_negativo": self.ttl_negativo,
+            }
+
+_cache = None
+_cache_lock = threading.Lock()
+
+def obtener_cache_pr_cau():
+    """Caché compartida del proceso, o None si está deshabilitada (PR_CAU_CACHE_ENABLED=false)."""
+    global _cache
+    if not PR_CAU_CACHE_ENABLED:
+        return None
+    with _cache_lock:
+        if _cache is None:
+            _cache = CachePrCau()
+        return _cache
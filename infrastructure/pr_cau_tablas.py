@@ -0,0 +1,66 @@
+# infrastructure/pr_cau_tablas.py
+from sqlalchemy import table, column, DateTime
+
+# Tablas de PR_CAU (db1). El esquema lo administra el sistema de facturación, así que no se
+# mapean entidades: sólo se declaran las columnas que consultan los repositorios, para armar
+# las consultas con Core (TOP/LIMIT, filtros opcionales) según el dialecto de cada bind. Las fechas
+# se tipan para que todos los drivers devuelvan datetime.
+
+PERSONAS = table(
+    "PERSONAS",
+    column("COD_PER"),
+    column("APELLIDOS"),
+    column("NOMBRES"),
+    column("NUM_DNI"),
+    column("SEXO"),
+    column("TELEFONO"),
+    column("EMAIL"),
+    column("COD_POS"),
+    column("FEC_ALTA", DateTime),
+    column("OBSERVAC"),
+)
+
+FACTURAS = table(
+    "FACTURAS",
+    column("ID_FAC"),
+    column("COD_PER"),
+    column("COD_SUM"),
+    column("NUM_COM"),
+    column("FECHA", DateTime),
+    column("PAGA"),
+    column("TOTAL1"),
+    column("VTO1", DateTime),
+)
+
+SUMSOC = table(
+    "SUMSOC",
+    column("COD_SUM"),
+    column("OBS_POS"),
+    column("COD_BAR"),
+    column("COD_CAL"),
+)
+
+CONS_SER = table(
+    "CONS_SER",
+    column("ID_FAC"),
+    column("PERIODO"),
+    column("CONSUMO"),
+)
+
+BARRIOS = table(
+    "BARRIOS",
+    column("COD_BAR"),
+    column("DES_BAR"),
+)
+
+CALLES = table(
+    "CALLES",
+    column("COD_CAL"),
+    column("DES_CAL"),
+)
+
+SERSOC = table(
+    "SERSOC",
+    column("COD_SUM"),
+    column("NUM_MED"),
+)
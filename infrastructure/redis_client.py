@@ -1,6 +1,16 @@
 #infraestructure/redis_client.py
 import redis
 from infrastructure.settings import Config
+from infrastructure.configuracion import leer_config
+import threading
+import logging
+import time
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+# Segundos máximos para conectar y para cada operación: con Redis colgado la llamada falla (y las
+# cachés lo saltean durante su cooldown) en lugar de dejar al worker esperando indefinidamente
+REDIS_SOCKET_TIMEOUT = leer_config("REDIS_SOCKET_TIMEOUT", 2, float)
 
 class RedisClient:
     def __init__(self):
@@ -8,8 +18,55 @@ class RedisClient:
             host=Config.REDIS_HOST or "localhost",
             port=Config.REDIS_PORT or 6379,
             db=0,
-            decode_responses=True
+            decode_responses=True,
+            socket_timeout=REDIS_SOCKET_TIMEOUT,
+            socket_connect_timeout=REDIS_SOCKET_TIMEOUT,
         )
 
     def get_client(self):
-        return self.client
\ No newline at end of file
+        return self.client
+
+_cliente = None
+_cliente_lock = threading.Lock()
+
+def obtener_redis():
+    """Cliente compartido del proceso para las cachés y registros (un solo pool de conexiones)."""
+    global _cliente
+    with _cliente_lock:
+        if _cliente is None:
+            _cliente = RedisClient().get_client()
+        return _cliente
+
+class AccesoRedis:
+    """Base de las cachés sobre Redis: cliente perezoso y salteo temporal de Redis después de un error.
+
+    Sin ``redis_client`` se usa el compartido del proceso recién en el primer uso (importar o
+    construir no conecta). Después de un error ``_disponible()`` da False durante ``cooldown``
+    segundos y quien llama va directo al origen (la base o el LLM).
+    """
+
+    # Para el log de _fallo: "<descripcion> no disponible (<operación>), <alternativa> por <cooldown>s"
+    descripcion = "Redis"
+    alternativa = "se saltea"
+
+    def __init__(self, redis_client=None, cooldown: float = 0.0):
+        self._redis = redis_client
+        self.cooldown = cooldown
+        self._no_disponible_hasta = 0.0
+        self._lock = threading.Lock()
+        self.errores = 0
+
+    @property
+    def redis(self):
+        if self._redis is None:
+            self._redis = obtener_redis()
+        return self._redis
+
+    def _disponible(self) -> bool:
+        return time.monotonic() >= self._no_disponible_hasta
+
+    def _fallo(self, operacion: str, error: Exception):
+        with self._lock:
+            self.errores += 1
+        self._no_disponible_hasta = time.monotonic() + self.cooldown
+        logging.warning(f"{self.descripcion} no disponible ({operacion}), {self.alternativa} por {self.cooldown:.0f}s: {str(error)}")
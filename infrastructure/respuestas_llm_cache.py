@@ -0,0 +1,185 @@
+# infrastructure/respuestas_llm_cache.py
+from infrastructure.configuracion import leer_config, leer_config_bool
+from infrastructure.redis_client import AccesoRedis
+import unicodedata
+import threading
+import hashlib
+import logging
+import json
+import time
+import re
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+# Caché (en Redis) de las respuestas de los LLM (ChatGPT, Gemini, DeepSeek) compartida por todos
+# los workers y reinicios: la clave es un SHA-256 del mensaje normalizado, los turnos previos del
+# historial que se tienen en cuenta, la versión del prompt y el modelo. Un hit ahorra una llamada
+# paga de 1-3 s. Las TTL van en segundos, por intención de la respuesta.
+LLM_CACHE_ENABLED = leer_config_bool("LLM_CACHE_ENABLED", True)
+LLM_CACHE_TTL = {
+    # Charla libre: depende más del contexto, se renueva seguido
+    "Conversar": leer_config("LLM_CACHE_TTL_CONVERSAR", 3600, int),
+    # Inicio de un flujo (pedir DNI, elegir el dato a actualizar): texto estable
+    **dict.fromkeys(("Reclamo", "Actualizar", "Consultar", "ConsultarFacturas"), leer_config("LLM_CACHE_TTL_FLUJO", 86400, int)),
+}
+# Respuestas más grandes que esto (bytes UTF-8) no se guardan
+LLM_CACHE_MAX_BYTES = leer_config("LLM_CACHE_MAX_BYTES", 4096, int)
+# Turnos previos del usuario que entran en la clave (el mensaje actual va aparte)
+LLM_CACHE_TURNOS_HISTORIAL = leer_config("LLM_CACHE_TURNOS_HISTORIAL", 2, int)
+# Segundos sin usar Redis después de un error de conexión (se llama al LLM directo)
+LLM_CACHE_COOLDOWN = leer_config("LLM_CACHE_COOLDOWN", 30, float)
+
+PREFIJO = "llm"
+# Separador de los turnos en el historial que arman los adapters ("Usuario: ... | Usuario: ...")
+SEPARADOR_HISTORIAL = " | "
+
+_ESPACIOS = re.compile(r"\s+")
+_PUNTUACION_BORDES = "¡!¿?.,;:… \"'"
+
+def normalizar(texto: str) -> str:
+    """Minúsculas, sin tildes, espacios colapsados y sin puntuación en los bordes: "¡Hola! " y "hola" son el mismo mensaje."""
+    texto = unicodedata.normalize("NFKD", texto or "").casefold()
+    texto = "".join(caracter for caracter in texto if not unicodedata.combining(caracter))
+    return _ESPACIOS.sub(" ", texto).strip(_PUNTUACION_BORDES)
+
+def historial_relevante(historial: str, turnos: int = LLM_CACHE_TURNOS_HISTORIAL) -> list:
+    """Los últimos ``turnos`` turnos normalizados antes del mensaje actual.
+
+    Los adapters agregan el mensaje actual al final del historial antes de llamar al LLM, así que
+    el último turno se descarta (el mensaje ya va en la clave). Con ``turnos=0`` sólo cuenta si
+    hubo diálogo previo, que es lo que cambia la presentación en los prompts.
+    """
+    partes = [normalizar(parte) for parte in (historial or "").split(SEPARADOR_HISTORIAL) if parte.strip()][:-1]
+    if turnos <= 0:
+        return ["..."] if partes else []
+    return partes[-turnos:]
+
+class CacheRespuestasLLM(AccesoRedis):
+    """Entradas ``llm:<proveedor>:<sha256>`` con la respuesta JSON del modelo.
+
+    Sólo se guardan respuestas JSON válidas con una intención conocida (no las de error ni las de
+    "no entendí"). Si Redis no responde la caché se saltea y se llama al LLM. Los contadores son
+    por proveedor: hits, misses, latencia de la lectura en Redis y de las llamadas al LLM.
+    """
+
+    descripcion = "Caché de respuestas LLM"
+    alternativa = "se llama al modelo"
+
+    def __init__(self, redis_client=None, ttl: dict = None, max_bytes: int = LLM_CACHE_MAX_BYTES,
+                 turnos_historial: int = LLM_CACHE_TURNOS_HISTORIAL, cooldown: float = LLM_CACHE_COOLDOWN):
+        super().__init__(redis_client, cooldown)
+        self.ttl = dict(LLM_CACHE_TTL, **(ttl or {}))
+        self.max_bytes = max_bytes
+        self.turnos_historial = turnos_historial
+        self._contadores = {}
+
+    def _contador(self, proveedor: str) -> dict:
+        contador = self._contadores.get(proveedor)
+        if contador is None:
+            contador = self._contadores.setdefault(proveedor, {
+                "hits": 0, "misses": 0, "guardadas": 0, "omitidas": 0,
+                "segundos_lectura": 0.0, "llamadas_llm": 0, "segundos_llm": 0.0,
+            })
+        return contador
+
+    def _sumar(self, proveedor: str, **valores):
+        with self._lock:
+            contador = self._contador(proveedor)
+            for nombre, valor in valores.items():
+                contador[nombre] += valor
+
+    def clave(self, proveedor: str, modelo: str, version_prompt: str, mensaje: str, historial: str = "") -> str:
+        contenido = json.dumps(
+            [version_prompt, modelo, normalizar(mensaje), historial_relevante(historial, self.turnos_historial)],
+            separators=(",", ":"),
+            ensure_ascii=False,
+        )
+        return f"{PREFIJO}:{proveedor}:{hashlib.sha256(contenido.encode('utf-8')).hexdigest()}"
+
+    @staticmethod
+    def _proveedor(clave: str) -> str:
+        return clave.split(":", 2)[1]
+
+    def obtener(self, clave: str):
+        """La respuesta cacheada o None (miss, o Redis no disponible)."""
+        proveedor = self._proveedor(clave)
+        if not self._disponible():
+            return None
+        inicio = time.perf_counter()
+        try:
+            texto = self.redis.get(clave)
+        except Exception as e:
+            self._fallo("lectura", e)
+            return None
+        segundos = time.perf_counter() - inicio
+        if texto is None:
+            self._sumar(proveedor, misses=1, segundos_lectura=segundos)
+            return None
+        self._sumar(proveedor, hits=1, segundos_lectura=segundos)
+        # Un cliente sin decode_responses devuelve bytes
+        return texto.decode("utf-8") if isinstance(texto, bytes) else texto
+
+    def guardar(self, clave: str, respuesta: str, segundos_llm: float = 0.0):
+        """Guarda la respuesta con la TTL de su intención; ``segundos_llm`` es lo que tardó el modelo."""
+        proveedor = self._proveedor(clave)
+        self._sumar(proveedor, llamadas_llm=1, segundos_llm=segundos_llm)
+        try:
+            intencion = json.loads(respuesta).get("intencion")
+        except (ValueError, AttributeError):
+            intencion = None
+        tamano = len(respuesta.encode("utf-8"))
+        if intencion not in self.ttl or tamano > self.max_bytes:
+            self._sumar(proveedor, omitidas=1)
+            logging.info(f"Respuesta de {proveedor} no cacheada (intención {intencion}, {tamano} bytes)")
+            return
+        if not self._disponible():
+            return
+        try:
+            self.redis.set(clave, respuesta, ex=self.ttl[intencion])
+        except Exception as e:
+            self._fallo("escritura", e)
+            return
+        self._sumar(proveedor, guardadas=1)
+
+    def resumen(self) -> dict:
+        with self._lock:
+            proveedores = {}
+            for proveedor, contador in self._contadores.items():
+                consultas = contador["hits"] + contador["misses"]
+                llamadas = contador["llamadas_llm"]
+                llm_ms = contador["segundos_llm"] / llamadas * 1000 if llamadas else 0.0
+                proveedores[proveedor] = {
+                    "hits": contador["hits"],
+                    "misses": contador["misses"],
+                    "tasa_hits": round(contador["hits"] / consultas, 4) if consultas else 0.0,
+                    "guardadas": contador["guardadas"],
+                    "omitidas": contador["omitidas"],
+                    "lectura_media_ms": round(contador["segundos_lectura"] / consultas * 1000, 2) if consultas else 0.0,
+                    "llm_medio_ms": round(llm_ms, 1),
+                    # Lo que se hubiera esperado al modelo en los hits, a su latencia media
+                    "ahorro_estimado_s": round(contador["hits"] * llm_ms / 1000, 1),
+                }
+            return {
+                "habilitada": LLM_CACHE_ENABLED,
+                "errores": self.errores,
+                "ttl": self.ttl,
+                "max_bytes": self.max_bytes,
+                "turnos_historial": self.turnos_historial,
+                "proveedores": proveedores,
+            }
+
+_cache = None
+_cache_lock = threading.Lock()
+
+def obtener_cache_respuestas_llm(redis_client=None):
+    """Caché compartida del proceso, o None si está deshabilitada (LLM_CACHE_ENABLED=false).
+
+    ``redis_client`` sólo se usa al crearla; si no se pasa se usa el cliente compartido (obtener_redis).
+    """
+    global _cache
+    if not LLM_CACHE_ENABLED:
+        return None
+    with _cache_lock:
+        if _cache is None:
+            _cache = CacheRespuestasLLM(redis_client)
+        return _cache
@@ -0,0 +1,161 @@
+# infrastructure/respuestas_similares_cache.py
+from infrastructure.configuracion import leer_config, leer_config_bool
+from infrastructure.respuestas_llm_cache import historial_relevante, normalizar
+from collections import OrderedDict
+import numpy as np
+import threading
+import logging
+import zlib
+import re
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+# Caché por similitud (en memoria del proceso) de las respuestas del LLM al primer mensaje de una
+# conversación: "no tengo luz", "no tengo luz!!", "hola buenas" y sus variantes reusan una respuesta
+# ya generada en lugar de llamar al modelo. La caché exacta (respuestas_llm_cache) no las junta
+# porque la clave lleva el texto normalizado tal cual. Sólo para aperturas: con diálogo previo la
+# respuesta depende del historial.
+LLM_SIMILARES_ENABLED = leer_config_bool("LLM_SIMILARES_ENABLED", True)
+# Jaccard mínimo entre las palabras de dos mensajes para reusar la respuesta. Alto a propósito: en
+# mensajes de 4-6 palabras una sola distinta ("desde ayer" / "desde hoy") ya cambia el sentido
+LLM_SIMILARES_UMBRAL = leer_config("LLM_SIMILARES_UMBRAL", 0.85, float)
+# Entradas por proceso; al llenarse se descarta la usada hace más tiempo (LRU)
+LLM_SIMILARES_MAX = leer_config("LLM_SIMILARES_MAX", 5000, int)
+
+# Firma MinHash: PERMUTACIONES hashes universales (a·h + b) mod p, agrupados en bandas de FILAS
+# valores para el LSH. Un par con Jaccard J es candidato con probabilidad 1 - (1 - J^FILAS)^BANDAS:
+# 0.997 con J=0.85 y 0.40 con J=0.5 (los candidatos se confirman con el Jaccard exacto)
+BANDAS = 8
+FILAS = 4
+PERMUTACIONES = BANDAS * FILAS
+_PRIMO = (1 << 31) - 1
+_generador = np.random.default_rng(20240601)
+_A = _generador.integers(1, _PRIMO, size=PERMUTACIONES, dtype=np.int64)
+_B = _generador.integers(0, _PRIMO, size=PERMUTACIONES, dtype=np.int64)
+_PALABRA = re.compile(r"\w+")
+_REPETIDAS = re.compile(r"(\w)\1+")
+# Palabras que invierten o cambian el sentido del mensaje: dos mensajes sólo se juntan si tienen
+# las mismas ("quiero hacer un reclamo" / "no quiero hacer un reclamo", "no tengo luz" / "ya tengo luz")
+NEGACIONES = frozenset({"no", "nunca", "ya", "sin", "ni", "tampoco"})
+
+def terminos(texto: str) -> frozenset:
+    """Palabras del mensaje normalizado, sin puntuación y con las letras repetidas colapsadas
+    ("luzz" y "holaaa" cuentan como "luz" y "hola")."""
+    return frozenset(_REPETIDAS.sub(r"\1", palabra) for palabra in _PALABRA.findall(normalizar(texto)))
+
+def minhash(conjunto: frozenset) -> tuple:
+    """Firma MinHash del conjunto, ya partida en BANDAS tuplas de FILAS valores."""
+    hashes = np.fromiter((zlib.crc32(termino.encode("utf-8")) for termino in conjunto), dtype=np.int64, count=len(conjunto))
+    # a < 2^31 y h < 2^32: el producto entra en int64
+    firma = ((hashes[:, None] * _A + _B) % _PRIMO).min(axis=0)
+    return tuple(tuple(banda) for banda in firma.reshape(BANDAS, FILAS).tolist())
+
+def jaccard(a: frozenset, b: frozenset) -> float:
+    return len(a & b) / len(a | b) if a or b else 1.0
+
+def es_apertura(historial: str) -> bool:
+    """True si no hubo turnos antes del mensaje actual (el historial sólo trae el mensaje en curso)."""
+    return not historial_relevante(historial, 0)
+
+class CacheRespuestasSimilares:
+    """Respuestas ``{"intencion", "respuesta"}`` indexadas por la firma MinHash del mensaje.
+
+    Las entradas van por ``espacio`` (proveedor, modelo y versión del prompt). Las bandas de la
+    firma MinHash sólo sirven para encontrar candidatos sin recorrer todas las entradas; la
+    respuesta se reusa si los dos mensajes tienen las mismas NEGACIONES y el Jaccard exacto entre
+    sus palabras llega al umbral. Memoria acotada a ``maximo`` entradas con desalojo LRU.
+    """
+
+    def __init__(self, umbral: float = LLM_SIMILARES_UMBRAL, maximo: int = LLM_SIMILARES_MAX):
+        self.umbral = umbral
+        self.maximo = maximo
+        self._entradas = OrderedDict()
+        self._bandas = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.desalojos = 0
+
+    @staticmethod
+    def _claves_banda(espacio: str, firma: tuple):
+        return [(espacio, banda, valores) for banda, valores in enumerate(firma)]
+
+    def obtener(self, espacio: str, mensaje: str):
+        """La respuesta del mensaje guardado más parecido (si llega al umbral), o None."""
+        conjunto = terminos(mensaje)
+        if not conjunto:
+            return None
+        firma = minhash(conjunto)
+        negaciones = conjunto & NEGACIONES
+        with self._lock:
+            mejor, similitud = None, 0.0
+            for clave_banda in self._claves_banda(espacio, firma):
+                for clave in self._bandas.get(clave_banda, ()):
+                    candidato = self._entradas[clave][0]
+                    if candidato & NEGACIONES != negaciones:
+                        continue
+                    valor = jaccard(conjunto, candidato)
+                    if valor > similitud:
+                        mejor, similitud = clave, valor
+            if mejor is None or similitud < self.umbral:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._entradas.move_to_end(mejor)
+            respuesta = self._entradas[mejor][1]
+        logging.info(f"Respuesta reusada por similitud ({similitud:.2f}) para '{mensaje}'")
+        return respuesta
+
+    def guardar(self, espacio: str, mensaje: str, respuesta: str):
+        conjunto = terminos(mensaje)
+        if not conjunto:
+            return
+        clave = (espacio, conjunto)
+        with self._lock:
+            if clave in self._entradas:
+                self._entradas.move_to_end(clave)
+                self._entradas[clave] = (conjunto, respuesta, self._entradas[clave][2])
+                return
+            firma = minhash(conjunto)
+            self._entradas[clave] = (conjunto, respuesta, firma)
+            for clave_banda in self._claves_banda(espacio, firma):
+                self._bandas.setdefault(clave_banda, set()).add(clave)
+            while len(self._entradas) > self.maximo:
+                self._desalojar()
+
+    def _desalojar(self):
+        (espacio, conjunto), (_, _, firma) = self._entradas.popitem(last=False)
+        for clave_banda in self._claves_banda(espacio, firma):
+            claves = self._bandas.get(clave_banda)
+            if claves is not None:
+                claves.discard((espacio, conjunto))
+                if not claves:
+                    del self._bandas[clave_banda]
+        self.desalojos += 1
+
+    def resumen(self) -> dict:
+        with self._lock:
+            consultas = self.hits + self.misses
+            return {
+                "habilitada": LLM_SIMILARES_ENABLED,
+                "entradas": len(self._entradas),
+                "maximo": self.maximo,
+                "umbral": self.umbral,
+                "hits": self.hits,
+                "misses": self.misses,
+                "tasa_hits": round(self.hits / consultas, 4) if consultas else 0.0,
+                "desalojos": self.desalojos,
+            }
+
+_cache = None
+_cache_lock = threading.Lock()
+
+def obtener_cache_similares():
+    """Caché compartida del proceso, o None si está deshabilitada (LLM_SIMILARES_ENABLED=false)."""
+    global _cache
+    if not LLM_SIMILARES_ENABLED:
+        return None
+    with _cache_lock:
+        if _cache is None:
+            _cache = CacheRespuestasSimilares()
+        return _cache
@@ -0,0 +1,34 @@
+# infrastructure/sincronizar_clientes.py
+from infrastructure.database import get_db_session
+from infrastructure.sqlalchemy_usuario_repository import SQLAlchemyUsuarioRepository
+from application.sincronizar_clientes_usecase import SincronizarClientesUseCase
+import argparse
+import logging
+import json
+import sys
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+# Sincronización PR_CAU → Clientes para correr desde cron/Programador de tareas:
+#   python -m infrastructure.sincronizar_clientes [--tamano-lote 500] [--completo]
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Sincroniza PERSONAS de PR_CAU en Clientes de DECSA_EXC")
+    parser.add_argument("--tamano-lote", type=int, default=500, help="Personas por lote (por defecto 500)")
+    parser.add_argument("--completo", action="store_true", help="Recorre todas las personas, ignorando la marca de COD_PER")
+    args = parser.parse_args(argv)
+
+    session_db1 = get_db_session(bind="db1")
+    session_db2 = get_db_session(bind="db2")
+    try:
+        usecase = SincronizarClientesUseCase(SQLAlchemyUsuarioRepository(session_db1, session_db2), args.tamano_lote)
+        resultado, status = usecase.ejecutar(completo=args.completo)
+    finally:
+        session_db1.close()
+        session_db2.close()
+    print(json.dumps(resultado, ensure_ascii=False, default=str))
+    return 0 if status == 200 else 1
+
+if __name__ == "__main__":
+    logging.info("🔄 Iniciando sincronización de clientes desde PR_CAU...")
+    sys.exit(main())
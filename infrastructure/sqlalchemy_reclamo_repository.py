@@ -1,23 +1,59 @@
 # infrastructure/sqlalchemy_reclamo_repository.py
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy import select, func, update, bindparam
+from sqlalchemy.orm import Session, joinedload, raiseload
 from domain.entities import Reclamo, Cliente
+from domain.dtos import fila_a_listado
+from functools import lru_cache
 from datetime import datetime
 import logging
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
 
+# Reclamo con su cliente en el mismo SELECT; el historial del cliente no se carga (y leerlo falla)
+CON_CLIENTE = joinedload(Reclamo.cliente).options(raiseload(Cliente.reclamos))
+
+# Consultas por clave armadas una sola vez (con bindparam) en lugar de un session.query(...) por llamada
+CONSULTA_RECLAMO_POR_ID = select(Reclamo).options(CON_CLIENTE).where(Reclamo.ID_RECLAMO == bindparam("id_reclamo")).limit(1)
+CONSULTA_RECLAMOS_POR_USUARIO = select(Reclamo).where(Reclamo.ID_USUARIO == bindparam("id_usuario"))
+
+@lru_cache(maxsize=32)
+def consulta_ultimos_por_usuario(columnas: tuple = None):
+    """Reclamos del usuario del más reciente al más antiguo: entidades o sólo ``columnas``.
+
+    El LIMIT se agrega en cada llamada con un entero: como bindparam SQL Server no puede usar TOP
+    y arma un ROW_NUMBER() envolviendo la consulta.
+    """
+    consulta = select(*[Reclamo.__table__.columns[c] for c in columnas]) if columnas else select(Reclamo)
+    return (
+        consulta.where(Reclamo.ID_USUARIO == bindparam("id_usuario"))
+        .order_by(Reclamo.ID_RECLAMO.desc())
+    )
+
 class SQLAlchemyReclamoRepository:
+    # Claves de orden admitidas por buscar(); con "-" adelante el orden es descendente
+    ORDENES = {
+        "id_reclamo": Reclamo.ID_RECLAMO,
+        "fecha_reclamo": Reclamo.FECHA_RECLAMO,
+        "fecha_cierre": Reclamo.FECHA_CIERRE,
+        "estado": Reclamo.ESTADO,
+        "barrio": Cliente.BARRIO,
+        "calle": Cliente.CALLE,
+    }
+
+    # Columnas de los listados (Reclamos LEFT JOIN Clientes), en el orden que espera fila_a_listado
+    COLUMNAS_LISTADO = (
+        Reclamo.ID_RECLAMO, Reclamo.ID_USUARIO, Reclamo.DESCRIPCION, Reclamo.ESTADO,
+        Reclamo.FECHA_RECLAMO, Reclamo.FECHA_CIERRE,
+        Cliente.ID_USUARIO, Cliente.NOMBRE_COMPLETO, Cliente.DNI, Cliente.CELULAR, Cliente.EMAIL,
+        Cliente.CALLE, Cliente.BARRIO, Cliente.CODIGO_POSTAL, Cliente.CODIGO_SUMINISTRO, Cliente.NUMERO_MEDIDOR,
+    )
+
     def __init__(self, session: Session):
         self.session = session
 
     def obtener_por_id(self, id_reclamo: int):
         try:
-            reclamo = (
-                self.session.query(Reclamo)
-                .options(joinedload(Reclamo.cliente))
-                .filter(Reclamo.ID_RECLAMO == id_reclamo)
-                .first()
-            )
+            reclamo = self.session.execute(CONSULTA_RECLAMO_POR_ID, {"id_reclamo": id_reclamo}).scalars().first()
             if reclamo:
                 logging.info(f"Reclamo encontrado con ID {id_reclamo}")
             else:
@@ -34,17 +70,34 @@ class SQLAlchemyReclamoRepository:
                 raise ValueError(f"ID_USUARIO debe ser un entero, pero se recibió: {id_usuario}")
 
             logging.info(f"Buscando reclamos para ID_USUARIO {id_usuario}")
-            reclamos = (
-                self.session.query(Reclamo)
-                .filter(Reclamo.ID_USUARIO == id_usuario)
-                .all()
-            )
+            reclamos = self.session.execute(CONSULTA_RECLAMOS_POR_USUARIO, {"id_usuario": id_usuario}).scalars().all()
             logging.info(f"Se encontraron {len(reclamos)} reclamos para ID_USUARIO {id_usuario}")
             return reclamos
         except Exception as e:
             logging.error(f"Error al obtener reclamos para ID_USUARIO {id_usuario}: {str(e)}")
             raise
 
+    def obtener_ultimos_por_usuario(self, id_usuario: int, n: int = 5, columnas: tuple = None):
+        """Últimos ``n`` reclamos del usuario (ORDER BY ID_RECLAMO DESC con LIMIT en SQL).
+
+        Sin ``columnas`` devuelve entidades Reclamo; con ``columnas`` (nombres de columna de
+        Reclamos) devuelve sólo esos campos como dicts, sin materializar entidades.
+        """
+        try:
+            if columnas:
+                invalidas = [c for c in columnas if c not in Reclamo.__table__.columns]
+                if invalidas:
+                    raise ValueError(f"Columnas de Reclamos no válidas: {', '.join(invalidas)}")
+                columnas = tuple(columnas)
+            consulta = consulta_ultimos_por_usuario(columnas or None).limit(n)
+            resultado = self.session.execute(consulta, {"id_usuario": id_usuario})
+            reclamos = [dict(fila) for fila in resultado.mappings()] if columnas else resultado.scalars().all()
+            logging.info(f"Se obtuvieron los últimos {len(reclamos)} reclamos para ID_USUARIO {id_usuario}")
+            return reclamos
+        except Exception as e:
+            logging.error(f"Error al obtener los últimos reclamos para ID_USUARIO {id_usuario}: {str(e)}")
+            raise
+
     def guardar(self, reclamo: Reclamo):
         try:
             self.session.add(reclamo)
@@ -81,7 +134,7 @@ class SQLAlchemyReclamoRepository:
         try:
             reclamos = (
                 self.session.query(Reclamo)
-                .options(joinedload(Reclamo.cliente))
+                .options(CON_CLIENTE)
                 .all()
             )
             logging.info(f"Se listaron {len(reclamos)} reclamos desde DB2")
@@ -94,7 +147,7 @@ class SQLAlchemyReclamoRepository:
         try:
             reclamos = (
                 self.session.query(Reclamo)
-                .options(joinedload(Reclamo.cliente))
+                .options(CON_CLIENTE)
                 .filter(Reclamo.ESTADO == "Pendiente")
                 .all()
             )
@@ -102,4 +155,144 @@ class SQLAlchemyReclamoRepository:
             return reclamos
         except Exception as e:
             logging.error(f"Error al listar reclamos pendientes: {str(e)}")
-            raise
\ No newline at end of file
+            raise
+
+    def consulta_listado(self, after: int = None):
+        """SELECT de las columnas de listado ordenado por ID_RECLAMO (keyset); sin entidades ORM."""
+        consulta = (
+            select(*self.COLUMNAS_LISTADO)
+            .outerjoin(Cliente, Reclamo.ID_USUARIO == Cliente.ID_USUARIO)
+            .order_by(Reclamo.ID_RECLAMO)
+        )
+        if after is not None:
+            consulta = consulta.where(Reclamo.ID_RECLAMO > after)
+        return consulta
+
+    def listar_pagina(self, limit: int = None, after: int = None):
+        """Página de reclamos como dicts de ReclamoListado; sin ``limit`` devuelve el listado completo."""
+        try:
+            consulta = self.consulta_listado(after)
+            if limit is not None:
+                consulta = consulta.limit(limit)
+            reclamos = [fila_a_listado(fila) for fila in self.session.execute(consulta)]
+            logging.info(f"Se listaron {len(reclamos)} reclamos desde DB2 (after={after}, limit={limit})")
+            return reclamos
+        except Exception as e:
+            logging.error(f"Error al listar la página de reclamos: {str(e)}")
+            raise
+
+    def iterar_lotes(self, tamano_lote: int = 500, after: int = None):
+        """Recorre los reclamos en lotes con un cursor del lado del servidor (yield_per)."""
+        try:
+            resultado = self.session.execute(self.consulta_listado(after).execution_options(yield_per=tamano_lote))
+            for lote in resultado.partitions():
+                yield [fila_a_listado(fila) for fila in lote]
+        except Exception as e:
+            logging.error(f"Error al recorrer los reclamos por lotes: {str(e)}")
+            raise
+
+    def iterar_filas(self, tamano_lote: int = 5000, after: int = None):
+        """Como iterar_lotes pero con las tuplas de COLUMNAS_LISTADO tal cual (para exportar en columnas)."""
+        try:
+            resultado = self.session.execute(self.consulta_listado(after).execution_options(yield_per=tamano_lote))
+            for lote in resultado.partitions():
+                yield [tuple(fila) for fila in lote]
+        except Exception as e:
+            logging.error(f"Error al recorrer las filas de reclamos por lotes: {str(e)}")
+            raise
+
+    @staticmethod
+    def condiciones_filtro(estados: list = None, desde: datetime = None, hasta: datetime = None,
+                           barrio: str = None, calle: str = None) -> list:
+        """Condiciones WHERE sobre Reclamos; barrio y calle van como subconsulta de Clientes
+        para poder usarlas tanto en SELECT como en UPDATE. ``hasta`` es exclusivo."""
+        condiciones = []
+        if estados:
+            condiciones.append(Reclamo.ESTADO.in_(estados))
+        if desde is not None:
+            condiciones.append(Reclamo.FECHA_RECLAMO >= desde)
+        if hasta is not None:
+            condiciones.append(Reclamo.FECHA_RECLAMO < hasta)
+        if barrio or calle:
+            # autoescape: "%" y "_" del texto del usuario se buscan literalmente, no como comodines
+            clientes = select(Cliente.ID_USUARIO)
+            if barrio:
+                clientes = clientes.where(Cliente.BARRIO.icontains(barrio, autoescape=True))
+            if calle:
+                clientes = clientes.where(Cliente.CALLE.icontains(calle, autoescape=True))
+            condiciones.append(Reclamo.ID_USUARIO.in_(clientes))
+        return condiciones
+
+    def buscar(self, estados: list = None, desde: datetime = None, hasta: datetime = None, barrio: str = None,
+               calle: str = None, orden: str = "-fecha_reclamo", limit: int = 50, offset: int = 0):
+        """Filtra, ordena y pagina los reclamos en SQL. Devuelve (dicts de ReclamoListado, total); ``hasta`` es exclusivo."""
+        clave = orden.lstrip("-")
+        if clave not in self.ORDENES:
+            raise ValueError(f"Orden no válido: {orden}. Opciones: {', '.join(self.ORDENES)}")
+        columna = self.ORDENES[clave]
+        descendente = orden.startswith("-")
+
+        condiciones = self.condiciones_filtro(estados, desde, hasta, barrio, calle)
+        try:
+            total = self.session.execute(select(func.count(Reclamo.ID_RECLAMO)).where(*condiciones)).scalar_one()
+            consulta = (
+                select(*self.COLUMNAS_LISTADO)
+                .outerjoin(Cliente, Reclamo.ID_USUARIO == Cliente.ID_USUARIO)
+                .where(*condiciones)
+            )
+            # ID_RECLAMO desempata para que la paginación sea estable
+            if descendente:
+                consulta = consulta.order_by(columna.desc(), Reclamo.ID_RECLAMO.desc())
+            else:
+                consulta = consulta.order_by(columna.asc(), Reclamo.ID_RECLAMO.asc())
+            reclamos = [fila_a_listado(fila) for fila in self.session.execute(consulta.limit(limit).offset(offset))]
+            logging.info(f"Búsqueda de reclamos: {len(reclamos)} de {total} (orden={orden}, offset={offset})")
+            return reclamos, total
+        except Exception as e:
+            logging.error(f"Error al buscar reclamos: {str(e)}")
+            raise
+
+    # Tamaño máximo de cada lista IN (SQL Server admite hasta 2100 parámetros por sentencia)
+    TAMANO_LOTE_IN = 1000
+
+    def actualizar_estado_masivo(self, nuevo_estado: str, ids: list = None, filtros: dict = None):
+        """Cambia el estado de muchos reclamos con UPDATE set-based y devuelve {id: resultado}.
+
+        Aplica las mismas reglas de FECHA_CIERRE que actualizar_estado: "Resuelto" la fija
+        en ahora y cualquier otro estado la limpia. Recibe ``ids`` o ``filtros`` (los de
+        condiciones_filtro); todo ocurre en una única transacción.
+        """
+        valores = {
+            "ESTADO": nuevo_estado,
+            "FECHA_CIERRE": datetime.now() if nuevo_estado == "Resuelto" else None,
+        }
+        try:
+            actualizados = set()
+            if ids is not None:
+                ids = list(dict.fromkeys(ids))
+                for i in range(0, len(ids), self.TAMANO_LOTE_IN):
+                    lote = ids[i:i + self.TAMANO_LOTE_IN]
+                    actualizados.update(self._update_estado([Reclamo.ID_RECLAMO.in_(lote)], valores))
+            else:
+                condiciones = self.condiciones_filtro(**(filtros or {}))
+                if not condiciones:
+                    raise ValueError("Se requiere al menos un filtro para actualizar reclamos en masa")
+                actualizados.update(self._update_estado(condiciones, valores))
+                ids = sorted(actualizados)
+            self.session.commit()
+            logging.info(f"Estado {nuevo_estado} aplicado a {len(actualizados)} reclamos en masa")
+            return {id_reclamo: "actualizado" if id_reclamo in actualizados else "no_encontrado" for id_reclamo in ids}
+        except Exception as e:
+            self.session.rollback()
+            logging.error(f"Error al actualizar el estado de reclamos en masa: {str(e)}")
+            raise
+
+    def _update_estado(self, condiciones: list, valores: dict):
+        sentencia = (
+            update(Reclamo)
+            .where(*condiciones)
+            .values(**valores)
+            .returning(Reclamo.ID_RECLAMO)
+            .execution_options(synchronize_session=False)
+        )
+        return self.session.execute(sentencia).scalars().all()
\ No newline at end of file
@@ -1,71 +1,432 @@
 # infrastructure/sqlalchemy_usuario_repository.py
-from sqlalchemy.orm import Session
-from sqlalchemy import text
-from domain.entities import Cliente
+from sqlalchemy.orm import Session, raiseload
+from sqlalchemy import select, insert, update, func, case, and_, or_, bindparam, DateTime
+from sqlalchemy.exc import IntegrityError
+from domain.entities import Cliente, SincronizacionClientes
+from infrastructure.pr_cau_cache import obtener_cache_pr_cau
+from infrastructure.pr_cau_tablas import PERSONAS, FACTURAS, SUMSOC, CONS_SER, BARRIOS, CALLES, SERSOC
+from datetime import datetime
 import logging
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
 
+# Cliente sin su historial de reclamos: ningún caso de uso lo lee a partir del cliente. raiseload
+# (y no noload) para que cliente.reclamos o to_dict(include_reclamos=True) fallen en lugar de
+# devolver una lista vacía; quien necesite los reclamos los pide a SQLAlchemyReclamoRepository.
+# La consulta se arma una sola vez: session.query(...) la reconstruía en cada mensaje del chat.
+CONSULTA_CLIENTE_POR_DNI = (
+    select(Cliente)
+    .options(raiseload(Cliente.reclamos))
+    .where(Cliente.DNI == bindparam("dni"))
+    .limit(1)
+)
+
+CONSULTA_EXISTE_CLIENTE_DB2 = select(Cliente.ID_USUARIO).where(Cliente.DNI == bindparam("dni")).limit(1)
+
+# Consultas de PR_CAU (db1) con los mismos alias y nombres de columna que usaba el mega-join original
+_persona = PERSONAS.alias("persona")
+_factu = FACTURAS.alias("factu")
+_sumi = SUMSOC.alias("sumi")
+_conser = CONS_SER.alias("conser")
+_barrio = BARRIOS.alias("barrio")
+_calle = CALLES.alias("calle")
+
+_COLUMNAS_PERSONA = (
+    _persona.c.COD_PER.label("IdPersona"),
+    _persona.c.APELLIDOS.label("Apellido"),
+    _persona.c.NOMBRES.label("Nombre"),
+    _persona.c.NUM_DNI.label("Dni"),
+    _persona.c.SEXO.label("Sexo"),
+    _persona.c.TELEFONO.label("Telefono"),
+    _persona.c.EMAIL.label("Email"),
+    _persona.c.COD_POS.label("CodigoPostal"),
+    _persona.c.FEC_ALTA.label("FechaAlta"),
+    _persona.c.OBSERVAC.label("Observaciones"),
+)
+
+# Medidor del suministro: SERSOC tiene una fila por medidor (recambios), así que un JOIN repetiría
+# la persona o la factura por cada uno. Subconsulta escalar con el NUM_MED más alto: siempre el mismo.
+_medidor = (
+    select(func.max(SERSOC.c.NUM_MED))
+    .where(SERSOC.c.COD_SUM == _sumi.c.COD_SUM)
+    .correlate(_sumi)
+    .scalar_subquery()
+)
+
+_COLUMNAS_SUMINISTRO = (
+    _sumi.c.OBS_POS.label("ObservacionPostal"),
+    _barrio.c.DES_BAR.label("Barrio"),
+    _calle.c.DES_CAL.label("Calle"),
+    _medidor.label("NumeroMedidor"),
+)
+
+def _con_suministro(desde):
+    """Agrega al FROM los datos del suministro de la factura (_factu), sin multiplicar filas."""
+    return (
+        desde.outerjoin(_sumi, _factu.c.COD_SUM == _sumi.c.COD_SUM)
+        .outerjoin(_barrio, _sumi.c.COD_BAR == _barrio.c.COD_BAR)
+        .outerjoin(_calle, _sumi.c.COD_CAL == _calle.c.COD_CAL)
+    )
+
+# Identidad: una fila por persona, con el suministro de su última factura (sin CONS_SER ni el
+# JOIN a SERSOC, que son los que multiplican las filas del mega-join)
+_ultima_factura = (
+    select(func.max(FACTURAS.c.ID_FAC))
+    .where(FACTURAS.c.COD_PER == _persona.c.COD_PER)
+    .correlate(_persona)
+    .scalar_subquery()
+)
+_CONSULTA_IDENTIDADES = (
+    select(*_COLUMNAS_PERSONA, _factu.c.COD_SUM.label("CodigoSuministro"), *_COLUMNAS_SUMINISTRO)
+    .select_from(_con_suministro(
+        _persona.outerjoin(_factu, and_(_factu.c.COD_PER == _persona.c.COD_PER, _factu.c.ID_FAC == _ultima_factura))
+    ))
+)
+# DNI repetido en PERSONAS: gana el COD_PER más alto, como en la sincronización
+CONSULTA_IDENTIDAD_DB1 = (
+    _CONSULTA_IDENTIDADES.where(_persona.c.NUM_DNI == bindparam("dni"))
+    .order_by(_persona.c.COD_PER.desc())
+    .limit(1)
+)
+
+# Columnas de Clientes que la sincronización refresca desde PR_CAU. EMAIL, CELULAR, CALLE y BARRIO
+# los edita el propio cliente (ActualizarUsuarioUseCase), así que sólo se completan si están vacías.
+COLUMNAS_SINCRONIZADAS = (
+    "NOMBRE_COMPLETO", "SEXO", "CODIGO_POSTAL", "FECHA_ALTA", "OBSERVACIONES", "CODIGO_SUMINISTRO", "NUMERO_MEDIDOR",
+)
+COLUMNAS_EDITABLES = ("CELULAR", "EMAIL", "CALLE", "BARRIO")
+
+def _texto(valor):
+    """Columnas de texto de Clientes: PR_CAU puede devolver números (COD_SUM, COD_POS, TELEFONO)
+    y un int nunca es igual al str guardado, así que upsert_clientes_db2 reescribiría la fila en
+    cada corrida."""
+    return None if valor is None else str(valor)
+
+def valores_cliente_desde_db1(datos: dict, dni: str = None) -> dict:
+    """Columnas de Clientes a partir de una fila de identidad de PR_CAU (sin ID_USUARIO, que es autoincremental)."""
+    return {
+        # Usar el DNI pasado como parámetro si no está presente en los datos
+        "DNI": str(datos.get('Dni') or dni or '').strip(),
+        "NOMBRE_COMPLETO": f"{datos.get('Apellido') or ''} {datos.get('Nombre') or ''}".strip() or "Usuario Desconocido",
+        "SEXO": _texto(datos.get('Sexo')) or None,
+        "CELULAR": _texto(datos.get('Telefono')) or None,
+        "EMAIL": datos.get('Email') or None,
+        "CODIGO_POSTAL": _texto(datos.get('CodigoPostal')) or None,
+        "FECHA_ALTA": datos.get('FechaAlta') or None,
+        "OBSERVACIONES": datos.get('Observaciones') or None,
+        "CODIGO_SUMINISTRO": _texto(datos.get('CodigoSuministro')) or '',
+        # Clientes no admite NULL en suministro ni medidor (personas todavía sin facturas)
+        "NUMERO_MEDIDOR": _texto(datos.get('NumeroMedidor')) or '',
+        "CALLE": datos.get('Calle') or None,
+        "BARRIO": datos.get('Barrio') or None,
+    }
+
+# Estados de factura que acepta el filtro ``estado`` (PAGA = 'P' es pagada; cualquier otro valor, pendiente)
+ESTADOS_FACTURA = ("pagada", "pendiente")
+
+def _consulta_facturas(condicion_factura=None, condicion_persona=None):
+    """Facturas × consumo de una persona, de la más reciente a la más antigua.
+
+    ``condicion_factura`` se agrega al ON de FACTURAS, así la persona sigue apareciendo (sin
+    facturas) aunque ninguna pase los filtros. ``condicion_persona`` reemplaza el filtro por DNI
+    (bindparam ``dni``).
+    """
+    union_factura = _persona.c.COD_PER == _factu.c.COD_PER
+    if condicion_factura is not None:
+        union_factura = and_(union_factura, condicion_factura)
+    return (
+        select(
+            *_COLUMNAS_PERSONA,
+            _factu.c.COD_SUM.label("CodigoSuministro"),
+            _factu.c.NUM_COM.label("NumeroComprobante"),
+            _factu.c.FECHA.label("FechaEmision"),
+            _factu.c.PAGA.label("EstadoFactura"),
+            _factu.c.TOTAL1.label("TotalFactura"),
+            _factu.c.VTO1.label("VencimientoFactura"),
+            *_COLUMNAS_SUMINISTRO,
+            _conser.c.PERIODO.label("Periodo"),
+            _conser.c.CONSUMO.label("Consumo"),
+        )
+        .select_from(_con_suministro(
+            _persona.outerjoin(_factu, union_factura)
+            .outerjoin(_conser, _conser.c.ID_FAC == _factu.c.ID_FAC)
+        ))
+        .where(condicion_persona if condicion_persona is not None else _persona.c.NUM_DNI == bindparam("dni"))
+        .order_by(_factu.c.ID_FAC.desc(), _conser.c.PERIODO.desc())
+    )
+
+def _condiciones_factura(factura, desde=None, hasta=None, estado=None) -> list:
+    """Filtros de fecha de emisión (``desde`` inclusive, ``hasta`` exclusivo) y estado sobre ``factura``."""
+    condiciones = []
+    if desde is not None:
+        condiciones.append(factura.c.FECHA >= desde)
+    if hasta is not None:
+        condiciones.append(factura.c.FECHA < hasta)
+    if estado == "pagada":
+        condiciones.append(factura.c.PAGA == "P")
+    elif estado == "pendiente":
+        condiciones.append(or_(factura.c.PAGA != "P", factura.c.PAGA.is_(None)))
+    elif estado is not None:
+        raise ValueError(f"Estado de factura no válido: {estado}. Valores posibles: {', '.join(ESTADOS_FACTURA)}")
+    return condiciones
+
+def _ids_facturas(limite=None, offset=0, desde=None, hasta=None, estado=None):
+    """Subconsulta con los ID_FAC de la persona que pasan los filtros, paginados por ID_FAC DESC.
+
+    La página se arma sobre facturas y no sobre filas del join: una factura con varios
+    registros de consumo cuenta una sola vez.
+    """
+    factura = FACTURAS.alias("f")
+    persona = PERSONAS.alias("p")
+    consulta = (
+        select(factura.c.ID_FAC)
+        .join(persona, persona.c.COD_PER == factura.c.COD_PER)
+        .where(persona.c.NUM_DNI == bindparam("dni"), *_condiciones_factura(factura, desde, hasta, estado))
+        .order_by(factura.c.ID_FAC.desc())
+    )
+    if limite is not None:
+        consulta = consulta.limit(limite)
+    if offset:
+        consulta = consulta.offset(offset)
+    return consulta
+
+def _consulta_facturas_por_dnis(desde=None, hasta=None, estado=None):
+    """Facturas × consumo de los DNIs del bindparam expandible ``dnis``, agrupadas por persona
+    (COD_PER) y dentro de cada una de la más reciente a la más antigua. Sin paginar."""
+    condiciones = _condiciones_factura(_factu, desde, hasta, estado)
+    return (
+        _consulta_facturas(and_(*condiciones) if condiciones else None,
+                           _persona.c.NUM_DNI.in_(bindparam("dnis", expanding=True)))
+        .order_by(None)
+        .order_by(_persona.c.COD_PER, _factu.c.ID_FAC.desc(), _conser.c.PERIODO.desc())
+    )
+
+CONSULTA_FACTURAS_DB1 = _consulta_facturas()
+# Camino rápido del chat: sólo la fila más reciente (TOP 1 / LIMIT 1)
+CONSULTA_ULTIMA_FACTURA_DB1 = CONSULTA_FACTURAS_DB1.limit(1)
+
+# Resumen de deuda de la persona, agregado en PR_CAU (una fila)
+_impaga = or_(_factu.c.PAGA != "P", _factu.c.PAGA.is_(None))
+_vencida = and_(_impaga, _factu.c.VTO1 < bindparam("hoy", type_=DateTime))
+_facturas_de_persona = _persona.join(_factu, _factu.c.COD_PER == _persona.c.COD_PER)
+CONSULTA_RESUMEN_FACTURAS_DB1 = (
+    select(
+        func.count(_factu.c.ID_FAC).label("CantidadFacturas"),
+        func.sum(case((_impaga, 1), else_=0)).label("FacturasImpagas"),
+        func.sum(case((_impaga, _factu.c.TOTAL1), else_=0)).label("TotalAdeudado"),
+        func.sum(case((_vencida, 1), else_=0)).label("FacturasVencidas"),
+        func.sum(case((_vencida, _factu.c.TOTAL1), else_=0)).label("TotalVencido"),
+        func.min(case((and_(_impaga, _factu.c.VTO1 >= bindparam("hoy", type_=DateTime)), _factu.c.VTO1))).label("ProximoVencimiento"),
+    )
+    .select_from(_facturas_de_persona)
+    .where(_persona.c.NUM_DNI == bindparam("dni"))
+)
+
+# Consumo por período (GROUP BY PERIODO) con la variación contra el período anterior (LAG).
+# Los períodos se ordenan por su última factura, así no depende del formato de PERIODO.
+_consumo_por_periodo = (
+    select(
+        _conser.c.PERIODO.label("Periodo"),
+        func.sum(_conser.c.CONSUMO).label("Consumo"),
+        func.max(_factu.c.ID_FAC).label("Orden"),
+    )
+    .select_from(_facturas_de_persona.join(_conser, _conser.c.ID_FAC == _factu.c.ID_FAC))
+    .where(_persona.c.NUM_DNI == bindparam("dni"))
+    .group_by(_conser.c.PERIODO)
+    .subquery("consumo_por_periodo")
+)
+_consumo_con_anterior = select(
+    _consumo_por_periodo,
+    func.lag(_consumo_por_periodo.c.Consumo).over(order_by=_consumo_por_periodo.c.Orden).label("ConsumoAnterior"),
+).subquery("consumo_con_anterior")
+# Del período más reciente al más antiguo; el LAG se calcula sobre todo el historial antes del TOP/LIMIT
+CONSULTA_CONSUMOS_DB1 = (
+    select(
+        _consumo_con_anterior.c.Periodo,
+        _consumo_con_anterior.c.Consumo,
+        _consumo_con_anterior.c.ConsumoAnterior,
+        (_consumo_con_anterior.c.Consumo - _consumo_con_anterior.c.ConsumoAnterior).label("Variacion"),
+    )
+    .order_by(_consumo_con_anterior.c.Orden.desc())
+)
+
+# Consumo de todos los suministros (para la analítica por barrio/calle): una fila por registro de
+# CONS_SER con el barrio y la calle del suministro, en orden de ID_FAC para que la última fila de
+# cada suministro tenga su domicilio vigente. Sin SERSOC, que puede repetir filas por medidor.
+_periodos_recientes = (
+    select(_conser.c.PERIODO.label("Periodo"))
+    .select_from(_conser.join(_factu, _factu.c.ID_FAC == _conser.c.ID_FAC))
+    .group_by(_conser.c.PERIODO)
+    .order_by(func.max(_factu.c.ID_FAC).desc())
+)
+CONSULTA_CONSUMOS_SUMINISTROS_DB1 = (
+    select(
+        _factu.c.COD_SUM.label("CodigoSuministro"),
+        _barrio.c.DES_BAR.label("Barrio"),
+        _calle.c.DES_CAL.label("Calle"),
+        _conser.c.PERIODO.label("Periodo"),
+        _conser.c.CONSUMO.label("Consumo"),
+    )
+    .select_from(
+        _conser.join(_factu, _factu.c.ID_FAC == _conser.c.ID_FAC)
+        .outerjoin(_sumi, _factu.c.COD_SUM == _sumi.c.COD_SUM)
+        .outerjoin(_barrio, _sumi.c.COD_BAR == _barrio.c.COD_BAR)
+        .outerjoin(_calle, _sumi.c.COD_CAL == _calle.c.COD_CAL)
+    )
+    .where(_conser.c.PERIODO.in_(bindparam("periodos", expanding=True)))
+    .order_by(_factu.c.ID_FAC)
+)
+
 class SQLAlchemyUsuarioRepository:
-    def __init__(self, session_db1: Session, session_db2: Session):
+    def __init__(self, session_db1: Session, session_db2: Session, cache=None):
         self.session_db1 = session_db1
         self.session_db2 = session_db2
+        # Caché read-through de las consultas a PR_CAU (None si está deshabilitada)
+        self.cache = cache if cache is not None else obtener_cache_pr_cau()
 
     def obtener_por_dni(self, dni: str):
         logging.info(f"Buscando cliente con DNI {dni} en DECSA_EXC")
-        result = self.session_db2.query(Cliente).filter(Cliente.DNI == dni).first()
-        return result
+        return self.session_db2.execute(CONSULTA_CLIENTE_POR_DNI, {'dni': dni}).scalars().first()
 
-    # infrastructure/sqlalchemy_usuario_repository.py
-    # infrastructure/sqlalchemy_usuario_repository.py
-    # infrastructure/sqlalchemy_usuario_repository.py
     def obtener_de_db1(self, dni: str):
-        logging.info(f"Buscando datos de persona con DNI {dni} en PR_CAU")
-        consulta = text("""
-            SELECT 
-                persona.COD_PER AS IdPersona,
-                persona.APELLIDOS AS Apellido,
-                persona.NOMBRES AS Nombre,
-                persona.NUM_DNI AS Dni,  -- Corregido: DNI → NUM_DNI
-                persona.SEXO AS Sexo,
-                persona.TELEFONO AS Telefono,
-                persona.EMAIL AS Email,
-                persona.COD_POS AS CodigoPostal,
-                persona.FEC_ALTA AS FechaAlta,
-                persona.OBSERVAC AS Observaciones,
-                factu.COD_SUM AS CodigoSuministro,
-                factu.NUM_COM AS NumeroComprobante,
-                factu.FECHA AS FechaEmision,
-                factu.PAGA AS EstadoFactura,
-                factu.TOTAL1 AS TotalFactura,
-                factu.VTO1 AS VencimientoFactura,
-                sumi.OBS_POS AS ObservacionPostal,
-                barrio.DES_BAR AS Barrio,
-                calle.DES_CAL AS Calle,
-                ser.NUM_MED AS NumeroMedidor,
-                conser.PERIODO AS Periodo,
-                conser.CONSUMO AS Consumo
-            FROM PERSONAS AS persona
-            LEFT JOIN FACTURAS AS factu ON persona.COD_PER = factu.COD_PER
-            LEFT JOIN SUMSOC AS sumi ON factu.COD_SUM = sumi.COD_SUM
-            LEFT JOIN CONS_SER AS conser ON conser.ID_FAC = factu.ID_FAC
-            LEFT JOIN BARRIOS AS barrio ON sumi.COD_BAR = barrio.COD_BAR
-            LEFT JOIN CALLES AS calle ON sumi.COD_CAL = calle.COD_CAL
-            LEFT JOIN SERSOC AS ser ON sumi.COD_SUM = ser.COD_SUM
-            WHERE persona.NUM_DNI = :dni  -- Corregido: DNI → NUM_DNI
-            ORDER BY factu.ID_FAC DESC
-        """)
+        """Todas las filas factura × consumo de la persona (equivale al mega-join original)."""
+        return self.obtener_facturas_db1(dni)
 
+    def _leer_pr_cau(self, tipo: str, dni: str, cargar, *parametros):
+        if self.cache is None:
+            return cargar()
+        return self.cache.leer_a_traves(tipo, dni, cargar, *parametros)
+
+    def obtener_identidad_db1(self, dni: str):
+        """Datos de la persona en PR_CAU (una sola fila) con el suministro de su última factura."""
+        return self._leer_pr_cau("identidad", dni, lambda: self._consultar_identidad_db1(dni))
+
+    def _consultar_identidad_db1(self, dni: str):
+        logging.info(f"Buscando identidad de persona con DNI {dni} en PR_CAU")
+        fila = self.session_db1.execute(CONSULTA_IDENTIDAD_DB1, {'dni': dni}).mappings().first()
+        if fila:
+            return dict(fila)
+        logging.warning(f"Usuario con DNI {dni} no encontrado en PR_CAU")
+        return None
+
+    def obtener_facturas_db1(self, dni: str, limite: int = None, offset: int = 0,
+                             desde=None, hasta=None, estado: str = None):
+        """Filas factura × consumo de la persona ordenadas por ID_FAC DESC.
+
+        ``limite``/``offset`` paginan facturas (no filas) y los filtros van en el SQL: ``desde``
+        inclusive y ``hasta`` exclusivo sobre la fecha de emisión, ``estado`` 'pagada' o 'pendiente'.
+        Si ninguna factura pasa los filtros vuelve una sola fila con los datos de la persona.
+        """
+        return self._leer_pr_cau(
+            "facturas", dni,
+            lambda: self._consultar_facturas_db1(dni, limite, offset, desde, hasta, estado),
+            limite, offset, desde, hasta, estado,
+        )
+
+    def _consultar_facturas_db1(self, dni, limite, offset, desde, hasta, estado):
+        logging.info(f"Buscando facturas de persona con DNI {dni} en PR_CAU "
+                     f"(limite={limite}, offset={offset}, desde={desde}, hasta={hasta}, estado={estado})")
+        consulta = self._consulta_facturas_filtrada(limite, offset, desde, hasta, estado)
         result = self.session_db1.execute(consulta, {'dni': dni}).mappings().fetchall()
         if result:
-            logging.info(f"Usuario con DNI {dni} encontrado en PR_CAU: {result}")
+            logging.info(f"Usuario con DNI {dni} encontrado en PR_CAU: {len(result)} filas de facturas")
             return [dict(row) for row in result]
         else:
             logging.warning(f"Usuario con DNI {dni} no encontrado en PR_CAU")
             return []
 
+    @staticmethod
+    def _consulta_facturas_filtrada(limite, offset, desde, hasta, estado):
+        if limite is None and not offset and desde is None and hasta is None and estado is None:
+            return CONSULTA_FACTURAS_DB1
+        return _consulta_facturas(_factu.c.ID_FAC.in_(_ids_facturas(limite, offset, desde, hasta, estado)))
+
+    def obtener_filas_facturas_db1(self, dnis: list, desde=None, hasta=None, estado: str = None):
+        """Filas factura × consumo de varios DNIs como ``(columnas, tuplas)``, para el camino columnar.
+
+        Consulta de operador: no pasa por la caché ni arma un dict por fila, y hace un IN por tramo de
+        TAMANO_LOTE_IN DNIs. Mismos filtros que obtener_facturas_db1, sin paginar; las filas de cada
+        persona quedan juntas, ordenadas por ID_FAC DESC.
+        """
+        dnis = list(dict.fromkeys(str(dni).strip() for dni in dnis if dni is not None and str(dni).strip()))
+        logging.info(f"Buscando filas de facturas de {len(dnis)} DNIs en PR_CAU (columnar)")
+        consulta = _consulta_facturas_por_dnis(desde, hasta, estado)
+        filas = []
+        for i in range(0, len(dnis), self.TAMANO_LOTE_IN):
+            filas.extend(self.session_db1.execute(consulta, {'dnis': dnis[i:i + self.TAMANO_LOTE_IN]}).fetchall())
+        return list(consulta.selected_columns.keys()), filas
+
+    def obtener_ultima_factura_db1(self, dni: str):
+        """Sólo la fila más reciente de factura × consumo de la persona (una fila, para el chat)."""
+        return self._leer_pr_cau("ultima_factura", dni, lambda: self._consultar_ultima_factura_db1(dni))
+
+    def _consultar_ultima_factura_db1(self, dni: str):
+        logging.info(f"Buscando última factura de persona con DNI {dni} en PR_CAU")
+        fila = self.session_db1.execute(CONSULTA_ULTIMA_FACTURA_DB1, {'dni': dni}).mappings().first()
+        if fila:
+            return dict(fila)
+        logging.warning(f"Usuario con DNI {dni} no encontrado en PR_CAU")
+        return None
+
+    def obtener_identidades_db1(self, despues_cod_per: int, limite: int, hasta_cod_per: int = None,
+                                facturas_desde: int = None, facturas_hasta: int = None):
+        """Lote de identidades de PR_CAU con COD_PER > ``despues_cod_per``, en orden de COD_PER.
+
+        Con ``facturas_desde``/``facturas_hasta`` sólo vuelven las personas con alguna factura de
+        ID_FAC en (desde, hasta]: las que pueden haber cambiado de suministro desde la última corrida.
+        """
+        consulta = _CONSULTA_IDENTIDADES.where(_persona.c.COD_PER > despues_cod_per)
+        if hasta_cod_per is not None:
+            consulta = consulta.where(_persona.c.COD_PER <= hasta_cod_per)
+        if facturas_desde is not None:
+            consulta = consulta.where(_persona.c.COD_PER.in_(
+                select(FACTURAS.c.COD_PER).where(FACTURAS.c.ID_FAC > facturas_desde, FACTURAS.c.ID_FAC <= facturas_hasta)
+            ))
+        consulta = consulta.order_by(_persona.c.COD_PER).limit(limite)
+        return [dict(fila) for fila in self.session_db1.execute(consulta).mappings()]
+
+    def ultimo_id_factura_db1(self) -> int:
+        return self.session_db1.execute(select(func.max(FACTURAS.c.ID_FAC))).scalar() or 0
+
+    def obtener_resumen_facturas_db1(self, dni: str, hoy: datetime):
+        """Deuda de la persona calculada en PR_CAU: impagas, vencidas a ``hoy`` y próximo vencimiento."""
+        return self._leer_pr_cau(
+            "resumen_facturas", dni, lambda: self._consultar_resumen_facturas_db1(dni, hoy), hoy.date()
+        )
+
+    def _consultar_resumen_facturas_db1(self, dni: str, hoy: datetime):
+        logging.info(f"Calculando resumen de facturas de persona con DNI {dni} en PR_CAU")
+        return dict(self.session_db1.execute(CONSULTA_RESUMEN_FACTURAS_DB1, {'dni': dni, 'hoy': hoy}).mappings().one())
+
+    def obtener_consumos_db1(self, dni: str, periodos: int = 6):
+        """Últimos ``periodos`` consumos (kWh por período) con su variación, del más reciente al más antiguo."""
+        return self._leer_pr_cau("consumos", dni, lambda: self._consultar_consumos_db1(dni, periodos), periodos)
+
+    def _consultar_consumos_db1(self, dni: str, periodos: int):
+        logging.info(f"Buscando últimos {periodos} consumos de persona con DNI {dni} en PR_CAU")
+        consulta = CONSULTA_CONSUMOS_DB1.limit(periodos)
+        return [dict(fila) for fila in self.session_db1.execute(consulta, {'dni': dni}).mappings()]
+
+    def ultimos_periodos_db1(self, periodos: int) -> list:
+        """Los ``periodos`` más recientes de CONS_SER (por su última factura), del más antiguo al más reciente."""
+        consulta = _periodos_recientes.limit(periodos)
+        return [fila.Periodo for fila in self.session_db1.execute(consulta)][::-1]
+
+    def iterar_consumos_db1(self, periodos: list, tamano_lote: int = 5000):
+        """Recorre en lotes de tuplas ``(suministro, barrio, calle, periodo, consumo)`` el consumo de
+        todos los suministros en ``periodos``, con un cursor del lado del servidor (yield_per)."""
+        try:
+            resultado = self.session_db1.execute(
+                CONSULTA_CONSUMOS_SUMINISTROS_DB1.execution_options(yield_per=tamano_lote), {'periodos': list(periodos)}
+            )
+            for lote in resultado.partitions():
+                yield [tuple(fila) for fila in lote]
+        except Exception as e:
+            logging.error(f"Error al recorrer los consumos de PR_CAU por lotes: {str(e)}")
+            raise
+
     def existe_en_db2(self, dni: str):
-        result = self.session_db2.query(Cliente).filter_by(DNI=dni).first() is not None
+        result = self.session_db2.execute(CONSULTA_EXISTE_CLIENTE_DB2, {'dni': dni}).first() is not None
         logging.info(f"Verificando existencia en DECSA_EXC para DNI {dni}: {result}")
         return result
 
@@ -86,43 +447,24 @@ class SQLAlchemyUsuarioRepository:
             logging.warning(f"Cliente con DNI {dni} ya existe en DECSA_EXC")
             return self.obtener_por_dni(dni)
 
-        datos = self.obtener_de_db1(dni)
+        datos = self.obtener_identidad_db1(dni)
         if not datos:
             logging.warning(f"No se encontraron datos en DB1 para DNI {dni}")
             return None
 
         try:
-            # Asegurarse de que NOMBRE_COMPLETO tenga un valor válido
-            nombre_completo = f"{datos[0].get('Apellido', '')} {datos[0].get('Nombre', '')}".strip()
-            if not nombre_completo:
-                logging.warning(f"NOMBRE_COMPLETO vacío para DNI {dni}, usando valor por defecto")
-                nombre_completo = "Usuario Desconocido"
-
-            # Usar el DNI pasado como parámetro si no está presente en los datos
-            dni_valor = str(datos[0].get('Dni', dni)) or dni
-            if not dni_valor:
+            valores = valores_cliente_desde_db1(datos, dni)
+            if not valores["DNI"]:
                 logging.error(f"No se pudo determinar el DNI para el cliente con DNI {dni}")
                 raise ValueError(f"No se pudo determinar el DNI para el cliente con DNI {dni}")
 
-            logging.info(f"Creando nuevo cliente en DB2 con DNI {dni_valor}, NOMBRE_COMPLETO: {nombre_completo}")
-
-            nuevo_cliente = Cliente(
-                # No seteamos ID_USUARIO, ya que es autoincremental
-                DNI=dni_valor,
-                NOMBRE_COMPLETO=nombre_completo,
-                SEXO=datos[0].get('Sexo') or None,
-                CELULAR=datos[0].get('Telefono') or None,
-                EMAIL=datos[0].get('Email') or None,
-                CODIGO_POSTAL=datos[0].get('CodigoPostal') or None,
-                FECHA_ALTA=datos[0].get('FechaAlta') or None,
-                OBSERVACIONES=datos[0].get('Observaciones') or None,
-                CODIGO_SUMINISTRO=datos[0].get('CodigoSuministro', '') or '',
-                NUMERO_MEDIDOR=datos[0].get('NumeroMedidor') or None,
-                CALLE=datos[0].get('Calle') or None,
-                BARRIO=datos[0].get('Barrio') or None
-            )
+            logging.info(f"Creando nuevo cliente en DB2 con DNI {valores['DNI']}, NOMBRE_COMPLETO: {valores['NOMBRE_COMPLETO']}")
+
+            # No seteamos ID_USUARIO, ya que es autoincremental
+            nuevo_cliente = Cliente(**valores)
 
             self.guardar_cliente_en_db2(nuevo_cliente)
+            self.invalidar_cache_pr_cau(dni)
             if not nuevo_cliente.ID_USUARIO:
                 logging.error(f"ID_USUARIO no generado para cliente con DNI {dni}")
                 raise ValueError(f"ID_USUARIO no generado para cliente con DNI {dni}")
@@ -135,8 +477,139 @@ class SQLAlchemyUsuarioRepository:
         try:
             self.session_db2.merge(cliente)
             self.session_db2.commit()
+            self.invalidar_cache_pr_cau(cliente.DNI)
             logging.info(f"Cliente actualizado correctamente en DECSA_EXC con DNI {cliente.DNI}")
         except Exception as e:
             self.session_db2.rollback()
             logging.error(f"Error al actualizar cliente en DECSA_EXC: {str(e)}")
+            raise
+
+    def invalidar_cache_pr_cau(self, *dnis: str):
+        if self.cache is not None:
+            self.cache.invalidar(*dnis)
+
+    # Tamaño máximo de cada lista IN (SQL Server admite hasta 2100 parámetros por sentencia)
+    TAMANO_LOTE_IN = 1000
+
+    def copiar_clientes_a_db2(self, dnis: list) -> dict:
+        """Versión en lote de copiar_cliente_a_db2: devuelve {dni: "copiado" | "existente" | "no_encontrado"}.
+
+        Por cada tramo de TAMANO_LOTE_IN DNIs: un IN en Clientes, un IN en PR_CAU para los que
+        faltan y un INSERT executemany (fast_executemany en SQL Server) con commit por tramo.
+        """
+        dnis = list(dict.fromkeys(str(dni).strip() for dni in dnis if dni is not None and str(dni).strip()))
+        resultados = {}
+        for i in range(0, len(dnis), self.TAMANO_LOTE_IN):
+            resultados.update(self._copiar_tramo(dnis[i:i + self.TAMANO_LOTE_IN]))
+        copiados = [dni for dni, resultado in resultados.items() if resultado == "copiado"]
+        self.invalidar_cache_pr_cau(*copiados)
+        logging.info(f"Copia en lote a DECSA_EXC: {len(copiados)} copiados de {len(dnis)} DNIs")
+        return resultados
+
+    def _copiar_tramo(self, dnis: list) -> dict:
+        # Un segundo intento cubre el alta concurrente de alguno de los DNIs (índice único de DNI)
+        for intento in (1, 2):
+            try:
+                existentes = set(self.session_db2.execute(select(Cliente.DNI).where(Cliente.DNI.in_(dnis))).scalars())
+                faltantes = [dni for dni in dnis if dni not in existentes]
+                nuevos = {}
+                if faltantes:
+                    consulta = _CONSULTA_IDENTIDADES.where(_persona.c.NUM_DNI.in_(faltantes)).order_by(_persona.c.COD_PER)
+                    for datos in self.session_db1.execute(consulta).mappings():
+                        # DNI repetido en PERSONAS: gana el COD_PER más alto, como en la sincronización
+                        dni = str(datos["Dni"]).strip()
+                        nuevos[dni] = valores_cliente_desde_db1(datos, dni)
+                if nuevos:
+                    self.session_db2.execute(insert(Cliente), list(nuevos.values()))
+                    self.session_db2.commit()
+                return {
+                    dni: "existente" if dni in existentes else "copiado" if dni in nuevos else "no_encontrado"
+                    for dni in dnis
+                }
+            except IntegrityError as e:
+                self.session_db2.rollback()
+                if intento == 2:
+                    raise
+                logging.warning(f"Conflicto de integridad al copiar clientes en lote, se reintenta el tramo: {str(e)}")
+            except Exception as e:
+                self.session_db2.rollback()
+                logging.error(f"Error al copiar clientes en lote a DECSA_EXC: {str(e)}")
+                raise
+
+    def upsert_clientes_db2(self, identidades: list):
+        """Inserta o actualiza en Clientes (por DNI) un lote de identidades de PR_CAU en una transacción.
+
+        Sólo se escriben las filas que cambiaron. Devuelve ``(insertados, actualizados)``.
+        """
+        valores_por_dni = {}
+        for datos in identidades:
+            valores = valores_cliente_desde_db1(datos)
+            if valores["DNI"]:
+                valores_por_dni[valores["DNI"]] = valores  # DNI repetido en PERSONAS: gana el COD_PER más alto
+
+        columnas = [Cliente.ID_USUARIO, Cliente.DNI] + [getattr(Cliente, c) for c in COLUMNAS_SINCRONIZADAS + COLUMNAS_EDITABLES]
+        # Un segundo intento cubre el alta concurrente de un DNI del lote por copiar_cliente_a_db2
+        for intento in (1, 2):
+            try:
+                existentes = {}
+                dnis = list(valores_por_dni)
+                for i in range(0, len(dnis), self.TAMANO_LOTE_IN):
+                    consulta = select(*columnas).where(Cliente.DNI.in_(dnis[i:i + self.TAMANO_LOTE_IN]))
+                    existentes.update((fila["DNI"], fila) for fila in self.session_db2.execute(consulta).mappings())
+
+                nuevos, cambios = [], []
+                for dni, valores in valores_por_dni.items():
+                    actual = existentes.get(dni)
+                    if actual is None:
+                        nuevos.append(valores)
+                        continue
+                    diferencias = {c: valores[c] for c in COLUMNAS_SINCRONIZADAS if valores[c] != actual[c]}
+                    diferencias.update(
+                        (c, valores[c]) for c in COLUMNAS_EDITABLES if actual[c] is None and valores[c] is not None
+                    )
+                    if diferencias:
+                        cambios.append({"ID_USUARIO": actual["ID_USUARIO"], **diferencias})
+
+                if nuevos:
+                    self.session_db2.execute(insert(Cliente), nuevos)
+                if cambios:
+                    # UPDATE por clave primaria en lote (executemany)
+                    self.session_db2.execute(update(Cliente), cambios)
+                self.session_db2.commit()
+                return len(nuevos), len(cambios)
+            except IntegrityError as e:
+                self.session_db2.rollback()
+                if intento == 2:
+                    raise
+                logging.warning(f"Conflicto de integridad al sincronizar clientes (¿alta concurrente?), se reintenta el lote: {str(e)}")
+            except Exception as e:
+                self.session_db2.rollback()
+                logging.error(f"Error al sincronizar lote de clientes en DECSA_EXC: {str(e)}")
+                raise
+
+    def obtener_marca_sincronizacion(self, nombre: str) -> dict:
+        marca = self.session_db2.get(SincronizacionClientes, nombre)
+        if marca is None:
+            return {"ULTIMO_COD_PER": 0, "ULTIMO_ID_FAC": 0, "FECHA_SINCRONIZACION": None}
+        return {
+            "ULTIMO_COD_PER": marca.ULTIMO_COD_PER,
+            "ULTIMO_ID_FAC": marca.ULTIMO_ID_FAC,
+            "FECHA_SINCRONIZACION": marca.FECHA_SINCRONIZACION,
+        }
+
+    def guardar_marca_sincronizacion(self, nombre: str, ultimo_cod_per: int = None, ultimo_id_fac: int = None):
+        try:
+            marca = self.session_db2.get(SincronizacionClientes, nombre)
+            if marca is None:
+                marca = SincronizacionClientes(NOMBRE=nombre, ULTIMO_COD_PER=0, ULTIMO_ID_FAC=0)
+                self.session_db2.add(marca)
+            if ultimo_cod_per is not None:
+                marca.ULTIMO_COD_PER = ultimo_cod_per
+            if ultimo_id_fac is not None:
+                marca.ULTIMO_ID_FAC = ultimo_id_fac
+            marca.FECHA_SINCRONIZACION = datetime.now()
+            self.session_db2.commit()
+        except Exception as e:
+            self.session_db2.rollback()
+            logging.error(f"Error al guardar la marca de sincronización {nombre}: {str(e)}")
             raise
\ No newline at end of file
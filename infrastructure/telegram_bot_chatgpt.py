@@ -8,7 +8,9 @@ from application.consultar_estado_reclamo_usecase import ConsultarEstadoReclamoU
 from application.consultar_reclamo_usecase import ConsultarReclamoUseCase
 from application.chatgpt_service import ChatGPTService
 from application.detectar_intencion_chatgpt_usecase import DetectarIntencionChatGPTUseCase
-from infrastructure.redis_client import RedisClient
+from application.modelo_intenciones import cargar_modelo_actual
+from infrastructure.ejemplos_intenciones import RegistroEjemplosIntencion, MODELO_INTENCIONES_DIR
+from infrastructure.redis_client import obtener_redis
 from infrastructure.database import init_db
 import logging
 
@@ -22,11 +24,16 @@ if __name__ == "__main__":
         logging.info("🚀 Iniciando bot de Telegram con ChatGPT...")
 
         # Inicializar cliente de Redis
-        redis_client = RedisClient().get_client()
+        redis_client = obtener_redis()
 
         # Inicializar servicio ChatGPT y usecase
         chatgpt_service = ChatGPTService(redis_client=redis_client)
-        detectar_intencion_usecase = DetectarIntencionChatGPTUseCase(chatgpt_service)
+        # Reglas y modelo de intenciones en proceso antes de ChatGPT; lo que etiqueta ChatGPT se registra para reentrenar
+        detectar_intencion_usecase = DetectarIntencionChatGPTUseCase(
+            chatgpt_service,
+            modelo=cargar_modelo_actual(MODELO_INTENCIONES_DIR),
+            registro=RegistroEjemplosIntencion(),
+        )
 
         # Los casos de uso de reclamos y consultas se instanciarán dentro del adapter si son None
         registrar_reclamo_usecase = None
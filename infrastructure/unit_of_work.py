@@ -0,0 +1,51 @@
+# infrastructure/unit_of_work.py
+from contextlib import asynccontextmanager
+from sqlalchemy.ext.asyncio import AsyncSession
+from infrastructure.database import get_db_session, get_async_db_session, DB_ASYNC_MODE
+from infrastructure.async_sqlalchemy_usuario_repository import AsyncSQLAlchemyUsuarioRepository
+from infrastructure.async_sqlalchemy_reclamo_repository import AsyncSQLAlchemyReclamoRepository
+import logging
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+class UnitOfWork:
+    """Sesiones de PR_CAU (db1) y DECSA_EXC (db2) para un único request o mensaje de chat.
+
+    Las sesiones salen de los pools de infrastructure.database y se cierran al terminar
+    el alcance, así una transacción fallida no contamina al siguiente request.
+    """
+
+    def __init__(self, session_db1, session_db2):
+        self.session_db1 = session_db1
+        self.session_db2 = session_db2
+        self.usuario_repository_async = AsyncSQLAlchemyUsuarioRepository(session_db1, session_db2)
+        self.reclamo_repository_async = AsyncSQLAlchemyReclamoRepository(session_db2)
+        # Repositorios síncronos para los casos de uso (se ejecutan con ejecutar_db)
+        self.usuario_repository = self.usuario_repository_async.repositorio
+        self.reclamo_repository = self.reclamo_repository_async.repositorio
+
+    async def cerrar(self):
+        for session in (self.session_db1, self.session_db2):
+            try:
+                if isinstance(session, AsyncSession):
+                    await session.close()
+                else:
+                    session.close()
+            except Exception as e:
+                logging.error(f"Error al cerrar la sesión de la unidad de trabajo: {str(e)}")
+
+@asynccontextmanager
+async def abrir_unit_of_work():
+    if DB_ASYNC_MODE:
+        uow = UnitOfWork(get_async_db_session(bind='db1'), get_async_db_session(bind='db2'))
+    else:
+        uow = UnitOfWork(get_db_session(bind='db1'), get_db_session(bind='db2'))
+    try:
+        yield uow
+    finally:
+        await uow.cerrar()
+
+async def get_unit_of_work():
+    """Dependencia de FastAPI: una UnitOfWork por request."""
+    async with abrir_unit_of_work() as uow:
+        yield uow
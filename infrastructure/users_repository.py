@@ -1,4 +1,5 @@
 # infrastructure/users_repository.py
+from sqlalchemy import select, bindparam
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError
 from domain.entities import Usuario, Rol
@@ -8,6 +9,10 @@ import logging
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
 
+# get_current_user busca al operador en cada request autenticado: consultas armadas una sola vez
+CONSULTA_USUARIO_POR_ID = select(Usuario).where(Usuario.IdUsuario == bindparam("id_usuario")).limit(1)
+CONSULTA_USUARIO_POR_USERNAME = select(Usuario).where(Usuario.Usuario == bindparam("username")).limit(1)
+
 class SQLAlchemyUSERS:
     def __init__(self, session: Session):
         self.session = session
@@ -40,12 +45,12 @@ class SQLAlchemyUSERS:
 
     def get_usuario_by_id(self, id_usuario: int):
         logging.info(f"Buscando usuario por ID: {id_usuario}")
-        usuario = self.session.query(Usuario).filter(Usuario.IdUsuario == id_usuario).first()
+        usuario = self.session.execute(CONSULTA_USUARIO_POR_ID, {"id_usuario": id_usuario}).scalars().first()
         return usuario
 
     def get_usuario_by_username(self, username: str):
         logging.info(f"Buscando usuario por username: {username}")
-        usuario = self.session.query(Usuario).filter(Usuario.Usuario == username).first()
+        usuario = self.session.execute(CONSULTA_USUARIO_POR_USERNAME, {"username": username}).scalars().first()
         return usuario
 
     def get_all_usuarios(self):
@@ -0,0 +1,34 @@
+# routes/admin_db_routes.py
+from fastapi import APIRouter, Depends
+from infrastructure.security import require_role
+from infrastructure.pool_telemetry import resumen_pools, BUCKETS_ESPERA_MS
+from infrastructure.pr_cau_cache import obtener_cache_pr_cau
+from infrastructure.respuestas_llm_cache import obtener_cache_respuestas_llm
+from infrastructure.respuestas_similares_cache import obtener_cache_similares
+from infrastructure import database
+from domain.entities import Usuario
+import logging
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+router = APIRouter()
+
+@router.get("/pools")
+async def obtener_telemetria_pools(current_user: Usuario = Depends(require_role("admin"))):
+    """Estado de los pools de conexiones por bind: conexiones en uso, overflow, esperas e invalidaciones."""
+    return {
+        "buckets_espera_ms": list(BUCKETS_ESPERA_MS),
+        "pools": resumen_pools(),
+        "replicas_db1": database.router_db1.estado() if database.router_db1 is not None else [],
+    }
+
+@router.get("/cache")
+async def obtener_estado_cache(current_user: Usuario = Depends(require_role("admin"))):
+    """Hits, misses y errores de la caché de consultas a PR_CAU y de las de respuestas de los LLM (por proceso)."""
+    cache = obtener_cache_pr_cau()
+    cache_llm = obtener_cache_respuestas_llm()
+    cache_similares = obtener_cache_similares()
+    return {
+        "pr_cau": cache.resumen() if cache is not None else {"habilitada": False},
+        "llm": cache_llm.resumen() if cache_llm is not None else {"habilitada": False},
+        "llm_similares": cache_similares.resumen() if cache_similares is not None else {"habilitada": False},
+    }
@@ -37,4 +37,12 @@ async def chat_with_bot(
         return {"response": response}
     except Exception as e:
         logging.error(f"Error al procesar la consulta del chatbot: {str(e)}")
-        raise HTTPException(status_code=500, detail="Error al procesar la consulta")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail="Error al procesar la consulta")
+
+@router.get("/intenciones", response_model=dict)
+async def obtener_estadisticas_intenciones(
+    current_user: Usuario = Depends(require_role("admin")),
+    detectar_intencion_usecase=Depends(get_detectar_intencion_usecase)
+):
+    """Mensajes cuya intención se resolvió por reglas, sin llamar a ChatGPT (por proceso)."""
+    return detectar_intencion_usecase.resumen()
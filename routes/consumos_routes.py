@@ -0,0 +1,36 @@
+# routes/consumos_routes.py
+from fastapi import APIRouter, HTTPException, Depends
+from starlette.concurrency import run_in_threadpool
+from typing import Literal
+from infrastructure.security import require_role
+from infrastructure.analitica_consumos_cache import CacheAnaliticaConsumos
+from application.analitica_consumos_usecase import AnaliticaConsumosUseCase
+from domain.entities import Usuario
+import logging
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+router = APIRouter()
+
+# Los tableros sólo leen lo que dejó en Redis el job (python -m infrastructure.analitica_consumos)
+_usecase = AnaliticaConsumosUseCase(usuario_repository=None, cache=CacheAnaliticaConsumos())
+
+async def _responder(fn, *args):
+    respuesta, status_code = await run_in_threadpool(fn, *args)
+    if status_code != 200:
+        raise HTTPException(status_code=status_code, detail=respuesta.get("error") or respuesta.get("mensaje", "Error desconocido"))
+    return respuesta
+
+@router.get("/")
+async def obtener_indice_consumos(current_user: Usuario = Depends(require_role("admin"))):
+    """Períodos calculados y datos de la última corrida del job."""
+    return await _responder(_usecase.obtener_indice)
+
+@router.get("/series/{nivel}")
+async def obtener_series_consumo(nivel: Literal["barrio", "calle"], current_user: Usuario = Depends(require_role("admin"))):
+    """Serie de consumo total (kWh) y suministros con lectura de cada barrio o calle por período."""
+    return await _responder(_usecase.obtener_series, nivel)
+
+@router.get("/periodos/{periodo:path}")
+async def obtener_consumos_periodo(periodo: str, current_user: Usuario = Depends(require_role("admin"))):
+    """Consumo por barrio y calle (total, media, p10/p50/p90) y suministros atípicos del período."""
+    return await _responder(_usecase.obtener_periodo, periodo)
@@ -1,43 +1,112 @@
 # routes/factura_routes.py
-from fastapi import APIRouter, HTTPException, Depends
-from infrastructure.sqlalchemy_usuario_repository import SQLAlchemyUsuarioRepository
-from infrastructure.database import get_db_session
+from fastapi import APIRouter, HTTPException, Depends, Query
+from fastapi.responses import Response
+from pydantic import BaseModel, Field
+from typing import List, Optional, Literal
+from datetime import date, datetime, time, timedelta
+from infrastructure.database import ejecutar_db
+from infrastructure.unit_of_work import UnitOfWork, get_unit_of_work
+from infrastructure.security import require_role
 from application.consultar_facturas_usecase import ConsultarFacturasUseCase
+from application.formato_facturas import a_json, a_arrow_ipc
+from domain.entities import Usuario
 import logging
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
 
 factura_router = APIRouter()
 
-# Instancias globales para las sesiones y repositorios
-_session_db1 = None
-_session_db2 = None
-_factura_repository = None
-_consultar_facturas_usecase = None
-
-def init_factura_services(app):
-    global _session_db1, _session_db2, _factura_repository, _consultar_facturas_usecase
-    _session_db1 = get_db_session(app, bind='db1')
-    _session_db2 = get_db_session(app, bind='db2')
-    _factura_repository = SQLAlchemyUsuarioRepository(_session_db1, _session_db2)
-    _consultar_facturas_usecase = ConsultarFacturasUseCase(_factura_repository)
-
-def get_factura_repository():
-    if _factura_repository is None:
-        raise RuntimeError("Factura repository not initialized.")
-    return _factura_repository
-
-def get_consultar_facturas_usecase():
-    if _consultar_facturas_usecase is None:
-        raise RuntimeError("Consultar facturas use case not initialized.")
-    return _consultar_facturas_usecase
+def get_factura_repository(uow: UnitOfWork = Depends(get_unit_of_work)):
+    return uow.usuario_repository_async
+
+def get_consultar_facturas_usecase(uow: UnitOfWork = Depends(get_unit_of_work)):
+    return ConsultarFacturasUseCase(uow.usuario_repository)
+
+class ConsultaFacturas(BaseModel):
+    dnis: List[str] = Field(..., min_length=1, max_length=5000)
+    desde: Optional[date] = Field(None, description="Fecha de emisión desde (inclusive)")
+    hasta: Optional[date] = Field(None, description="Fecha de emisión hasta (inclusive)")
+    estado: Optional[Literal["pagada", "pendiente"]] = None
+    formato: Literal["json", "arrow"] = "json"
+
+@factura_router.post("/consulta")
+async def consultar_facturas(
+    consulta: ConsultaFacturas,
+    consultar_facturas_usecase: ConsultarFacturasUseCase = Depends(get_consultar_facturas_usecase),
+    current_user: Usuario = Depends(require_role("admin")),
+):
+    """Facturas de varios DNIs para operadores, formateadas por columnas: JSON o stream IPC de Arrow."""
+    try:
+        respuesta, status_code = await ejecutar_db(
+            consultar_facturas_usecase.ejecutar_tabla,
+            consulta.dnis,
+            datetime.combine(consulta.desde, time.min) if consulta.desde else None,
+            datetime.combine(consulta.hasta + timedelta(days=1), time.min) if consulta.hasta else None,
+            consulta.estado,
+        )
+        if status_code != 200:
+            raise HTTPException(status_code=status_code, detail=respuesta.get("error") or respuesta.get("mensaje", "Error desconocido"))
+        if consulta.formato == "arrow":
+            return Response(content=a_arrow_ipc(respuesta), media_type="application/vnd.apache.arrow.stream")
+        return Response(content=a_json(respuesta), media_type="application/json")
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error al consultar las facturas: {str(e)}")
 
 @factura_router.get("/{dni}")
-async def obtener_facturas_por_dni(dni: str, consultar_facturas_usecase: ConsultarFacturasUseCase = Depends(get_consultar_facturas_usecase)):
+async def obtener_facturas_por_dni(
+    dni: str,
+    limit: Optional[int] = Query(None, ge=1, le=500, description="Cantidad de facturas, de la más reciente a la más antigua"),
+    offset: int = Query(0, ge=0),
+    desde: Optional[date] = Query(None, description="Fecha de emisión desde (inclusive)"),
+    hasta: Optional[date] = Query(None, description="Fecha de emisión hasta (inclusive)"),
+    estado: Optional[Literal["pagada", "pendiente"]] = None,
+    consultar_facturas_usecase: ConsultarFacturasUseCase = Depends(get_consultar_facturas_usecase),
+):
+    try:
+        respuesta, status_code = await ejecutar_db(
+            consultar_facturas_usecase.ejecutar,
+            dni,
+            limit,
+            offset,
+            datetime.combine(desde, time.min) if desde else None,
+            datetime.combine(hasta + timedelta(days=1), time.min) if hasta else None,
+            estado,
+        )
+        if status_code != 200:
+            raise HTTPException(status_code=status_code, detail=respuesta.get("error") or respuesta.get("mensaje", "Error desconocido"))
+        return respuesta
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error al consultar las facturas: {str(e)}")
+
+@factura_router.get("/{dni}/ultima")
+async def obtener_ultima_factura(dni: str, consultar_facturas_usecase: ConsultarFacturasUseCase = Depends(get_consultar_facturas_usecase)):
+    try:
+        respuesta, status_code = await ejecutar_db(consultar_facturas_usecase.ejecutar_ultima, dni)
+        if status_code != 200:
+            raise HTTPException(status_code=status_code, detail=respuesta.get("error") or respuesta.get("mensaje", "Error desconocido"))
+        return respuesta
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error al consultar la última factura: {str(e)}")
+
+@factura_router.get("/{dni}/resumen")
+async def obtener_resumen_facturas(
+    dni: str,
+    periodos: int = Query(6, ge=1, le=24, description="Cantidad de períodos de consumo"),
+    consultar_facturas_usecase: ConsultarFacturasUseCase = Depends(get_consultar_facturas_usecase),
+):
+    """Deuda (impagas, vencidas, próximo vencimiento) y últimos consumos con su variación."""
     try:
-        respuesta, status_code = consultar_facturas_usecase.ejecutar(dni)
+        respuesta, status_code = await ejecutar_db(consultar_facturas_usecase.resumir, dni, periodos)
         if status_code != 200:
-            raise HTTPException(status_code=status_code, detail=respuesta.get("error", "Error desconocido"))
+            raise HTTPException(status_code=status_code, detail=respuesta.get("error") or respuesta.get("mensaje", "Error desconocido"))
         return respuesta
+    except HTTPException:
+        raise
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error al consultar las facturas: {str(e)}")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"Error al resumir las facturas: {str(e)}")
@@ -1,73 +1,182 @@
 # routes/reclamo_routes.py
-from fastapi import APIRouter, HTTPException, Depends
-from infrastructure.sqlalchemy_reclamo_repository import SQLAlchemyReclamoRepository
-from infrastructure.sqlalchemy_usuario_repository import SQLAlchemyUsuarioRepository
-from infrastructure.database import get_db_session
+from fastapi import APIRouter, HTTPException, Depends, Query
+from pydantic import BaseModel, Field
+from fastapi.responses import StreamingResponse, Response
+from pydantic_core import to_json
+from typing import List, Optional
+from datetime import date, datetime, time, timedelta
+from infrastructure.async_sqlalchemy_reclamo_repository import AsyncSQLAlchemyReclamoRepository
+from infrastructure.database import ejecutar_db
+from infrastructure.unit_of_work import UnitOfWork, get_unit_of_work, abrir_unit_of_work
+from infrastructure.security import require_role
 from application.registrar_reclamo_usecase import RegistrarReclamoUseCase
 from application.consultar_estado_reclamo_usecase import ConsultarEstadoReclamoUseCase
 from application.consultar_reclamo_usecase import ConsultarReclamoUseCase
+from application.exportar_reclamos_usecase import EscritorParquet
+from domain.dtos import PaginaReclamos, BusquedaReclamos
+from domain.entities import Usuario
 import logging
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
 
 reclamo_router = APIRouter()
 
-# Instancias globales para las sesiones y repositorios
-_session_db1 = None
-_session_db2 = None
-_reclamo_repository = None
-_cliente_repository = None
-_registrar_reclamo_usecase = None
-_consultar_estado_usecase = None
-_consultar_reclamo_usecase = None
-
-def init_reclamo_services(app):
-    global _session_db1, _session_db2, _reclamo_repository, _cliente_repository
-    global _registrar_reclamo_usecase, _consultar_estado_usecase, _consultar_reclamo_usecase
-    _session_db1 = get_db_session(app, bind='db1')
-    _session_db2 = get_db_session(app, bind='db2')
-    if _session_db1 is None or _session_db2 is None:
-        raise RuntimeError("Error en la inicialización de sesiones para DB1 o DB2.")
-    _reclamo_repository = SQLAlchemyReclamoRepository(_session_db2)
-    _cliente_repository = SQLAlchemyUsuarioRepository(_session_db1, _session_db2)
-    _registrar_reclamo_usecase = RegistrarReclamoUseCase(_reclamo_repository, _cliente_repository)
-    _consultar_estado_usecase = ConsultarEstadoReclamoUseCase(_reclamo_repository, _cliente_repository)
-    _consultar_reclamo_usecase = ConsultarReclamoUseCase(_reclamo_repository)
-
-# Dependencias para inyectar en las rutas
-def get_reclamo_repository():
-    if _reclamo_repository is None:
-        raise RuntimeError("Reclamo repository not initialized.")
-    return _reclamo_repository
-
-def get_registrar_reclamo_usecase():
-    if _registrar_reclamo_usecase is None:
-        raise RuntimeError("Registrar reclamo use case not initialized.")
-    return _registrar_reclamo_usecase
-
-def get_consultar_estado_usecase():
-    if _consultar_estado_usecase is None:
-        raise RuntimeError("Consultar estado use case not initialized.")
-    return _consultar_estado_usecase
-
-def get_consultar_reclamo_usecase():
-    if _consultar_reclamo_usecase is None:
-        raise RuntimeError("Consultar reclamo use case not initialized.")
-    return _consultar_reclamo_usecase
-
-@reclamo_router.get("/")
-async def obtener_todos_los_reclamos(reclamo_repository: SQLAlchemyReclamoRepository = Depends(get_reclamo_repository)):
+# Reclamos por lote al transmitir el listado completo (stream=ndjson|json)
+TAMANO_LOTE_STREAM = 500
+# Reclamos por página de GET /api/reclamos/ cuando no se pasa ``limit``
+TAMANO_PAGINA = 100
+# Reclamos por row group en el export a Parquet
+TAMANO_LOTE_PARQUET = 5000
+
+class FiltroReclamos(BaseModel):
+    estado: Optional[List[str]] = None
+    desde: Optional[date] = None
+    hasta: Optional[date] = None
+    barrio: Optional[str] = None
+    calle: Optional[str] = None
+
+class CambioEstadoMasivo(BaseModel):
+    estado: str = Field(..., min_length=1)
+    ids: Optional[List[int]] = Field(None, min_length=1, max_length=5000)
+    filtro: Optional[FiltroReclamos] = None
+
+def _rango_fechas(desde: Optional[date], hasta: Optional[date]):
+    """Convierte fechas inclusivas en el rango [desde, hasta) de datetimes que usa el repositorio."""
+    return (
+        datetime.combine(desde, time.min) if desde else None,
+        datetime.combine(hasta + timedelta(days=1), time.min) if hasta else None,
+    )
+
+def _respuesta_json(contenido) -> Response:
+    """Serializa los listados (dicts de ReclamoListado) directo a JSON.
+
+    Los modelos de domain.dtos documentan la respuesta; devolver un Response evita
+    revalidar fila por fila lo que ya viene tipado de la base.
+    """
+    return Response(content=to_json(contenido), media_type="application/json")
+
+# Dependencias para inyectar en las rutas: repositorios y casos de uso por request
+def get_reclamo_repository(uow: UnitOfWork = Depends(get_unit_of_work)):
+    return uow.reclamo_repository_async
+
+def get_registrar_reclamo_usecase(uow: UnitOfWork = Depends(get_unit_of_work)):
+    return RegistrarReclamoUseCase(uow.reclamo_repository, uow.usuario_repository)
+
+def get_consultar_estado_usecase(uow: UnitOfWork = Depends(get_unit_of_work)):
+    return ConsultarEstadoReclamoUseCase(uow.reclamo_repository, uow.usuario_repository)
+
+def get_consultar_reclamo_usecase(uow: UnitOfWork = Depends(get_unit_of_work)):
+    return ConsultarReclamoUseCase(uow.reclamo_repository)
+
+async def _transmitir_reclamos(formato: str, after: Optional[int]):
+    """Genera el listado por lotes. Abre su propia UnitOfWork porque el cuerpo se envía
+    después de que FastAPI cerró las dependencias del request."""
+    async with abrir_unit_of_work() as uow:
+        primero = True
+        if formato == "json":
+            yield b"["
+        try:
+            async for lote in uow.reclamo_repository_async.iterar_lotes(TAMANO_LOTE_STREAM, after):
+                if formato == "json":
+                    fragmento = b",".join(to_json(r) for r in lote)
+                    yield fragmento if primero else b"," + fragmento
+                else:
+                    yield b"".join(to_json(r) + b"\n" for r in lote)
+                primero = primero and not lote
+        except Exception as e:
+            logging.error(f"Error al transmitir los reclamos: {str(e)}")
+            raise
+        if formato == "json":
+            yield b"]"
+
+async def _transmitir_parquet(after: Optional[int]):
+    """Genera el Parquet por row groups a medida que llegan los lotes del cursor; el footer va al final."""
+    async with abrir_unit_of_work() as uow:
+        escritor = EscritorParquet()
+        try:
+            async for lote in uow.reclamo_repository_async.iterar_filas(TAMANO_LOTE_PARQUET, after):
+                yield escritor.escribir(lote)
+        except Exception as e:
+            logging.error(f"Error al transmitir el export de reclamos: {str(e)}")
+            raise
+        yield escritor.cerrar()
+
+@reclamo_router.get("/", response_model=PaginaReclamos)
+async def obtener_todos_los_reclamos(
+    limit: int = Query(TAMANO_PAGINA, ge=1, le=1000),
+    after: Optional[int] = Query(None, description="Último ID_RECLAMO recibido (cursor)"),
+    stream: Optional[str] = Query(None, pattern="^(ndjson|json)$"),
+    reclamo_repository: AsyncSQLAlchemyReclamoRepository = Depends(get_reclamo_repository),
+):
+    """Una página de reclamos por ID_RECLAMO (keyset); ``siguiente`` es el ``after`` de la próxima.
+
+    Sin parámetros devuelve la primera página, no la tabla entera. El listado completo (un array
+    JSON o NDJSON) sólo sale con ``stream``, que lo envía por lotes sin armarlo en memoria.
+    """
+    if stream:
+        media_type = "application/x-ndjson" if stream == "ndjson" else "application/json"
+        return StreamingResponse(_transmitir_reclamos(stream, after), media_type=media_type)
     try:
-        reclamos = reclamo_repository.listar_todos()
-        data = [r.to_dict() for r in reclamos]
-        return data
+        reclamos = await reclamo_repository.listar_pagina(limit, after)
+        return _respuesta_json({
+            "reclamos": reclamos,
+            "siguiente": reclamos[-1]["ID_RECLAMO"] if len(reclamos) == limit else None,
+        })
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error al obtener los reclamos: {str(e)}")
 
+@reclamo_router.get("/exportar")
+async def exportar_reclamos(
+    after: Optional[int] = Query(None, description="Último ID_RECLAMO ya exportado (marca de agua)"),
+    current_user: Usuario = Depends(require_role("admin")),
+):
+    """Reclamos + Clientes en Parquet (fechas como timestamp, textos como string) para BI.
+
+    Con ``after`` sólo van los reclamos con ID_RECLAMO mayor. Los IDENTITY se pueden confirmar
+    fuera de orden, así que conviene pedir con un ``after`` algo menor que el último ID recibido
+    y descartar los repetidos (es lo que hace ``python -m infrastructure.exportar_reclamos``).
+    """
+    nombre = f"reclamos_desde_{after or 0}.parquet"
+    return StreamingResponse(
+        _transmitir_parquet(after),
+        media_type="application/vnd.apache.parquet",
+        headers={"Content-Disposition": f'attachment; filename="{nombre}"'},
+    )
+
+@reclamo_router.get("/buscar", response_model=BusquedaReclamos)
+async def buscar_reclamos(
+    estado: Optional[List[str]] = Query(None, description="Uno o más estados (se repite el parámetro)"),
+    desde: Optional[date] = Query(None, description="FECHA_RECLAMO desde (inclusive)"),
+    hasta: Optional[date] = Query(None, description="FECHA_RECLAMO hasta (inclusive)"),
+    barrio: Optional[str] = None,
+    calle: Optional[str] = None,
+    orden: str = Query("-fecha_reclamo", description="id_reclamo, fecha_reclamo, fecha_cierre, estado, barrio o calle; '-' para descendente"),
+    limit: int = Query(50, ge=1, le=500),
+    offset: int = Query(0, ge=0),
+    reclamo_repository: AsyncSQLAlchemyReclamoRepository = Depends(get_reclamo_repository),
+):
+    desde, hasta = _rango_fechas(desde, hasta)
+    try:
+        reclamos, total = await reclamo_repository.buscar(
+            estados=estado,
+            desde=desde,
+            hasta=hasta,
+            barrio=barrio,
+            calle=calle,
+            orden=orden,
+            limit=limit,
+            offset=offset,
+        )
+        return _respuesta_json({"total": total, "limit": limit, "offset": offset, "reclamos": reclamos})
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error al buscar los reclamos: {str(e)}")
+
 @reclamo_router.get("/{dni}")
 async def obtener_reclamos_por_dni(dni: str, consultar_estado_usecase: ConsultarEstadoReclamoUseCase = Depends(get_consultar_estado_usecase)):
     try:
-        respuesta, codigo = consultar_estado_usecase.ejecutar(dni)
+        respuesta, codigo = await ejecutar_db(consultar_estado_usecase.ejecutar, dni)
         if codigo != 200:
             raise HTTPException(status_code=codigo, detail=respuesta.get("error", "Error desconocido"))
         return respuesta
@@ -79,7 +188,7 @@ async def registrar_reclamo(dni: str, data: dict, registrar_reclamo_usecase: Reg
     if not data or "descripcion" not in data:
         raise HTTPException(status_code=400, detail="La descripción del reclamo es requerida")
     try:
-        respuesta, codigo = registrar_reclamo_usecase.ejecutar(dni, data["descripcion"])
+        respuesta, codigo = await ejecutar_db(registrar_reclamo_usecase.ejecutar, dni, data["descripcion"])
         if codigo != 201:
             raise HTTPException(status_code=codigo, detail=respuesta.get("error", "Error desconocido"))
         return respuesta
@@ -89,19 +198,53 @@ async def registrar_reclamo(dni: str, data: dict, registrar_reclamo_usecase: Reg
 @reclamo_router.get("/id/{id_reclamo}")
 async def obtener_reclamo_por_id(id_reclamo: int, consultar_reclamo_usecase: ConsultarReclamoUseCase = Depends(get_consultar_reclamo_usecase)):
     try:
-        respuesta, codigo = consultar_reclamo_usecase.ejecutar(id_reclamo)
+        respuesta, codigo = await ejecutar_db(consultar_reclamo_usecase.ejecutar, id_reclamo)
         if codigo != 200:
             raise HTTPException(status_code=codigo, detail=respuesta.get("error", "Error desconocido"))
         return respuesta
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error al obtener el reclamo por ID: {str(e)}")
 
+# Debe declararse antes de PUT /{id_reclamo}
+@reclamo_router.put("/estado")
+async def actualizar_estado_reclamos(
+    data: CambioEstadoMasivo,
+    reclamo_repository: AsyncSQLAlchemyReclamoRepository = Depends(get_reclamo_repository),
+    current_user: Usuario = Depends(require_role("admin")),
+):
+    """Cambia el estado de varios reclamos (por lista de IDs o por filtro) en un único UPDATE."""
+    if (data.ids is None) == (data.filtro is None):
+        raise HTTPException(status_code=400, detail="Se requiere 'ids' o 'filtro' (sólo uno de los dos)")
+    filtros = None
+    if data.filtro is not None:
+        desde, hasta = _rango_fechas(data.filtro.desde, data.filtro.hasta)
+        filtros = {
+            "estados": data.filtro.estado,
+            "desde": desde,
+            "hasta": hasta,
+            "barrio": data.filtro.barrio,
+            "calle": data.filtro.calle,
+        }
+    try:
+        resultados = await reclamo_repository.actualizar_estado_masivo(data.estado, data.ids, filtros)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error al actualizar el estado de los reclamos: {str(e)}")
+    actualizados = sum(1 for resultado in resultados.values() if resultado == "actualizado")
+    return {
+        "mensaje": f"Estado '{data.estado}' aplicado a {actualizados} reclamos",
+        "actualizados": actualizados,
+        "no_encontrados": len(resultados) - actualizados,
+        "resultados": [{"id_reclamo": id_reclamo, "resultado": resultado} for id_reclamo, resultado in resultados.items()],
+    }
+
 @reclamo_router.put("/{id_reclamo}")
-async def actualizar_estado_reclamo(id_reclamo: int, data: dict, reclamo_repository: SQLAlchemyReclamoRepository = Depends(get_reclamo_repository)):
+async def actualizar_estado_reclamo(id_reclamo: int, data: dict, reclamo_repository: AsyncSQLAlchemyReclamoRepository = Depends(get_reclamo_repository)):
     if not data or "estado" not in data:
         raise HTTPException(status_code=400, detail="El campo 'estado' es requerido")
     try:
-        reclamo_actualizado = reclamo_repository.actualizar_estado(id_reclamo, data["estado"])
+        reclamo_actualizado = await reclamo_repository.actualizar_estado(id_reclamo, data["estado"])
         if reclamo_actualizado is None:
             raise HTTPException(status_code=404, detail="Reclamo no encontrado")
         return {"mensaje": "Estado del reclamo actualizado exitosamente"}
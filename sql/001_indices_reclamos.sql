@@ -0,0 +1,10 @@
+-- sql/001_indices_reclamos.sql
+-- Índices compuestos de DECSA_EXC.Reclamos (ver domain/entities.py). Idempotente.
+
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_Reclamos_ESTADO_FECHA_RECLAMO' AND object_id = OBJECT_ID('dbo.Reclamos'))
+    CREATE INDEX IX_Reclamos_ESTADO_FECHA_RECLAMO ON dbo.Reclamos (ESTADO, FECHA_RECLAMO);
+GO
+
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_Reclamos_ID_USUARIO_ID_RECLAMO' AND object_id = OBJECT_ID('dbo.Reclamos'))
+    CREATE INDEX IX_Reclamos_ID_USUARIO_ID_RECLAMO ON dbo.Reclamos (ID_USUARIO, ID_RECLAMO);
+GO
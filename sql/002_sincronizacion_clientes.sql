@@ -0,0 +1,11 @@
+-- sql/002_sincronizacion_clientes.sql
+-- Marcas de agua de la sincronización PR_CAU → Clientes (ver domain/entities.py). Idempotente.
+
+IF OBJECT_ID('dbo.SincronizacionClientes', 'U') IS NULL
+    CREATE TABLE dbo.SincronizacionClientes (
+        NOMBRE VARCHAR(50) NOT NULL PRIMARY KEY,
+        ULTIMO_COD_PER INT NOT NULL DEFAULT 0,
+        ULTIMO_ID_FAC INT NOT NULL DEFAULT 0,
+        FECHA_SINCRONIZACION DATETIME NULL
+    );
+GO
@@ -0,0 +1,26 @@
+-- sql/003_reuso_planes_consultas.sql
+-- Diagnóstico (sólo lectura): reutilización de planes de las consultas parametrizadas del backend.
+-- pyodbc envía cada sentencia con parámetros como sp_prepexec: mientras el texto SQL sea el mismo
+-- (consultas armadas una vez con bindparam, ver sqlalchemy_*_repository.py) SQL Server reutiliza el
+-- plan y usecounts crece. Muchas filas casi iguales con usecounts = 1 indican SQL armado con literales.
+-- Correr en PR_CAU y en DECSA_EXC después de un rato de tráfico.
+
+SELECT TOP 50
+    cp.usecounts,
+    cp.objtype,
+    cp.size_in_bytes,
+    DB_NAME(st.dbid) AS base,
+    LEFT(st.text, 200) AS sentencia
+FROM sys.dm_exec_cached_plans AS cp
+CROSS APPLY sys.dm_exec_sql_text(cp.plan_handle) AS st
+WHERE cp.objtype = 'Prepared'
+  AND (st.text LIKE '%PERSONAS%' OR st.text LIKE '%FACTURAS%' OR st.text LIKE '%Clientes%'
+       OR st.text LIKE '%Reclamos%' OR st.text LIKE '%Usuarios%')
+ORDER BY cp.usecounts DESC;
+GO
+
+-- Planes usados una sola vez (candidatos a consultas sin parametrizar)
+SELECT COUNT(*) AS planes_de_un_uso, SUM(CAST(cp.size_in_bytes AS BIGINT)) / 1024 AS kb
+FROM sys.dm_exec_cached_plans AS cp
+WHERE cp.objtype IN ('Adhoc', 'Prepared') AND cp.usecounts = 1;
+GO
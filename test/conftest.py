@@ -0,0 +1,49 @@
+# test/conftest.py
+import os
+import sys
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import StaticPool
+
+# Los tests importan los paquetes del proyecto (application, infrastructure, ...) desde la raíz
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Scripts manuales contra servicios reales (SQL Server, Telegram, APIs de los LLM): se corren a mano
+collect_ignore = [
+    "deepseek_chat_test.py",
+    "gemini_chat_test.py",
+    "test_connection.py",
+    "test_db_connections.py",
+    "test_detectar_intencion.py",
+    "test_settings.py",
+]
+
+def _engine_en_memoria():
+    # Una sola conexión compartida: TestClient corre las rutas en otro hilo y cada conexión
+    # nueva de sqlite en memoria sería una base vacía
+    return create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+
+@pytest.fixture
+def sesion_db1():
+    """PR_CAU en sqlite en memoria, con las columnas que declara pr_cau_tablas."""
+    from infrastructure import pr_cau_tablas
+
+    engine = _engine_en_memoria()
+    with engine.begin() as conexion:
+        for tabla in (pr_cau_tablas.PERSONAS, pr_cau_tablas.FACTURAS, pr_cau_tablas.SUMSOC, pr_cau_tablas.CONS_SER,
+                      pr_cau_tablas.BARRIOS, pr_cau_tablas.CALLES, pr_cau_tablas.SERSOC):
+            conexion.execute(text(f"CREATE TABLE {tabla.name} ({', '.join(columna.name for columna in tabla.c)})"))
+    with Session(engine) as sesion:
+        yield sesion
+
+@pytest.fixture
+def sesion_db2():
+    """DECSA_EXC en sqlite en memoria (Clientes, Reclamos y SincronizacionClientes)."""
+    from domain.entities import Base, Cliente, Reclamo, SincronizacionClientes
+
+    engine = _engine_en_memoria()
+    Base.metadata.create_all(engine, tables=[Cliente.__table__, Reclamo.__table__, SincronizacionClientes.__table__])
+    with Session(engine) as sesion:
+        yield sesion
@@ -0,0 +1,23 @@
+# test/test_chattigo_adapter.py
+import fnmatch
+
+from adapters.chattigo_adapter import ChattigoAdapter
+
+class _RedisFalso:
+    def __init__(self, claves):
+        self.claves = dict.fromkeys(claves, "x")
+
+    def scan_iter(self, match="*", count=None):
+        return iter([clave for clave in list(self.claves) if fnmatch.fnmatch(clave, match)])
+
+    def delete(self, *claves):
+        return sum(self.claves.pop(clave, None) is not None for clave in claves)
+
+def test_reseteo_diario_solo_borra_las_conversaciones():
+    redis = _RedisFalso([f"user:{i}:historial" for i in range(5)] + [f"user:{i}:estado" for i in range(5)] + [
+        "prcau:identidad:123", "llm:chatgpt:abc", "analitica:consumos:indice",
+    ])
+    adapter = ChattigoAdapter.__new__(ChattigoAdapter)
+    adapter.redis_client = redis
+    assert adapter._resetear_memoria(lote=3) == 10
+    assert set(redis.claves) == {"prcau:identidad:123", "llm:chatgpt:abc", "analitica:consumos:indice"}
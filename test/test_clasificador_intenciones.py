@@ -0,0 +1,187 @@
+# test/test_clasificador_intenciones.py
+import asyncio
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from application.chatgpt_service import ORIGEN_CACHE, ORIGEN_ERROR, ORIGEN_LLM, ORIGEN_NO_ENTENDI, ORIGEN_SIMILAR, ChatGPTService
+from application.clasificador_intenciones import ClasificadorIntenciones, UMBRAL_CONFIANZA, preprocesar
+from application.detectar_intencion_chatgpt_usecase import DetectarIntencionChatGPTUseCase
+
+@pytest.fixture(scope="module")
+def clasificador():
+    return ClasificadorIntenciones()
+
+def _clasificar(clasificador, mensaje):
+    return clasificador.clasificar(preprocesar(mensaje))
+
+# Autómata (las frases pasan por preprocesar, así que los textos también)
+
+def _buscar(automata, texto):
+    return automata.buscar(preprocesar(texto))
+
+def test_frases_sueltas_y_superpuestas_en_una_pasada():
+    automata = ClasificadorIntenciones(reglas=(("luz", "A", 1.0), ("sin luz", "B", 1.0), ("corte de luz", "C", 1.0)))
+    assert _buscar(automata, "estoy sin luz por un corte de luz") == {0, 1, 2}
+
+def test_solo_palabras_completas():
+    automata = ClasificadorIntenciones(reglas=(("ver", "Consultar", 1.0), ("mail", "Actualizar", 1.0)))
+    assert _buscar(automata, "quiero ver") == {0}
+    assert _buscar(automata, "vercion nueva") == set()
+    assert _buscar(automata, "lo vi ayer, enverdad") == set()
+    assert _buscar(automata, "mi email") == set()
+    assert _buscar(automata, "mail: x@y.com") == {1}
+
+def test_asterisco_tambien_matchea_como_prefijo():
+    automata = ClasificadorIntenciones(reglas=(("factura*", "ConsultarFacturas", 1.0), ("pagar", "ConsultarFacturas", 1.0)))
+    assert _buscar(automata, "mis facturas") == {0}
+    assert _buscar(automata, "la factura") == {0}
+    assert _buscar(automata, "pagaron") == set()
+    # El prefijo sigue pidiendo que la frase empiece en una palabra
+    assert _buscar(automata, "prefactura") == set()
+
+def test_tildes_en_el_mensaje_y_en_las_reglas():
+    automata = ClasificadorIntenciones(reglas=(("dirección", "Actualizar", 1.0), ("tension", "Reclamo", 1.0)))
+    assert _buscar(automata, "mi direccion") == {0}
+    assert _buscar(automata, "mi dirección") == {0}
+    assert _buscar(automata, "baja tensión") == {1}
+
+def test_coincidencias_con_posiciones():
+    automata = ClasificadorIntenciones(reglas=(("reclamo*", "Reclamo", 1.0),))
+    assert automata.coincidencias(preprocesar("un reclamos")) == [(3, 10, 0)]
+
+# Clasificación
+
+@pytest.mark.parametrize("mensaje, intencion", [
+    ("no tengo luz", "Reclamo"),
+    ("Quiero hacer un reclamo", "Reclamo"),
+    ("no tengo luz y quiero hacer un reclamo", "Reclamo"),
+    ("no, quiero hacer un reclamo", "Reclamo"),
+    ("quiero ver mi factura", "ConsultarFacturas"),
+    ("cambiar mi celular", "Actualizar"),
+    ("ya hice un reclamo y nadie vino", "Consultar"),
+])
+def test_mensajes_obvios_se_resuelven_sin_llm(clasificador, mensaje, intencion):
+    resultado, confianza = _clasificar(clasificador, mensaje)
+    assert resultado == intencion
+    assert confianza >= UMBRAL_CONFIANZA
+
+@pytest.mark.parametrize("mensaje", [
+    "no quiero hacer un reclamo",
+    "nunca pedi cambiar mi celular",
+    "no puedo ver mi factura",
+    "tampoco quiero actualizar nada",
+])
+def test_frase_negada_abstiene(clasificador, mensaje):
+    assert _clasificar(clasificador, mensaje) == (None, 0.0)
+
+def test_la_negacion_de_otra_clausula_no_cuenta(clasificador):
+    assert not clasificador.negada(preprocesar("no se, quiero hacer un reclamo"))
+    assert clasificador.negada(preprocesar("no se si quiero hacer un reclamo"))
+
+def test_negacion_dentro_de_la_frase_no_cuenta(clasificador):
+    assert not clasificador.negada(preprocesar("no tengo luz"))
+    assert not clasificador.negada(preprocesar("no hay luz en el barrio"))
+
+def test_verbos_genericos_no_son_reclamo(clasificador):
+    intencion, confianza = _clasificar(clasificador, "tengo un problema para hacer el pago")
+    assert confianza < UMBRAL_CONFIANZA
+    for mensaje in ("quiero hacer el pago", "voy a cargar saldo", "como hago para poner debito automatico"):
+        assert "Reclamo" not in clasificador.puntajes(preprocesar(mensaje))
+
+def test_reclamo_ya_hecho_no_abre_uno_nuevo(clasificador):
+    intencion, confianza = _clasificar(clasificador, "ayer hice un reclamo porque no tengo luz, como va?")
+    assert intencion == "Consultar"
+    # Queda por debajo del umbral (lo decide el LLM), pero si el LLM contesta "Conversar" el
+    # respaldo del adapter lleva a Consultar y no a un reclamo nuevo
+    assert confianza < UMBRAL_CONFIANZA
+
+def test_sin_frases_o_empate_no_decide(clasificador):
+    assert _clasificar(clasificador, "hola que tal") == (None, 0.0)
+    assert _clasificar(clasificador, "reclamo") == (None, 0.0)
+
+# Caso de uso: lo que las reglas no deciden va al LLM
+
+class _ChatGPTFalso:
+    def __init__(self, origen=ORIGEN_LLM):
+        self.mensajes = []
+        self.origen = origen
+
+    async def detectar_intencion_con_origen(self, mensaje, historial=""):
+        self.mensajes.append(mensaje)
+        return json.dumps({"intencion": "Conversar", "respuesta": "ok"}), self.origen
+
+class _RegistroFalso:
+    def __init__(self):
+        self.pares = []
+
+    def registrar(self, texto, intencion, origen):
+        self.pares.append((texto, intencion, origen))
+
+def test_caso_de_uso_manda_al_llm_lo_negado_y_resuelve_lo_obvio():
+    servicio = _ChatGPTFalso()
+    caso_de_uso = DetectarIntencionChatGPTUseCase(servicio)
+    negado = json.loads(asyncio.run(caso_de_uso.ejecutar("no quiero hacer un reclamo")))
+    obvio = json.loads(asyncio.run(caso_de_uso.ejecutar("no tengo luz")))
+    assert negado["intencion"] == "Conversar"
+    assert (obvio["intencion"], obvio["origen"]) == ("Reclamo", "reglas")
+    assert servicio.mensajes == ["no quiero hacer un reclamo"]
+    assert caso_de_uso.resumen()["por_origen"] == {"reglas": 1, "modelo": 0, "llm": 1}
+
+@pytest.mark.parametrize("origen, registrados", [
+    (ORIGEN_LLM, [("no quiero hacer un reclamo", "Conversar", "llm")]),
+    # Las respuestas de las cachés no son ejemplos nuevos; error y "no entendí" no son etiquetas
+    (ORIGEN_CACHE, []),
+    (ORIGEN_SIMILAR, []),
+    (ORIGEN_NO_ENTENDI, []),
+    (ORIGEN_ERROR, []),
+])
+def test_caso_de_uso_registra_solo_respuestas_nuevas_del_llm(origen, registrados):
+    registro = _RegistroFalso()
+    caso_de_uso = DetectarIntencionChatGPTUseCase(_ChatGPTFalso(origen), registro=registro)
+    asyncio.run(caso_de_uso.ejecutar("no quiero hacer un reclamo"))
+    assert registro.pares == registrados
+
+# ChatGPTService: de dónde sale cada respuesta
+
+class _CacheFalsa:
+    def __init__(self):
+        self.datos = {}
+
+    def clave(self, *partes):
+        return ":".join(partes)
+
+    def obtener(self, clave):
+        return self.datos.get(clave)
+
+    def guardar(self, clave, respuesta, segundos=None):
+        self.datos[clave] = respuesta
+
+class _SimilaresFalsa(_CacheFalsa):
+    def obtener(self, espacio, prompt):
+        return self.datos.get((espacio, prompt.rstrip("!")))
+
+    def guardar(self, espacio, prompt, respuesta):
+        self.datos[(espacio, prompt.rstrip("!"))] = respuesta
+
+def _cliente_openai(*contenidos):
+    """Cliente con la forma de AsyncOpenAI que contesta ``contenidos`` en orden."""
+    respuestas = iter(contenidos)
+
+    async def create(**kwargs):
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=next(respuestas)))])
+
+    return SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+
+def test_servicio_informa_el_origen_de_la_respuesta():
+    respuesta = json.dumps({"intencion": "Reclamo", "respuesta": "Decime tu DNI"})
+    servicio = ChatGPTService(client=_cliente_openai(respuesta, "no es json"), cache=_CacheFalsa(), similares=_SimilaresFalsa())
+
+    assert asyncio.run(servicio.detectar_intencion_con_origen("no tengo luz")) == (respuesta, ORIGEN_LLM)
+    assert asyncio.run(servicio.detectar_intencion_con_origen("no tengo luz")) == (respuesta, ORIGEN_CACHE)
+    assert asyncio.run(servicio.detectar_intencion_con_origen("no tengo luz!!")) == (respuesta, ORIGEN_SIMILAR)
+    assert asyncio.run(servicio.detectar_intencion_con_origen("hola"))[1] == ORIGEN_NO_ENTENDI
+    # El cliente ya no tiene respuestas: falla como la API caída
+    assert asyncio.run(servicio.detectar_intencion_con_origen("chau"))[1] == ORIGEN_ERROR
+    assert asyncio.run(servicio.detectar_intencion("no tengo luz")) == respuesta
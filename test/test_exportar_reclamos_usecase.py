@@ -0,0 +1,57 @@
+# test/test_exportar_reclamos_usecase.py
+from datetime import datetime
+
+import pyarrow.parquet as pq
+
+from application.exportar_reclamos_usecase import ExportarReclamosUseCase, ids_exportados, ultimo_id_exportado
+
+def _fila(id_reclamo):
+    """Tupla en el orden de COLUMNAS_LISTADO."""
+    return (id_reclamo, 1, f"reclamo {id_reclamo}", "Pendiente", datetime(2026, 1, 1), None,
+            1, "Ana", "1", None, None, "San Martin", "Centro", "5000", "S1", "M1")
+
+class _RepositorioFalso:
+    """Reclamos confirmados hasta el momento (la tabla vista por el export)."""
+
+    def __init__(self, ids):
+        self.ids = set(ids)
+
+    def iterar_filas(self, tamano_lote, after=None):
+        filas = [_fila(id_reclamo) for id_reclamo in sorted(self.ids) if after is None or id_reclamo > after]
+        for i in range(0, len(filas), tamano_lote):
+            yield filas[i:i + tamano_lote]
+
+def _exportados(directorio):
+    return sorted(ids_exportados(str(directorio), 0))
+
+def test_id_confirmado_tarde_entra_en_la_siguiente_corrida(tmp_path):
+    repositorio = _RepositorioFalso([1, 2, 4])
+    usecase = ExportarReclamosUseCase(repositorio, tamano_lote=2, ventana=10)
+    resumen, status = usecase.ejecutar(str(tmp_path))
+    assert (status, resumen["exportados"], resumen["ultimo_id_reclamo"]) == (200, 3, 4)
+
+    # El 3 se confirmó después que el 4 (ya exportado como marca de agua)
+    repositorio.ids.update({3, 5})
+    resumen, _ = usecase.ejecutar(str(tmp_path))
+    assert (resumen["exportados"], resumen["ultimo_id_reclamo"]) == (2, 5)
+    assert pq.read_table(resumen["archivo"]).column("ID_RECLAMO").to_pylist() == [3, 5]
+    assert _exportados(tmp_path) == [1, 2, 3, 4, 5]
+    assert ultimo_id_exportado(str(tmp_path)) == 5
+
+    # Sin nada nuevo no se escribe archivo y la marca no se mueve
+    resumen, _ = usecase.ejecutar(str(tmp_path))
+    assert resumen == {"exportados": 0, "ultimo_id_reclamo": 5, "archivo": None}
+
+def test_fuera_de_la_ventana_solo_lo_recupera_el_completo(tmp_path):
+    repositorio = _RepositorioFalso(set(range(1, 21)) - {3})
+    usecase = ExportarReclamosUseCase(repositorio, ventana=5)
+    usecase.ejecutar(str(tmp_path))
+    # El 3 queda más de 5 IDs por debajo de la marca (20)
+    repositorio.ids.update({3, 21})
+    resumen, _ = usecase.ejecutar(str(tmp_path))
+    assert pq.read_table(resumen["archivo"]).column("ID_RECLAMO").to_pylist() == [21]
+
+    resumen, _ = usecase.ejecutar(str(tmp_path), completo=True)
+    assert resumen["exportados"] == 21
+    assert len(list(tmp_path.glob("reclamos_*.parquet"))) == 1
+    assert _exportados(tmp_path) == list(range(1, 22))
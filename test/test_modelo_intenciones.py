@@ -0,0 +1,96 @@
+# test/test_modelo_intenciones.py
+import json
+import os
+
+import numpy as np
+import pytest
+
+from application.clasificador_intenciones import INTENCIONES_FLUJO, preprocesar
+from application.modelo_intenciones import (
+    ARCHIVO_ACTUAL, ModeloIntenciones, activar_version, caracteristicas, cargar_modelo_actual, evaluar, versiones,
+)
+from infrastructure.ejemplos_intenciones import RegistroEjemplosIntencion
+from infrastructure.entrenar_modelo_intenciones import SEMILLA
+
+TEXTOS = [preprocesar(texto) for texto, _ in SEMILLA]
+INTENCIONES = [intencion for _, intencion in SEMILLA]
+
+@pytest.fixture(scope="module")
+def modelo():
+    return ModeloIntenciones.entrenar(TEXTOS, INTENCIONES, epocas=200)
+
+def test_caracteristicas_estables_y_sin_repetir():
+    indices = caracteristicas("no tengo luz no")
+    assert np.array_equal(indices, caracteristicas("no tengo luz no"))
+    assert len(indices) == len(set(indices.tolist()))
+    # crc32 y no hash(): los índices no dependen del proceso
+    assert caracteristicas("hola").tolist() == caracteristicas("HOLA").tolist()
+
+def test_entrenar_aprende_la_semilla(modelo):
+    assert modelo.clases == sorted(set(INTENCIONES))
+    aciertos = sum(modelo.predecir(texto)[0] == intencion for texto, intencion in zip(TEXTOS, INTENCIONES))
+    assert aciertos / len(TEXTOS) >= 0.95
+    intencion, probabilidad = modelo.predecir(preprocesar("se corto la luz en mi casa"))
+    assert intencion == "Reclamo"
+    assert 0.0 < probabilidad <= 1.0
+
+def test_probabilidades_suman_uno_incluso_sin_terminos_conocidos(modelo):
+    for texto in ("no tengo luz", "zzzz qqqq", ""):
+        assert modelo.probabilidades(texto).sum() == pytest.approx(1.0, abs=1e-5)
+
+def test_guardar_y_cargar_dan_el_mismo_modelo(modelo, tmp_path):
+    archivo = modelo.guardar(str(tmp_path))
+    cargado = ModeloIntenciones.cargar(archivo)
+    assert cargado.version == modelo.version
+    assert cargado.clases == modelo.clases
+    assert cargado.metadatos["ejemplos"] == len(TEXTOS)
+    for texto in TEXTOS + ["algo que nunca vio"]:
+        assert np.allclose(cargado.probabilidades(texto), modelo.probabilidades(texto), atol=1e-6)
+    # Sin activar no hay versión actual
+    assert not os.path.exists(tmp_path / ARCHIVO_ACTUAL)
+    assert cargar_modelo_actual(str(tmp_path)) is None
+
+def test_activar_version_y_cargar_la_actual(modelo, tmp_path):
+    modelo.guardar(str(tmp_path), activar=True)
+    assert versiones(str(tmp_path)) == [modelo.version]
+    actual = cargar_modelo_actual(str(tmp_path))
+    assert actual is not None and actual.version == modelo.version
+    with pytest.raises(ValueError):
+        activar_version(str(tmp_path), "19990101-000000")
+
+def test_evaluar_exactitud_cobertura_y_por_clase(modelo):
+    textos = [preprocesar("no tengo luz"), preprocesar("quiero ver mi factura"), preprocesar("hola")]
+    reales = ["Reclamo", "ConsultarFacturas", "Reclamo"]
+    reporte = evaluar(modelo, textos, reales, umbral=0.0, intenciones_flujo=INTENCIONES_FLUJO)
+    predichas = [modelo.predecir(texto)[0] for texto in textos]
+    assert reporte["ejemplos"] == 3
+    assert reporte["exactitud"] == round(np.mean([p == r for p, r in zip(predichas, reales)]), 4)
+    # Con umbral 0 sólo la charla queda sin cubrir
+    assert reporte["cobertura"] == round(np.mean([p in INTENCIONES_FLUJO for p in predichas]), 4)
+    assert reporte["por_clase"]["Reclamo"]["ejemplos"] == 2
+    # Umbral imposible: nada cubierto
+    assert evaluar(modelo, textos, reales, umbral=1.1, intenciones_flujo=INTENCIONES_FLUJO)["exactitud_cubiertos"] is None
+    assert evaluar(modelo, [], [], umbral=0.5) == {"ejemplos": 0}
+
+def test_registro_acumula_en_disco_y_lee_los_ultimos(tmp_path):
+    registro = RegistroEjemplosIntencion(directorio=str(tmp_path), maximo=3)
+    for i in range(5):
+        registro.registrar(f"texto {i}", "Reclamo", "llm")
+    registro.registrar("", "Reclamo", "llm")
+    registro.registrar("sin intencion", None, "llm")
+    # Otro proceso (p. ej. el CLI de entrenamiento) ve lo mismo
+    leidos = RegistroEjemplosIntencion(directorio=str(tmp_path), maximo=3).leer()
+    assert [ejemplo["texto"] for ejemplo in leidos] == ["texto 2", "texto 3", "texto 4"]
+    assert all(ejemplo["origen"] == "llm" for ejemplo in leidos)
+
+def test_registro_lee_varios_dias_y_saltea_lineas_rotas(tmp_path):
+    (tmp_path / "ejemplos_20260101.jsonl").write_text(
+        json.dumps({"texto": "viejo", "intencion": "Consultar"}) + "\n{\"texto\": \"cort", encoding="utf-8")
+    (tmp_path / "ejemplos_20260102.jsonl").write_text(
+        json.dumps({"texto": "nuevo", "intencion": "Reclamo"}) + "\n", encoding="utf-8")
+    (tmp_path / "otro.txt").write_text("no es un archivo de pares", encoding="utf-8")
+    registro = RegistroEjemplosIntencion(directorio=str(tmp_path))
+    assert [ejemplo["texto"] for ejemplo in registro.leer()] == ["viejo", "nuevo"]
+
+def test_registro_sin_directorio_no_falla(tmp_path):
+    assert RegistroEjemplosIntencion(directorio=str(tmp_path / "no_existe")).leer() == []
@@ -0,0 +1,114 @@
+# test/test_pr_cau_cache.py
+from datetime import date, datetime
+from decimal import Decimal
+
+import pytest
+import redis
+
+from infrastructure.pr_cau_cache import CachePrCau, deserializar, serializar
+
+class _PipelineFalso:
+    def __init__(self, redis_falso):
+        self.redis = redis_falso
+        self.comandos = []
+
+    def __getattr__(self, nombre):
+        return lambda *args, **kwargs: self.comandos.append((nombre, args, kwargs))
+
+    def execute(self):
+        return [getattr(self.redis, nombre)(*args, **kwargs) for nombre, args, kwargs in self.comandos]
+
+class _RedisFalso:
+    def __init__(self, caido=False):
+        self.datos = {}
+        self.caido = caido
+
+    def _revisar(self):
+        if self.caido:
+            raise redis.ConnectionError("Redis caído")
+
+    def get(self, clave):
+        self._revisar()
+        return self.datos.get(clave)
+
+    def set(self, clave, valor, ex=None):
+        self._revisar()
+        self.datos[clave] = valor
+
+    def sadd(self, clave, *miembros):
+        self.datos.setdefault(clave, set()).update(miembros)
+
+    def smembers(self, clave):
+        return set(self.datos.get(clave, set()))
+
+    def expire(self, clave, segundos):
+        pass
+
+    def delete(self, *claves):
+        return sum(self.datos.pop(clave, None) is not None for clave in claves)
+
+    def pipeline(self):
+        return _PipelineFalso(self)
+
+FACTURA = {
+    "NumeroFactura": 1234,
+    "TotalFactura": Decimal("15230.50"),
+    "Consumo": 312,
+    "Variacion": 0.125,
+    "FechaEmision": datetime(2026, 3, 1, 10, 30),
+    "VencimientoFactura": date(2026, 3, 20),
+    "Estado": "Impaga",
+    "Observaciones": None,
+}
+
+@pytest.mark.parametrize("valor", [
+    None,
+    [],
+    FACTURA,
+    [FACTURA, dict(FACTURA, NumeroFactura=1235, TotalFactura=Decimal("0"), Consumo=None)],
+    # Las mismas columnas con otros tipos según el driver: vuelven con el tipo con el que entraron
+    {"TotalFactura": 15230.5, "Consumo": Decimal("312.000"), "FechaAlta": "2020-01-01"},
+])
+def test_ida_y_vuelta_conserva_valores_y_tipos(valor):
+    vuelta = deserializar(serializar(valor))
+    assert vuelta == valor
+    filas = vuelta if isinstance(vuelta, list) else [vuelta] if vuelta else []
+    originales = valor if isinstance(valor, list) else [valor] if valor else []
+    for fila, original in zip(filas, originales):
+        assert {columna: type(dato) for columna, dato in fila.items()} == {columna: type(dato) for columna, dato in original.items()}
+
+def test_hit_devuelve_lo_mismo_que_el_miss():
+    cache = CachePrCau(_RedisFalso())
+    consultas = []
+
+    def cargar():
+        consultas.append(1)
+        return [FACTURA]
+
+    miss = cache.leer_a_traves("facturas", "30111222", cargar, 1)
+    hit = cache.leer_a_traves("facturas", "30111222", cargar, 1)
+    assert hit == miss and type(hit[0]["Consumo"]) is int and type(hit[0]["TotalFactura"]) is Decimal
+    assert len(consultas) == 1
+    assert (cache.hits, cache.misses, cache.errores) == (1, 1, 0)
+
+def test_invalidar_borra_todas_las_variantes_del_dni():
+    redis_falso = _RedisFalso()
+    cache = CachePrCau(redis_falso)
+    cache.leer_a_traves("identidad", "1", lambda: {"DNI": "1"})
+    cache.leer_a_traves("facturas", "1", lambda: [FACTURA], 1)
+    cache.leer_a_traves("identidad", "2", lambda: {"DNI": "2"})
+    cache.invalidar("1")
+    assert list(redis_falso.datos) == [cache.clave("identidad", "2"), cache.clave("claves", "2")]
+
+def test_redis_caido_va_a_la_base_y_respeta_el_cooldown():
+    cache = CachePrCau(_RedisFalso(caido=True), cooldown=60)
+    assert cache.leer_a_traves("identidad", "1", lambda: {"DNI": "1"}) == {"DNI": "1"}
+    assert cache.leer_a_traves("identidad", "1", lambda: {"DNI": "1"}) == {"DNI": "1"}
+    # El segundo ya no intenta Redis
+    assert cache.errores == 1
+
+def test_valor_no_serializable_no_cuenta_como_error_de_redis():
+    cache = CachePrCau(_RedisFalso())
+    with pytest.raises(TypeError):
+        cache.leer_a_traves("identidad", "1", lambda: {"DNI": object()})
+    assert cache.errores == 0 and cache._disponible()
@@ -0,0 +1,43 @@
+# test/test_reclamo_routes.py
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from routes.reclamo_routes import TAMANO_PAGINA, get_reclamo_repository, reclamo_router
+
+class _RepositorioFalso:
+    """Reclamos 1..250 con el contrato de listar_pagina (keyset sobre ID_RECLAMO)."""
+
+    def __init__(self):
+        self.llamadas = []
+
+    async def listar_pagina(self, limit=None, after=None):
+        self.llamadas.append((limit, after))
+        ids = [i for i in range(1, 251) if after is None or i > after]
+        return [{"ID_RECLAMO": i} for i in (ids if limit is None else ids[:limit])]
+
+app = FastAPI()
+app.include_router(reclamo_router, prefix="/api/reclamos")
+cliente = TestClient(app)
+repositorio = _RepositorioFalso()
+app.dependency_overrides[get_reclamo_repository] = lambda: repositorio
+
+def test_cambio_de_estado_masivo_pide_admin():
+    respuesta = cliente.put("/api/reclamos/estado", json={"estado": "Resuelto", "filtro": {"barrio": "Centro"}})
+    assert respuesta.status_code == 401
+
+def test_export_pide_admin():
+    assert cliente.get("/api/reclamos/exportar").status_code == 401
+
+def test_listado_sin_parametros_devuelve_la_primera_pagina():
+    repositorio.llamadas.clear()
+    pagina = cliente.get("/api/reclamos/").json()
+    assert repositorio.llamadas == [(TAMANO_PAGINA, None)]
+    assert [r["ID_RECLAMO"] for r in pagina["reclamos"]] == list(range(1, TAMANO_PAGINA + 1))
+    assert pagina["siguiente"] == TAMANO_PAGINA
+
+def test_listado_sigue_el_cursor_hasta_la_ultima_pagina():
+    pagina = cliente.get("/api/reclamos/", params={"limit": 200, "after": 0}).json()
+    assert (len(pagina["reclamos"]), pagina["siguiente"]) == (200, 200)
+    pagina = cliente.get("/api/reclamos/", params={"limit": 200, "after": pagina["siguiente"]}).json()
+    assert (len(pagina["reclamos"]), pagina["siguiente"]) == (50, None)
+    assert cliente.get("/api/reclamos/", params={"limit": 5000}).status_code == 422
@@ -0,0 +1,184 @@
+# test/test_respuestas_llm_cache.py
+import asyncio
+import json
+from types import SimpleNamespace
+
+import pytest
+import redis
+
+from application.chatgpt_service import ChatGPTService
+from infrastructure.respuestas_llm_cache import CacheRespuestasLLM
+
+class _RedisFalso:
+    def __init__(self, caido=False):
+        self.datos = {}
+        self.ttl = {}
+        self.caido = caido
+        self.llamadas = 0
+
+    def _revisar(self):
+        self.llamadas += 1
+        if self.caido:
+            raise redis.ConnectionError("Redis caído")
+
+    def get(self, clave):
+        self._revisar()
+        return self.datos.get(clave)
+
+    def set(self, clave, valor, ex=None):
+        self._revisar()
+        self.datos[clave] = valor
+        self.ttl[clave] = ex
+
+def _respuesta(intencion, texto="Decime tu DNI"):
+    return json.dumps({"intencion": intencion, "respuesta": texto}, ensure_ascii=False)
+
+# clave
+
+def test_clave_determinista_por_proveedor_y_mensaje_normalizado():
+    cache = CacheRespuestasLLM(_RedisFalso())
+    clave = cache.clave("chatgpt", "gpt-4o-mini", "v2", "No tengo luz")
+    assert clave == CacheRespuestasLLM(_RedisFalso()).clave("chatgpt", "gpt-4o-mini", "v2", "no tengo luz")
+    assert clave == cache.clave("chatgpt", "gpt-4o-mini", "v2", "  ¡No  tengo LUZ! ")
+    assert clave.startswith("llm:chatgpt:")
+    # Mismo mensaje con otro proveedor, modelo o versión del prompt: otra entrada
+    otras = {
+        cache.clave("gemini", "gpt-4o-mini", "v2", "no tengo luz"),
+        cache.clave("chatgpt", "gpt-4o", "v2", "no tengo luz"),
+        cache.clave("chatgpt", "gpt-4o-mini", "v3", "no tengo luz"),
+    }
+    assert len(otras) == 3 and clave not in otras
+    assert cache.clave("gemini", "gpt-4o-mini", "v2", "no tengo luz").startswith("llm:gemini:")
+
+def test_clave_cuenta_solo_los_ultimos_turnos_previos():
+    cache = CacheRespuestasLLM(_RedisFalso(), turnos_historial=2)
+
+    def clave(historial):
+        return cache.clave("chatgpt", "gpt-4o-mini", "v2", "si", historial)
+
+    # El último turno es el mensaje actual y no cuenta; de los previos sólo los dos últimos
+    assert clave("Usuario: hola | Usuario: quiero reclamar | Usuario: si") == \
+        clave("Usuario: algo viejo | Usuario: hola | Usuario: quiero reclamar | Usuario: si")
+    assert clave("Usuario: hola | Usuario: quiero reclamar | Usuario: si") == \
+        clave("Usuario: HOLA | Usuario: Quiero  reclamar!! | Usuario: otra cosa")
+    assert clave("Usuario: hola | Usuario: quiero reclamar | Usuario: si") != \
+        clave("Usuario: hola | Usuario: quiero ver mi factura | Usuario: si")
+    # Sin turnos previos (sólo el mensaje actual) es lo mismo que sin historial
+    assert clave("Usuario: si") == clave("")
+
+def test_clave_sin_turnos_solo_distingue_si_hubo_dialogo():
+    cache = CacheRespuestasLLM(_RedisFalso(), turnos_historial=0)
+
+    def clave(historial):
+        return cache.clave("chatgpt", "gpt-4o-mini", "v2", "si", historial)
+
+    assert clave("Usuario: hola | Usuario: si") == clave("Usuario: quiero reclamar | Usuario: si")
+    assert clave("Usuario: hola | Usuario: si") != clave("Usuario: si")
+
+# obtener / guardar
+
+TTL = {"Conversar": 60, "Reclamo": 600, "Actualizar": 700, "Consultar": 800, "ConsultarFacturas": 900}
+
+@pytest.mark.parametrize("intencion", list(TTL))
+def test_guardar_usa_la_ttl_de_la_intencion(intencion):
+    redis_falso = _RedisFalso()
+    cache = CacheRespuestasLLM(redis_falso, ttl=TTL)
+    clave = cache.clave("chatgpt", "gpt-4o-mini", "v2", "mensaje")
+    cache.guardar(clave, _respuesta(intencion), 1.5)
+    assert redis_falso.ttl == {clave: TTL[intencion]}
+    assert cache.obtener(clave) == _respuesta(intencion)
+
+def test_ttl_por_defecto_conversar_vence_antes_que_los_flujos():
+    ttl = CacheRespuestasLLM(_RedisFalso(), ttl={"Reclamo": 5}).ttl
+    # Lo que no se pasa queda con la configuración
+    assert ttl["Reclamo"] == 5 and ttl["Conversar"] < ttl["ConsultarFacturas"] == ttl["Actualizar"]
+
+@pytest.mark.parametrize("respuesta", [
+    "no es json",
+    '{"intencion": "Conversar", "respuesta": "cortada',
+    "[1, 2]",
+    _respuesta("Saludar"),
+    json.dumps({"respuesta": "sin intención"}),
+])
+def test_respuesta_invalida_no_se_guarda(respuesta):
+    redis_falso = _RedisFalso()
+    cache = CacheRespuestasLLM(redis_falso)
+    clave = cache.clave("deepseek", "deepseek-chat", "v1", "mensaje")
+    cache.guardar(clave, respuesta)
+    assert redis_falso.datos == {}
+    assert cache.obtener(clave) is None
+    assert cache.resumen()["proveedores"]["deepseek"]["omitidas"] == 1
+
+def _cliente_openai(*contenidos):
+    """Cliente con la forma de AsyncOpenAI que contesta ``contenidos`` en orden."""
+    llamadas = []
+    respuestas = iter(contenidos)
+
+    async def create(**kwargs):
+        llamadas.append(kwargs)
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=next(respuestas)))])
+
+    return SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create))), llamadas
+
+class _SinSimilares:
+    def obtener(self, espacio, prompt):
+        return None
+
+    def guardar(self, espacio, prompt, respuesta):
+        pass
+
+def test_no_entendi_del_servicio_no_se_guarda():
+    redis_falso = _RedisFalso()
+    cliente, llamadas = _cliente_openai("esto no es json", "tampoco")
+    servicio = ChatGPTService(client=cliente, cache=CacheRespuestasLLM(redis_falso), similares=_SinSimilares())
+    primera = asyncio.run(servicio.generar_respuesta("asdf"))
+    segunda = asyncio.run(servicio.generar_respuesta("asdf"))
+    assert "No entendí" in json.loads(primera)["respuesta"] and segunda == primera
+    # El mismo mensaje vuelve a ir al modelo
+    assert redis_falso.datos == {} and len(llamadas) == 2
+
+def test_tope_de_tamano_en_bytes_utf8():
+    redis_falso = _RedisFalso()
+    respuesta = _respuesta("Conversar", "¿Cómo andás?")
+    cache = CacheRespuestasLLM(redis_falso, max_bytes=len(respuesta.encode("utf-8")))
+    cache.guardar("llm:chatgpt:justo", respuesta)
+    # Un carácter más, de dos bytes (la cuenta es en bytes y no en caracteres)
+    cache.guardar("llm:chatgpt:pasada", _respuesta("Conversar", "¿Cómo andás?é"))
+    assert list(redis_falso.datos) == ["llm:chatgpt:justo"]
+    proveedor = cache.resumen()["proveedores"]["chatgpt"]
+    assert (proveedor["guardadas"], proveedor["omitidas"]) == (1, 1)
+
+def test_hits_y_misses_por_proveedor():
+    redis_falso = _RedisFalso()
+    redis_falso.datos["llm:gemini:abc"] = _respuesta("Reclamo").encode("utf-8")
+    cache = CacheRespuestasLLM(redis_falso)
+    # Un cliente sin decode_responses devuelve bytes
+    assert cache.obtener("llm:gemini:abc") == _respuesta("Reclamo")
+    assert cache.obtener("llm:chatgpt:abc") is None
+    proveedores = cache.resumen()["proveedores"]
+    assert (proveedores["gemini"]["hits"], proveedores["gemini"]["misses"]) == (1, 0)
+    assert (proveedores["chatgpt"]["hits"], proveedores["chatgpt"]["misses"]) == (0, 1)
+
+# Redis caído
+
+def test_redis_caido_respeta_el_cooldown():
+    redis_falso = _RedisFalso(caido=True)
+    cache = CacheRespuestasLLM(redis_falso, cooldown=60)
+    clave = cache.clave("chatgpt", "gpt-4o-mini", "v2", "mensaje")
+    assert cache.obtener(clave) is None
+    # Durante el cooldown ni la lectura ni la escritura intentan Redis
+    assert cache.obtener(clave) is None
+    cache.guardar(clave, _respuesta("Reclamo"))
+    assert (redis_falso.llamadas, cache.errores) == (1, 1)
+    assert cache.resumen()["proveedores"]["chatgpt"]["misses"] == 0
+
+def test_sin_cooldown_reintenta_y_se_recupera():
+    redis_falso = _RedisFalso(caido=True)
+    cache = CacheRespuestasLLM(redis_falso, cooldown=0)
+    clave = cache.clave("chatgpt", "gpt-4o-mini", "v2", "mensaje")
+    cache.guardar(clave, _respuesta("Reclamo"))
+    assert cache.errores == 1
+    redis_falso.caido = False
+    cache.guardar(clave, _respuesta("Reclamo"))
+    assert cache.obtener(clave) == _respuesta("Reclamo")
+    assert cache.errores == 1
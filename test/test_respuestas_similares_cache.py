@@ -0,0 +1,108 @@
+# test/test_respuestas_similares_cache.py
+import pytest
+
+from infrastructure.respuestas_similares_cache import (
+    BANDAS, CacheRespuestasSimilares, es_apertura, jaccard, terminos,
+)
+
+ESPACIO = "chatgpt:gpt-4o-mini:v2"
+
+@pytest.fixture
+def cache():
+    cache = CacheRespuestasSimilares(umbral=0.85, maximo=100)
+    for mensaje in ("no tengo luz", "quiero hacer un reclamo", "hola buenas tardes", "no tengo luz desde ayer"):
+        cache.guardar(ESPACIO, mensaje, f"R({mensaje})")
+    return cache
+
+@pytest.mark.parametrize("mensaje, guardado", [
+    ("No tengo luz!!", "no tengo luz"),
+    ("no tengo  luz.", "no tengo luz"),
+    ("no tengo luzz", "no tengo luz"),
+    ("Quiero hacer un reclamo", "quiero hacer un reclamo"),
+    ("¡Hola, buenas tardes!", "hola buenas tardes"),
+    ("holaaa buenas tardes", "hola buenas tardes"),
+])
+def test_reusa_variantes_de_la_misma_apertura(cache, mensaje, guardado):
+    assert cache.obtener(ESPACIO, mensaje) == f"R({guardado})"
+
+@pytest.mark.parametrize("mensaje", [
+    "no quiero hacer un reclamo",
+    "ya tengo luz",
+    "tengo luz",
+    "nunca tengo luz",
+    "sin luz",
+])
+def test_no_junta_mensajes_con_distinta_negacion(cache, mensaje):
+    assert cache.obtener(ESPACIO, mensaje) is None
+
+def test_la_negacion_distinta_no_se_reusa_ni_con_umbral_bajo():
+    cache = CacheRespuestasSimilares(umbral=0.5)
+    cache.guardar(ESPACIO, "quiero hacer un reclamo", "reclamo")
+    assert jaccard(terminos("quiero hacer un reclamo"), terminos("no quiero hacer un reclamo")) >= 0.5
+    assert cache.obtener(ESPACIO, "no quiero hacer un reclamo") is None
+
+@pytest.mark.parametrize("mensaje", [
+    "no tengo luz desde hoy",
+    "no tengo luz desde ayer a la noche",
+    "quiero hacer un pago",
+    "hola buenas noches",
+])
+def test_no_junta_mensajes_con_otro_sentido(cache, mensaje):
+    assert cache.obtener(ESPACIO, mensaje) is None
+
+def test_los_espacios_no_se_mezclan(cache):
+    assert cache.obtener("gemini:gemini-1.5-flash:v1", "no tengo luz") is None
+
+def test_terminos_colapsa_letras_repetidas_y_saca_puntuacion():
+    assert terminos("¡¡Holaaa, no tengo LUZZ!!") == frozenset({"hola", "no", "tengo", "luz"})
+    assert terminos("...") == frozenset()
+
+def test_mensaje_vacio_no_consulta_ni_guarda():
+    cache = CacheRespuestasSimilares()
+    cache.guardar(ESPACIO, "!!", "x")
+    assert cache.obtener(ESPACIO, "") is None
+    assert cache.resumen()["entradas"] == 0
+
+def test_es_apertura():
+    assert es_apertura("")
+    assert es_apertura("Usuario: no tengo luz")
+    assert not es_apertura("Usuario: hola | Usuario: no tengo luz")
+
+def _claves_indexadas(cache):
+    return {clave for claves in cache._bandas.values() for clave in claves}
+
+def test_desaloja_la_menos_usada_y_limpia_sus_bandas():
+    cache = CacheRespuestasSimilares(maximo=2)
+    cache.guardar(ESPACIO, "no tengo luz", "luz")
+    cache.guardar(ESPACIO, "quiero ver mi factura", "factura")
+    # La lectura renueva "no tengo luz": la menos usada pasa a ser la factura
+    assert cache.obtener(ESPACIO, "no tengo luz") == "luz"
+    cache.guardar(ESPACIO, "hola buenas tardes", "hola")
+
+    assert cache.obtener(ESPACIO, "quiero ver mi factura") is None
+    assert cache.obtener(ESPACIO, "no tengo luz") == "luz"
+    assert cache.obtener(ESPACIO, "hola buenas tardes") == "hola"
+    resumen = cache.resumen()
+    assert resumen["entradas"] == 2
+    assert resumen["desalojos"] == 1
+    # El índice de bandas sólo apunta a entradas vivas, sin conjuntos vacíos
+    assert _claves_indexadas(cache) == set(cache._entradas)
+    assert all(cache._bandas.values())
+    assert len(cache._bandas) <= 2 * BANDAS
+
+def test_guardar_de_nuevo_reemplaza_sin_duplicar_el_indice():
+    cache = CacheRespuestasSimilares(maximo=1)
+    cache.guardar(ESPACIO, "no tengo luz", "vieja")
+    cache.guardar(ESPACIO, "No tengo luz!", "nueva")
+    assert cache.obtener(ESPACIO, "no tengo luz") == "nueva"
+    assert cache.resumen()["desalojos"] == 0
+    cache.guardar(ESPACIO, "hola", "hola")
+    assert cache.resumen()["desalojos"] == 1
+    assert _claves_indexadas(cache) == set(cache._entradas)
+    assert len(cache._bandas) == BANDAS
+
+def test_resumen_cuenta_hits_y_misses(cache):
+    cache.obtener(ESPACIO, "no tengo luz")
+    cache.obtener(ESPACIO, "ya tengo luz")
+    resumen = cache.resumen()
+    assert (resumen["hits"], resumen["misses"], resumen["tasa_hits"]) == (1, 1, 0.5)
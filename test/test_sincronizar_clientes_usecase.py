@@ -0,0 +1,131 @@
+# test/test_sincronizar_clientes_usecase.py
+from datetime import datetime
+
+import pytest
+from sqlalchemy import insert, select
+
+from application.sincronizar_clientes_usecase import SincronizarClientesUseCase
+from domain.entities import Cliente
+from infrastructure.pr_cau_tablas import BARRIOS, CALLES, FACTURAS, PERSONAS, SERSOC, SUMSOC
+from infrastructure.sqlalchemy_usuario_repository import SQLAlchemyUsuarioRepository
+
+class _SinCache:
+    def leer_a_traves(self, tipo, dni, cargar, *parametros):
+        return cargar()
+
+    def invalidar(self, *dnis):
+        pass
+
+def _persona(cod_per, dni, telefono=None):
+    return {"COD_PER": cod_per, "APELLIDOS": f"Apellido{cod_per}", "NOMBRES": "Ana", "NUM_DNI": dni,
+            "TELEFONO": telefono, "COD_POS": 5000, "FEC_ALTA": datetime(2020, 1, cod_per)}
+
+def _factura(id_fac, cod_per, cod_sum):
+    return {"ID_FAC": id_fac, "COD_PER": cod_per, "COD_SUM": cod_sum, "NUM_COM": f"A-{id_fac}",
+            "FECHA": datetime(2026, 1, 1), "PAGA": "P", "TOTAL1": 100}
+
+@pytest.fixture
+def repositorio(sesion_db1, sesion_db2):
+    sesion_db1.execute(insert(BARRIOS), [{"COD_BAR": 1, "DES_BAR": "Centro"}, {"COD_BAR": 2, "DES_BAR": "Villa Sur"}])
+    sesion_db1.execute(insert(CALLES), [{"COD_CAL": 1, "DES_CAL": "San Martin"}, {"COD_CAL": 2, "DES_CAL": "Belgrano"}])
+    sesion_db1.execute(insert(SUMSOC), [
+        {"COD_SUM": 500, "COD_BAR": 1, "COD_CAL": 1},
+        {"COD_SUM": 501, "COD_BAR": 1, "COD_CAL": 1},
+        {"COD_SUM": 502, "COD_BAR": 2, "COD_CAL": 2},
+    ])
+    sesion_db1.execute(insert(SERSOC), [
+        {"COD_SUM": 500, "NUM_MED": "M500"}, {"COD_SUM": 501, "NUM_MED": "M501"}, {"COD_SUM": 502, "NUM_MED": "M502"},
+    ])
+    sesion_db1.execute(insert(PERSONAS), [_persona(1, "100", 3511234), _persona(2, "200"), _persona(3, "300")])
+    sesion_db1.execute(insert(FACTURAS), [_factura(10, 1, 500), _factura(11, 3, 501)])
+    sesion_db1.commit()
+    return SQLAlchemyUsuarioRepository(sesion_db1, sesion_db2, cache=_SinCache())
+
+def _clientes(sesion_db2):
+    sesion_db2.expire_all()
+    return {cliente.DNI: cliente for cliente in sesion_db2.execute(select(Cliente)).scalars()}
+
+def test_primera_corrida_copia_todo_y_guarda_las_marcas(repositorio, sesion_db2):
+    usecase = SincronizarClientesUseCase(repositorio, tamano_lote=2)
+    resumen, status = usecase.ejecutar()
+    assert status == 200
+    assert resumen == {"leidos": 3, "insertados": 3, "actualizados": 0, "lotes": 2, "ultimo_cod_per": 3, "ultimo_id_fac": 11}
+    marca = repositorio.obtener_marca_sincronizacion(SincronizarClientesUseCase.NOMBRE)
+    assert (marca["ULTIMO_COD_PER"], marca["ULTIMO_ID_FAC"]) == (3, 11)
+
+    clientes = _clientes(sesion_db2)
+    assert set(clientes) == {"100", "200", "300"}
+    # Números de PR_CAU guardados como texto; persona sin facturas con suministro y medidor vacíos
+    assert (clientes["100"].CODIGO_SUMINISTRO, clientes["100"].NUMERO_MEDIDOR, clientes["100"].CELULAR) == ("500", "M500", "3511234")
+    assert (clientes["100"].CALLE, clientes["100"].BARRIO, clientes["100"].CODIGO_POSTAL) == ("San Martin", "Centro", "5000")
+    assert (clientes["200"].CODIGO_SUMINISTRO, clientes["200"].NUMERO_MEDIDOR) == ("", "")
+
+def test_sin_cambios_no_lee_ni_escribe(repositorio):
+    usecase = SincronizarClientesUseCase(repositorio)
+    usecase.ejecutar()
+    resumen, _ = usecase.ejecutar()
+    assert (resumen["leidos"], resumen["insertados"], resumen["actualizados"]) == (0, 0, 0)
+    # Releer todo tampoco reescribe filas iguales
+    resumen, _ = usecase.ejecutar(completo=True)
+    assert (resumen["leidos"], resumen["insertados"], resumen["actualizados"]) == (3, 0, 0)
+
+def test_segunda_pasada_actualiza_suministro_y_respeta_lo_editado(repositorio, sesion_db1, sesion_db2):
+    usecase = SincronizarClientesUseCase(repositorio)
+    usecase.ejecutar()
+
+    # El cliente 100 editó su calle desde el chat y vació el celular
+    cliente = _clientes(sesion_db2)["100"]
+    cliente.CALLE, cliente.CELULAR = "Sarmiento 123", None
+    sesion_db2.commit()
+    # PR_CAU: persona nueva y una factura nueva del 100 con otro suministro
+    sesion_db1.execute(insert(PERSONAS), [_persona(4, "400")])
+    sesion_db1.execute(insert(FACTURAS), [_factura(12, 1, 502), _factura(13, 4, 500)])
+    sesion_db1.commit()
+
+    resumen, _ = usecase.ejecutar()
+    # Pasada 1: la persona 4; pasada 2: sólo la 1 (la única ya sincronizada con facturas nuevas)
+    assert resumen == {"leidos": 2, "insertados": 1, "actualizados": 1, "lotes": 2, "ultimo_cod_per": 4, "ultimo_id_fac": 13}
+    cliente = _clientes(sesion_db2)["100"]
+    assert (cliente.CODIGO_SUMINISTRO, cliente.NUMERO_MEDIDOR, cliente.BARRIO) == ("502", "M502", "Centro")
+    # CALLE editada se conserva; CELULAR vacío se completa desde PR_CAU
+    assert (cliente.CALLE, cliente.CELULAR) == ("Sarmiento 123", "3511234")
+
+def test_corrida_cortada_retoma_desde_el_ultimo_lote(repositorio, sesion_db1, sesion_db2):
+    sesion_db1.execute(insert(PERSONAS), [_persona(cod_per, str(cod_per * 100)) for cod_per in range(4, 8)])
+    sesion_db1.commit()
+    upsert = repositorio.upsert_clientes_db2
+    llamadas = []
+
+    def upsert_que_falla(identidades):
+        llamadas.append(identidades)
+        if len(llamadas) == 3:
+            raise RuntimeError("se cortó la conexión")
+        return upsert(identidades)
+
+    repositorio.upsert_clientes_db2 = upsert_que_falla
+    usecase = SincronizarClientesUseCase(repositorio, tamano_lote=2)
+    resumen, status = usecase.ejecutar()
+    assert status == 500
+    marca = repositorio.obtener_marca_sincronizacion(SincronizarClientesUseCase.NOMBRE)
+    # Dos lotes confirmados; la marca de facturas no avanza hasta terminar
+    assert (marca["ULTIMO_COD_PER"], marca["ULTIMO_ID_FAC"]) == (4, 0)
+
+    repositorio.upsert_clientes_db2 = upsert
+    resumen, status = usecase.ejecutar()
+    assert (status, resumen["insertados"], resumen["ultimo_cod_per"]) == (200, 3, 7)
+    assert len(_clientes(sesion_db2)) == 7
+
+def test_upsert_dni_repetido_y_columnas_editables(repositorio, sesion_db2):
+    identidades = repositorio.obtener_identidades_db1(0, 10)
+    assert repositorio.upsert_clientes_db2(identidades) == (3, 0)
+
+    cliente = _clientes(sesion_db2)["300"]
+    cliente.EMAIL = "propio@example.com"
+    cliente.BARRIO = None
+    sesion_db2.commit()
+    # DNI repetido en PERSONAS: gana la última fila del lote (COD_PER más alto)
+    nueva = dict(identidades[2], IdPersona=9, Apellido="Otro", Email="pr_cau@example.com", Barrio="Villa Sur")
+    assert repositorio.upsert_clientes_db2([identidades[2], nueva]) == (0, 1)
+    cliente = _clientes(sesion_db2)["300"]
+    assert cliente.NOMBRE_COMPLETO == "Otro Ana"
+    assert (cliente.EMAIL, cliente.BARRIO) == ("propio@example.com", "Villa Sur")
@@ -0,0 +1,122 @@
+# test/test_sqlalchemy_reclamo_repository.py
+from datetime import datetime
+
+import pytest
+from sqlalchemy import event, select
+
+from domain.entities import Cliente, Reclamo
+from infrastructure.sqlalchemy_reclamo_repository import SQLAlchemyReclamoRepository
+
+@pytest.fixture
+def session(sesion_db2):
+    sesion_db2.add_all([
+        Cliente(ID_USUARIO=1, DNI="1", NOMBRE_COMPLETO="Ana", CODIGO_SUMINISTRO="S1", NUMERO_MEDIDOR="M1",
+                CALLE="San Martin", BARRIO="Centro"),
+        Cliente(ID_USUARIO=2, DNI="2", NOMBRE_COMPLETO="Beto", CODIGO_SUMINISTRO="S2", NUMERO_MEDIDOR="M2",
+                CALLE="Belgrano", BARRIO="Villa Sur"),
+        # Comodines de LIKE en los datos: "%" y "_" del filtro tienen que buscarse literalmente
+        Cliente(ID_USUARIO=3, DNI="3", NOMBRE_COMPLETO="Caro", CODIGO_SUMINISTRO="S3", NUMERO_MEDIDOR="M3",
+                CALLE="Ruta_9 km 5", BARRIO="Loteo 100%"),
+    ])
+    sesion_db2.add_all([
+        Reclamo(ID_RECLAMO=i, ID_USUARIO=1 if i <= 6 else 2, DESCRIPCION=f"reclamo {i}",
+                ESTADO="Pendiente" if i % 2 else "En proceso", FECHA_RECLAMO=datetime(2026, 1, i))
+        for i in range(1, 11)
+    ])
+    sesion_db2.add(Reclamo(ID_RECLAMO=11, ID_USUARIO=3, DESCRIPCION="reclamo 11", ESTADO="Pendiente",
+                           FECHA_RECLAMO=datetime(2026, 1, 11)))
+    sesion_db2.commit()
+    return sesion_db2
+
+def _updates(session):
+    """Lista que va juntando los UPDATE que ejecuta la sesión."""
+    sentencias = []
+    event.listen(session.get_bind(), "before_cursor_execute",
+                 lambda conn, cursor, sql, *args: sentencias.append(sql) if sql.startswith("UPDATE") else None)
+    return sentencias
+
+def _estados(session):
+    return dict(session.execute(select(Reclamo.ID_RECLAMO, Reclamo.ESTADO)).all())
+
+# actualizar_estado_masivo
+
+def test_masivo_por_ids_parte_la_lista_in_en_lotes(session):
+    repositorio = SQLAlchemyReclamoRepository(session)
+    repositorio.TAMANO_LOTE_IN = 3
+    sentencias = _updates(session)
+    resultados = repositorio.actualizar_estado_masivo("Resuelto", [1, 2, 2, 3, 4, 5, 6, 7, 99])
+    # 8 IDs distintos en lotes de 3; el repetido cuenta una vez
+    assert len(sentencias) == 3
+    assert all("RETURNING" in sql for sql in sentencias)
+    assert resultados == {**{i: "actualizado" for i in range(1, 8)}, 99: "no_encontrado"}
+    estados = _estados(session)
+    assert all(estados[i] == "Resuelto" for i in range(1, 8))
+    assert estados[8] == "En proceso"
+    cierres = dict(session.execute(select(Reclamo.ID_RECLAMO, Reclamo.FECHA_CIERRE)).all())
+    assert cierres[1] is not None and cierres[8] is None
+
+def test_masivo_por_filtro_devuelve_los_ids_del_returning(session):
+    repositorio = SQLAlchemyReclamoRepository(session)
+    repositorio.actualizar_estado_masivo("Resuelto", [1])
+    resultados = repositorio.actualizar_estado_masivo("Pendiente", filtros={"barrio": "centro", "estados": ["Resuelto", "En proceso"]})
+    # Del cliente 1 (Centro): el 1 (Resuelto) y los pares (En proceso)
+    assert resultados == {1: "actualizado", 2: "actualizado", 4: "actualizado", 6: "actualizado"}
+    # Volver de "Resuelto" limpia FECHA_CIERRE
+    assert session.get(Reclamo, 1).FECHA_CIERRE is None
+    assert _estados(session)[8] == "En proceso"
+
+@pytest.mark.parametrize("filtros", [None, {}, {"estados": [], "barrio": ""}])
+def test_masivo_sin_filtro_no_toca_nada(session, filtros):
+    repositorio = SQLAlchemyReclamoRepository(session)
+    sentencias = _updates(session)
+    antes = _estados(session)
+    with pytest.raises(ValueError):
+        repositorio.actualizar_estado_masivo("Resuelto", filtros=filtros)
+    assert sentencias == []
+    assert _estados(session) == antes
+
+# condiciones_filtro y buscar
+
+def _ids(session, **filtros):
+    condiciones = SQLAlchemyReclamoRepository.condiciones_filtro(**filtros)
+    return session.execute(select(Reclamo.ID_RECLAMO).where(*condiciones).order_by(Reclamo.ID_RECLAMO)).scalars().all()
+
+def test_condiciones_filtro(session):
+    assert SQLAlchemyReclamoRepository.condiciones_filtro() == []
+    assert _ids(session, estados=["En proceso"]) == [2, 4, 6, 8, 10]
+    # hasta es exclusivo
+    assert _ids(session, desde=datetime(2026, 1, 3), hasta=datetime(2026, 1, 5)) == [3, 4]
+    assert _ids(session, barrio="villa", estados=["Pendiente"]) == [7, 9]
+    assert _ids(session, calle="MARTIN") == [1, 2, 3, 4, 5, 6]
+
+@pytest.mark.parametrize("barrio, calle, esperados", [
+    ("%", None, [11]),
+    ("100%", None, [11]),
+    ("_", None, []),
+    (None, "ruta_9", [11]),
+    (None, "ruta 9", []),
+    (None, "_", [11]),
+    (None, "%9%", []),
+])
+def test_comodines_del_usuario_se_buscan_literalmente(session, barrio, calle, esperados):
+    assert _ids(session, barrio=barrio, calle=calle) == esperados
+
+def test_buscar_ordena_pagina_y_cuenta(session):
+    repositorio = SQLAlchemyReclamoRepository(session)
+    reclamos, total = repositorio.buscar(estados=["Pendiente"], orden="-fecha_reclamo", limit=2, offset=1)
+    assert total == 6
+    assert [reclamo["ID_RECLAMO"] for reclamo in reclamos] == [9, 7]
+    assert reclamos[0]["cliente"]["nombre"] == "Beto"
+
+    # Empates en el barrio: desempata ID_RECLAMO en el mismo sentido
+    reclamos, total = repositorio.buscar(orden="barrio", limit=3)
+    assert total == 11
+    assert [reclamo["ID_RECLAMO"] for reclamo in reclamos] == [1, 2, 3]
+    reclamos, _ = repositorio.buscar(orden="-barrio", limit=2)
+    assert [reclamo["ID_RECLAMO"] for reclamo in reclamos] == [10, 9]
+
+    assert repositorio.buscar(barrio="%") == (repositorio.buscar(calle="Ruta_9")[0], 1)
+
+def test_buscar_orden_invalido(session):
+    with pytest.raises(ValueError):
+        SQLAlchemyReclamoRepository(session).buscar(orden="-dni")
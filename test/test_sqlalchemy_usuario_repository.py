@@ -0,0 +1,307 @@
+# test/test_sqlalchemy_usuario_repository.py
+import json
+from datetime import datetime
+from types import SimpleNamespace
+
+import pyarrow as pa
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import delete, insert, select
+from sqlalchemy.exc import InvalidRequestError
+
+from application.consultar_facturas_usecase import ConsultarFacturasUseCase
+from application.formato_facturas import a_json
+from domain.entities import Cliente, Reclamo
+from infrastructure.pr_cau_tablas import CONS_SER, FACTURAS, PERSONAS, SERSOC, SUMSOC
+from infrastructure.security import get_current_user
+from infrastructure.sqlalchemy_reclamo_repository import SQLAlchemyReclamoRepository
+from infrastructure.sqlalchemy_usuario_repository import SQLAlchemyUsuarioRepository
+from routes.factura_routes import factura_router, get_consultar_facturas_usecase
+
+class _SinCache:
+    def leer_a_traves(self, tipo, dni, cargar, *parametros):
+        return cargar()
+
+    def invalidar(self, *dnis):
+        pass
+
+@pytest.fixture
+def repositorio(sesion_db1, sesion_db2):
+    sesion_db1.execute(insert(PERSONAS), [
+        {"COD_PER": cod_per, "APELLIDOS": apellido, "NOMBRES": "Ana", "NUM_DNI": dni, "FEC_ALTA": datetime(2020, 1, 1)}
+        for cod_per, apellido, dni in ((1, "Perez", "100"), (2, "Gomez", "200"), (3, "Diaz", "300"))
+    ])
+    sesion_db1.execute(insert(FACTURAS), [
+        {"ID_FAC": 10, "COD_PER": 1, "COD_SUM": 500, "NUM_COM": "A-10", "FECHA": datetime(2026, 1, 5), "PAGA": "P", "TOTAL1": 100},
+        {"ID_FAC": 11, "COD_PER": 3, "COD_SUM": 501, "NUM_COM": "A-11", "FECHA": datetime(2026, 1, 5), "PAGA": None, "TOTAL1": 200},
+    ])
+    sesion_db1.execute(insert(SUMSOC), [{"COD_SUM": 500}, {"COD_SUM": 501}])
+    # El suministro 500 tuvo tres medidores (recambios); el 501 uno solo
+    sesion_db1.execute(insert(SERSOC), [
+        {"COD_SUM": 500, "NUM_MED": "M1"}, {"COD_SUM": 500, "NUM_MED": "M3"}, {"COD_SUM": 500, "NUM_MED": "M2"},
+        {"COD_SUM": 501, "NUM_MED": "X9"},
+    ])
+    sesion_db1.execute(insert(CONS_SER), [
+        {"ID_FAC": 10, "PERIODO": "2025-12", "CONSUMO": 150}, {"ID_FAC": 10, "PERIODO": "2026-01", "CONSUMO": 170},
+    ])
+    sesion_db1.commit()
+    return SQLAlchemyUsuarioRepository(sesion_db1, sesion_db2, cache=_SinCache())
+
+# Historial del DNI 200: una factura por mes de 2025-07 a 2026-01 (ID_FAC 2..8)
+HISTORIAL = (
+    # ID_FAC, FECHA, PAGA, TOTAL1, VTO1, consumos del período
+    (2, datetime(2025, 7, 1), "P", 100, datetime(2025, 7, 20), (("2025-07", 200),)),
+    (3, datetime(2025, 8, 1), "P", 110, datetime(2025, 8, 20), (("2025-08", 210),)),
+    (4, datetime(2025, 9, 1), "P", 120, datetime(2025, 9, 20), (("2025-09", 220),)),
+    (5, datetime(2025, 10, 1), "N", 130, datetime(2025, 10, 20), (("2025-10", 231),)),
+    (6, datetime(2025, 11, 1), None, 140, datetime(2025, 11, 20), (("2025-11", 231),)),
+    (7, datetime(2025, 12, 1), "P", 150, datetime(2025, 12, 20), (("2025-12", 200),)),
+    # Dos registros de consumo en la misma factura
+    (8, datetime(2026, 1, 1), None, 160, datetime(2026, 1, 25), (("2026-01", 150), ("2026-01", 100))),
+)
+
+@pytest.fixture
+def historial(repositorio, sesion_db1):
+    sesion_db1.execute(insert(FACTURAS), [
+        {"ID_FAC": id_fac, "COD_PER": 2, "COD_SUM": 502, "NUM_COM": f"B-{id_fac}", "FECHA": fecha, "PAGA": paga,
+         "TOTAL1": total, "VTO1": vencimiento}
+        for id_fac, fecha, paga, total, vencimiento, _ in HISTORIAL
+    ])
+    sesion_db1.execute(insert(SUMSOC), [{"COD_SUM": 502}])
+    sesion_db1.execute(insert(SERSOC), [{"COD_SUM": 502, "NUM_MED": "Z1"}])
+    sesion_db1.execute(insert(CONS_SER), [
+        {"ID_FAC": id_fac, "PERIODO": periodo, "CONSUMO": consumo}
+        for id_fac, *_, consumos in HISTORIAL for periodo, consumo in consumos
+    ])
+    sesion_db1.commit()
+    return repositorio
+
+def _comprobantes(filas):
+    """NUM_COM en el orden de las filas, una vez por factura."""
+    return list(dict.fromkeys(fila["NumeroComprobante"] for fila in filas))
+
+# Medidor del suministro (SERSOC tiene una fila por medidor)
+
+def test_identidad_con_un_medidor_determinista(repositorio):
+    identidad = repositorio.obtener_identidad_db1("100")
+    assert (identidad["CodigoSuministro"], identidad["NumeroMedidor"]) == (500, "M3")
+    assert repositorio.obtener_identidad_db1("200")["NumeroMedidor"] is None
+
+def test_lote_de_identidades_cuenta_personas_y_no_medidores(repositorio):
+    lote = repositorio.obtener_identidades_db1(0, 2)
+    assert [fila["IdPersona"] for fila in lote] == [1, 2]
+    assert [fila["IdPersona"] for fila in repositorio.obtener_identidades_db1(2, 2)] == [3]
+
+def test_facturas_no_se_repiten_por_medidor(repositorio):
+    filas = repositorio.obtener_facturas_db1("100")
+    assert [(fila["NumeroComprobante"], fila["Periodo"], fila["NumeroMedidor"]) for fila in filas] == [
+        ("A-10", "2026-01", "M3"), ("A-10", "2025-12", "M3"),
+    ]
+
+def test_copia_en_lote_usa_el_mismo_medidor(repositorio, sesion_db2):
+    resultados = repositorio.copiar_clientes_a_db2(["100", "300", "999"])
+    assert resultados == {"100": "copiado", "300": "copiado", "999": "no_encontrado"}
+    medidores = dict(sesion_db2.execute(select(Cliente.DNI, Cliente.NUMERO_MEDIDOR)).all())
+    assert medidores == {"100": "M3", "300": "X9"}
+
+# Cliente.reclamos no se carga con el cliente: leerlo falla en lugar de dar []
+
+def test_cliente_por_dni_sin_historial(repositorio, sesion_db2):
+    cliente = repositorio.copiar_cliente_a_db2("100")
+    sesion_db2.add(Reclamo(ID_USUARIO=cliente.ID_USUARIO, DESCRIPCION="sin luz"))
+    sesion_db2.commit()
+    sesion_db2.expunge_all()
+
+    cliente = repositorio.obtener_por_dni("100")
+    assert cliente.to_dict()["NUMERO_MEDIDOR"] == "M3"
+    with pytest.raises(InvalidRequestError):
+        cliente.to_dict(include_reclamos=True)
+    # Se sigue pudiendo editar y guardar (ActualizarUsuarioUseCase)
+    cliente.EMAIL = "ana@example.com"
+    repositorio.actualizar_cliente(cliente)
+    assert repositorio.obtener_por_dni("100").EMAIL == "ana@example.com"
+    assert repositorio.obtener_por_dni("999") is None
+
+def test_reclamo_con_cliente_sin_historial(repositorio, sesion_db2):
+    cliente = repositorio.copiar_cliente_a_db2("300")
+    sesion_db2.add(Reclamo(ID_RECLAMO=7, ID_USUARIO=cliente.ID_USUARIO, DESCRIPCION="poste caido"))
+    sesion_db2.commit()
+    sesion_db2.expunge_all()
+
+    reclamo = SQLAlchemyReclamoRepository(sesion_db2).obtener_por_id(7)
+    assert reclamo.to_dict()["medidor"] == "X9"
+    with pytest.raises(InvalidRequestError):
+        reclamo.cliente.reclamos
+
+# Paginación y filtros de facturas (_ids_facturas)
+
+def test_limite_y_offset_paginan_facturas_y_no_filas(historial):
+    # B-8 tiene dos filas de consumo y cuenta como una sola factura
+    filas = historial.obtener_facturas_db1("200", limite=2)
+    assert [fila["NumeroComprobante"] for fila in filas] == ["B-8", "B-8", "B-7"]
+    assert _comprobantes(historial.obtener_facturas_db1("200", limite=2, offset=2)) == ["B-6", "B-5"]
+    assert _comprobantes(historial.obtener_facturas_db1("200", offset=5)) == ["B-3", "B-2"]
+    assert _comprobantes(historial.obtener_facturas_db1("200")) == [f"B-{id_fac}" for id_fac in range(8, 1, -1)]
+
+def test_desde_inclusive_hasta_exclusivo(historial):
+    filas = historial.obtener_facturas_db1("200", desde=datetime(2025, 9, 1), hasta=datetime(2025, 11, 1))
+    assert _comprobantes(filas) == ["B-5", "B-4"]
+    assert _comprobantes(historial.obtener_facturas_db1("200", desde=datetime(2025, 12, 2))) == ["B-8"]
+    # Filtros y página juntos: la página es sobre las facturas que pasan el filtro
+    filas = historial.obtener_facturas_db1("200", limite=1, offset=1, hasta=datetime(2025, 11, 1))
+    assert _comprobantes(filas) == ["B-4"]
+
+def test_estado_pagada_es_paga_p_y_pendiente_todo_lo_demas(historial):
+    assert _comprobantes(historial.obtener_facturas_db1("200", estado="pagada")) == ["B-7", "B-4", "B-3", "B-2"]
+    # PAGA 'N' y NULL son pendientes
+    assert _comprobantes(historial.obtener_facturas_db1("200", estado="pendiente")) == ["B-8", "B-6", "B-5"]
+    with pytest.raises(ValueError):
+        historial.obtener_facturas_db1("200", estado="vencida")
+
+def test_ninguna_factura_pasa_los_filtros(historial):
+    # La persona vuelve igual, sin factura, y el caso de uso lo informa
+    filas = historial.obtener_facturas_db1("200", estado="pagada", desde=datetime(2026, 1, 1))
+    assert [(fila["Dni"], fila["NumeroComprobante"]) for fila in filas] == [("200", None)]
+    respuesta, status = ConsultarFacturasUseCase(historial).ejecutar("200", estado="pagada", desde=datetime(2026, 1, 1))
+    assert (status, respuesta["facturas"]) == (200, [])
+    assert ConsultarFacturasUseCase(historial).ejecutar("200", estado="vencida")[1] == 400
+
+def _cliente_http(repositorio, rol=None):
+    """TestClient de factura_router sobre el repositorio sqlite; con ``rol``, logueado con ese rol."""
+    app = FastAPI()
+    app.include_router(factura_router, prefix="/api/facturas")
+    app.dependency_overrides[get_consultar_facturas_usecase] = lambda: ConsultarFacturasUseCase(repositorio)
+    if rol:
+        app.dependency_overrides[get_current_user] = lambda: SimpleNamespace(roles=[SimpleNamespace(Nombre=rol)])
+    return TestClient(app)
+
+def test_ruta_hasta_incluye_el_dia_pedido(historial):
+    cliente = _cliente_http(historial)
+
+    # hasta=2025-11-01 incluye la factura emitida ese día (FECHA < 2025-11-02)
+    respuesta = cliente.get("/api/facturas/200", params={"desde": "2025-10-01", "hasta": "2025-11-01"})
+    assert respuesta.status_code == 200
+    assert [factura["NumeroComprobante"] for factura in respuesta.json()["facturas"]] == ["B-6", "B-5"]
+    respuesta = cliente.get("/api/facturas/200", params={"hasta": "2025-10-31", "estado": "pendiente"})
+    assert [factura["NumeroComprobante"] for factura in respuesta.json()["facturas"]] == ["B-5"]
+    assert cliente.get("/api/facturas/200", params={"estado": "vencida"}).status_code == 422
+
+def test_ultima_factura(historial):
+    usecase = ConsultarFacturasUseCase(historial)
+    respuesta, status = usecase.ejecutar_ultima("200")
+    assert status == 200
+    assert [(factura["NumeroComprobante"], factura["Estado"], factura["Vencimiento"]) for factura in respuesta["facturas"]] == [
+        ("B-8", "Pendiente", "25/01/2026"),
+    ]
+    # Coincide con la primera factura del listado completo
+    assert respuesta["facturas"][0] == usecase.ejecutar("200")[0]["facturas"][0]
+    assert usecase.ejecutar_ultima("999")[1] == 404
+
+# Resumen de deuda y consumo (CONSULTA_RESUMEN_FACTURAS_DB1, CONSULTA_CONSUMOS_DB1)
+
+HOY = datetime(2026, 1, 10)
+
+def test_resumen_de_deuda_pagadas_pendientes_y_vencidas(historial):
+    resumen = historial.obtener_resumen_facturas_db1("200", HOY)
+    # Impagas: B-5 (PAGA 'N'), B-6 y B-8 (NULL); vencidas a HOY: B-5 y B-6
+    assert (resumen["CantidadFacturas"], resumen["FacturasImpagas"], resumen["TotalAdeudado"]) == (7, 3, 430)
+    assert (resumen["FacturasVencidas"], resumen["TotalVencido"]) == (2, 270)
+    assert resumen["ProximoVencimiento"] == datetime(2026, 1, 25)
+    # Un día después del último vencimiento ya no queda ninguno por venir
+    resumen = historial.obtener_resumen_facturas_db1("200", datetime(2026, 1, 26))
+    assert (resumen["FacturasVencidas"], resumen["TotalVencido"], resumen["ProximoVencimiento"]) == (3, 430, None)
+
+def test_consumos_agrupan_por_periodo_y_calculan_la_variacion(historial):
+    consumos = historial.obtener_consumos_db1("200", 3)
+    # B-8 tiene dos registros de 2026-01: se suman; el LAG mira el período anterior aunque quede fuera del LIMIT
+    assert [(fila["Periodo"], fila["Consumo"], fila["ConsumoAnterior"], fila["Variacion"]) for fila in consumos] == [
+        ("2026-01", 250, 200, 50), ("2025-12", 200, 231, -31), ("2025-11", 231, 231, 0),
+    ]
+    primero = historial.obtener_consumos_db1("200", 12)[-1]
+    assert (primero["Periodo"], primero["ConsumoAnterior"], primero["Variacion"]) == ("2025-07", None, None)
+
+def test_resumir(historial):
+    respuesta, status = ConsultarFacturasUseCase(historial).resumir("200", periodos=3, hoy=HOY)
+    assert status == 200
+    assert respuesta["deuda"] == {
+        "total": 430.0, "facturas_impagas": 3, "facturas_vencidas": 2, "total_vencido": 270.0,
+        "proximo_vencimiento": "25/01/2026",
+    }
+    assert respuesta["consumo"] == [
+        {"periodo": "2025-11", "kwh": 231.0, "variacion": 0.0, "variacion_pct": 0.0},
+        {"periodo": "2025-12", "kwh": 200.0, "variacion": -31.0, "variacion_pct": -13.4},
+        {"periodo": "2026-01", "kwh": 250.0, "variacion": 50.0, "variacion_pct": 25.0},
+    ]
+    assert (respuesta["nombre"], respuesta["cantidad_facturas"], respuesta["tendencia"]) == ("Gomez Ana", 7, "en_aumento")
+
+@pytest.mark.parametrize("sin_consumo, tendencia", [
+    ((), "en_aumento"),
+    ((8,), "en_baja"),  # último período 2025-12: -13.4%
+    ((8, 7), "estable"),  # último período 2025-11: 0%
+    ((8, 7, 6, 5, 4, 3), "sin_datos"),  # un solo período, sin anterior
+    ((8, 7, 6, 5, 4, 3, 2), "sin_datos"),
+])
+def test_resumir_tendencia_del_ultimo_periodo(historial, sesion_db1, sin_consumo, tendencia):
+    sesion_db1.execute(delete(CONS_SER).where(CONS_SER.c.ID_FAC.in_(sin_consumo)))
+    sesion_db1.commit()
+    assert ConsultarFacturasUseCase(historial).resumir("200", hoy=HOY)[0]["tendencia"] == tendencia
+
+@pytest.mark.parametrize("variacion_pct, tendencia", [
+    (ConsultarFacturasUseCase.UMBRAL_TENDENCIA_PCT, "estable"),
+    (ConsultarFacturasUseCase.UMBRAL_TENDENCIA_PCT + 0.1, "en_aumento"),
+    (-ConsultarFacturasUseCase.UMBRAL_TENDENCIA_PCT, "estable"),
+    (-ConsultarFacturasUseCase.UMBRAL_TENDENCIA_PCT - 0.1, "en_baja"),
+])
+def test_umbral_de_tendencia(variacion_pct, tendencia):
+    assert ConsultarFacturasUseCase._tendencia([{"variacion_pct": variacion_pct}]) == tendencia
+
+def test_resumir_dni_desconocido(historial):
+    usecase = ConsultarFacturasUseCase(historial)
+    assert usecase.resumir("999", hoy=HOY)[1] == 404
+    # Persona conocida con todo pagado: no es 404, la deuda queda en cero
+    respuesta, status = usecase.resumir("100", hoy=HOY)
+    assert status == 200
+    assert (respuesta["deuda"]["total"], respuesta["deuda"]["facturas_impagas"], respuesta["deuda"]["proximo_vencimiento"]) == (0.0, 0, None)
+    assert respuesta["mensaje"].startswith("✅ Perez Ana, no tenés facturas impagas.")
+
+# Consulta de operador por varios DNIs (camino columnar de formato_facturas)
+
+def _fila_por_fila(repositorio, dnis, **filtros):
+    """El JSON de ejecutar() DNI por DNI, con _formatear."""
+    return {"facturas": [
+        ConsultarFacturasUseCase._formatear(dato)
+        for dni in dnis for dato in repositorio.obtener_facturas_db1(dni, **filtros) if dato.get("NumeroComprobante")
+    ]}
+
+@pytest.mark.parametrize("filtros", [
+    {},
+    {"estado": "pendiente"},
+    {"estado": "pagada", "desde": datetime(2025, 9, 1), "hasta": datetime(2026, 1, 2)},
+])
+def test_columnar_devuelve_lo_mismo_que_formatear(historial, filtros):
+    # Un tramo de IN por cada 2 DNIs; el 999 no existe y el DNI repetido sale una vez
+    historial.TAMANO_LOTE_IN = 2
+    facturas, status = ConsultarFacturasUseCase(historial).ejecutar_tabla(["100", "200", "999", "300", "200"], **filtros)
+    assert status == 200
+    assert json.loads(a_json(facturas)) == _fila_por_fila(historial, ["100", "200", "300"], **filtros)
+
+def test_columnar_sin_facturas_y_estado_invalido(historial):
+    usecase = ConsultarFacturasUseCase(historial)
+    facturas, status = usecase.ejecutar_tabla(["999"])
+    assert (status, json.loads(a_json(facturas))) == (200, {"facturas": []})
+    assert usecase.ejecutar_tabla(["200"], estado="vencida")[1] == 400
+
+def test_ruta_consulta_por_lote(historial):
+    cuerpo = {"dnis": ["200", "300"], "estado": "pendiente", "hasta": "2025-11-01"}
+    assert _cliente_http(historial).post("/api/facturas/consulta", json=cuerpo).status_code == 401
+    assert _cliente_http(historial, rol="operador").post("/api/facturas/consulta", json=cuerpo).status_code == 403
+
+    cliente = _cliente_http(historial, rol="admin")
+    respuesta = cliente.post("/api/facturas/consulta", json=cuerpo)
+    assert respuesta.status_code == 200
+    assert [(f["DNI"], f["NumeroComprobante"]) for f in respuesta.json()["facturas"]] == [("200", "B-6"), ("200", "B-5")]
+    respuesta = cliente.post("/api/facturas/consulta", json=dict(cuerpo, formato="arrow"))
+    tabla = pa.ipc.open_stream(respuesta.content).read_all()
+    assert tabla.column("NumeroComprobante").to_pylist() == ["B-6", "B-5"]
+    assert cliente.post("/api/facturas/consulta", json={"dnis": []}).status_code == 422